@@ -0,0 +1,246 @@
+# Benchmark das Operações do Banco de Dados
+
+"""
+Mede a latência de cada operação do BancoDadosUtils contra um PostgreSQL local,
+com dados sintéticos na escala de 10 mil, 1 milhão ou 10 milhões de triagens
+(metade disso em pacientes). Cada escala usa seu próprio banco
+(posto_saude_bench_<escala>), criado, migrado e populado na primeira execução e
+reaproveitado nas seguintes.
+
+A conexão usa as variáveis AZURE_POSTGRES_* (ou o .env), mas o script se recusa
+a rodar contra um servidor remoto sem --permitir-remoto. Com --backend sqlite,
+as mesmas operações são medidas no BancoDadosSQLite, em arquivos
+posto_saude_bench_<escala>.db na pasta temporária do sistema.
+
+Uso:
+    python benchmarks/bench_banco_dados.py [--escalas 10k 1M 10M] [--repeticoes 200] [--saida resultado.json]
+    python benchmarks/bench_banco_dados.py --backend sqlite [--escalas 10k]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+
+from comum import resumir, salvar_resultados
+
+from banco_dados.backends import BACKENDS, BackendArmazenamento
+from banco_dados.banco_dados_sqlite import BancoDadosSQLite
+from banco_dados.banco_dados_utils import BancoDadosUtils
+from banco_dados.config import DatabaseConfig
+
+ESCALAS = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+
+# Distribuição aproximada das prioridades em um posto de saúde
+PRIORIDADES = ["Emergência", "Urgência", "Prioridade", "Comum"]
+PESOS_PRIORIDADES = [5, 15, 30, 50]
+
+HOSTS_LOCAIS = ("localhost", "127.0.0.1", "::1")
+
+# Maior fila (em pacientes) para a qual a listagem sem filtro é medida: acima disso
+# ela devolve milhões de dicionários e passa a medir apenas a memória da máquina
+LIMITE_LISTAGEM_COMPLETA = 200_000
+
+
+def _silencioso():
+    """Suprime os prints de cada operação do BancoDadosUtils durante as medições."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _consultar(config: dict, sql: str, banco: str = None, autocommit: bool = False):
+    conn = psycopg2.connect(**{**config, "database": banco or config["database"]})
+    conn.autocommit = autocommit
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            resultado = cursor.fetchone() if cursor.description else None
+        conn.commit()
+        return resultado
+    finally:
+        conn.close()
+
+
+def _consultar_db(db: BackendArmazenamento, sql: str):
+    """Executa uma consulta auxiliar (contagens, limpeza) no banco do benchmark."""
+    if isinstance(db, BancoDadosSQLite):
+        conn = db._conexao()
+        resultado = None
+        for comando in sql.split(";"):
+            resultado = conn.execute(comando).fetchone()
+        return resultado
+    return _consultar(db.config, sql)
+
+
+def preparar_banco(escala: str, permitir_remoto: bool, backend: str = "postgresql") -> BackendArmazenamento:
+    """Cria (se preciso) e migra o banco da escala, e devolve o armazenamento apontado para ele."""
+    if backend == "sqlite":
+        with _silencioso():
+            return BancoDadosSQLite(os.path.join(tempfile.gettempdir(), f"posto_saude_bench_{escala.lower()}.db"))
+
+    DatabaseConfig.carregar()
+    host = DatabaseConfig.HOST or ""
+    if not permitir_remoto and not (host.startswith("/") or host in HOSTS_LOCAIS):
+        raise SystemExit(f"AZURE_POSTGRES_HOST={host!r} não é local. Use --permitir-remoto para rodar mesmo assim.")
+
+    nome_banco = f"posto_saude_bench_{escala.lower()}"
+    config = DatabaseConfig.get_connection_string()
+    if not _consultar(config, f"SELECT 1 FROM pg_database WHERE datname = '{nome_banco}'", banco="postgres"):
+        _consultar(config, f'CREATE DATABASE "{nome_banco}"', banco="postgres", autocommit=True)
+
+    DatabaseConfig.DATABASE = nome_banco
+    with _silencioso():
+        # Sem o cache de pacientes: as medidas são das idas ao banco
+        db = BancoDadosUtils(verificar_esquema=False, cache_pacientes=False)
+        db.migrar_esquema()
+    return db
+
+
+def _data_nascimento(sorteio: random.Random) -> str:
+    return f"{sorteio.randint(1, 28):02d}/{sorteio.randint(1, 12):02d}/{sorteio.randint(1930, 2020)}"
+
+
+def popular(db: BackendArmazenamento, total_triagens: int, sorteio: random.Random, bloco: int = 200_000):
+    """Popula o banco com total_triagens triagens de total_triagens / 2 pacientes, se ainda não estiver populado."""
+    existentes = _consultar_db(db, "SELECT count(*) FROM triagens")[0]
+    if existentes >= total_triagens:
+        return
+    print(f"Populando {getattr(db, 'database', None) or db.caminho} com {total_triagens:,} triagens (uma única vez)...")
+    if isinstance(db, BancoDadosSQLite):
+        _consultar_db(db, "DELETE FROM fila_atual; DELETE FROM chamadas_fila; DELETE FROM estatisticas_triagens_hora; "
+                          "DELETE FROM estatisticas_triagens_dia; DELETE FROM triagens; DELETE FROM pacientes")
+    else:
+        _consultar(db.config, "TRUNCATE fila_atual, chamadas_fila, estatisticas_triagens_hora, estatisticas_triagens_dia, "
+                              "triagens, pacientes RESTART IDENTITY CASCADE")
+
+    total_pacientes = max(total_triagens // 2, 1)
+    inicio = time.perf_counter()
+    with _silencioso():
+        for primeiro in range(0, total_pacientes, bloco):
+            db.adicionar_pacientes_lote(
+                (f"Paciente {i}", f"{i:011d}", _data_nascimento(sorteio))
+                for i in range(primeiro, min(primeiro + bloco, total_pacientes))
+            )
+
+        agora = datetime.now()
+        for primeira in range(0, total_triagens, bloco):
+            db.adicionar_triagens_lote(
+                {
+                    "cpf": f"{sorteio.randrange(total_pacientes):011d}",
+                    "sintomas": "relato sintético para benchmark",
+                    "prioridade": sorteio.choices(PRIORIDADES, PESOS_PRIORIDADES)[0],
+                    "justificativa": "benchmark",
+                    "data_triagem": agora - timedelta(seconds=sorteio.randrange(365 * 86400)),
+                }
+                for _ in range(primeira, min(primeira + bloco, total_triagens))
+            )
+        # As triagens retroativas caem em triagens_padrao; cada mês ganha sua partição
+        db.criar_particoes_triagens()
+    _consultar_db(db, "ANALYZE")
+    print(f"Banco populado em {time.perf_counter() - inicio:.0f} s.")
+
+
+def _medir(funcao, repeticoes: int) -> list:
+    amostras = []
+    with _silencioso():
+        funcao()  # aquecimento (conexão do pool, planos em cache)
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+
+def medir_operacoes(db: BackendArmazenamento, repeticoes: int, sorteio: random.Random,
+                    com_reconstrucao: bool) -> dict:
+    total_pacientes, id_minimo, id_maximo = _consultar_db(db, "SELECT count(*), min(id), max(id) FROM pacientes")
+    fila = _consultar_db(db, "SELECT count(*) FROM fila_atual")[0]
+
+    cpf_existente = lambda: f"{sorteio.randrange(total_pacientes):011d}"
+    cpf_novo = lambda: f"9{sorteio.randrange(10 ** 10):010d}"
+    paciente_existente = lambda: sorteio.randint(id_minimo, id_maximo)
+    prioridade = lambda: sorteio.choices(PRIORIDADES, PESOS_PRIORIDADES)[0]
+    lote = max(repeticoes // 10, 3)
+    poucas = max(repeticoes // 40, 3)
+
+    def primeiros(iterador, quantidade=1000):
+        for i, _ in enumerate(iterador):
+            if i + 1 >= quantidade:
+                break
+        iterador.close()
+
+    def paginas_fila(quantidade=10):
+        cursor_pagina = None
+        for _ in range(quantidade):
+            _, cursor_pagina = db.paginar_pacientes_por_prioridade(limite=50, cursor_pagina=cursor_pagina)
+            if cursor_pagina is None:
+                break
+
+    operacoes = {
+        "versao_esquema": (db.versao_esquema, repeticoes),
+        "testar_conexao": (db.testar_conexao, repeticoes),
+        "buscar_paciente_por_cpf": (lambda: db.buscar_paciente_por_cpf(cpf_existente()), repeticoes),
+        "buscar_triagens_paciente": (lambda: db.buscar_triagens_paciente(paciente_existente()), repeticoes),
+        "adicionar_paciente": (lambda: db.adicionar_paciente("Paciente Novo", cpf_novo(), "01/01/1990"), repeticoes),
+        "adicionar_triagem": (lambda: db.adicionar_triagem(paciente_existente(), "relato", prioridade(), "benchmark"), repeticoes),
+        "registrar_atendimento": (lambda: db.registrar_atendimento(
+            "Paciente Atendido", cpf_existente() if sorteio.random() < 0.5 else cpf_novo(), "01/01/1990",
+            "relato", prioridade(), "benchmark"), repeticoes),
+        "adicionar_pacientes_lote_1000": (lambda: db.adicionar_pacientes_lote(
+            [("Paciente Lote", cpf_novo(), "01/01/1990") for _ in range(1000)]), lote),
+        "adicionar_triagens_lote_1000": (lambda: db.adicionar_triagens_lote(
+            [(paciente_existente(), "relato", prioridade(), "benchmark") for _ in range(1000)]), lote),
+        "listar_pacientes_por_prioridade_emergencia": (
+            lambda: db.listar_pacientes_por_prioridade("Emergência"), poucas),
+        "iterar_pacientes_por_prioridade_1000": (lambda: primeiros(db.iterar_pacientes_por_prioridade()), lote),
+        "iterar_triagens_paciente": (lambda: primeiros(db.iterar_triagens_paciente(paciente_existente())), repeticoes),
+        "paginar_pacientes_por_prioridade_10_paginas": (paginas_fila, lote),
+        "paginar_triagens_paciente": (lambda: db.paginar_triagens_paciente(paciente_existente(), limite=20), repeticoes),
+    }
+    if fila <= LIMITE_LISTAGEM_COMPLETA:
+        operacoes["listar_pacientes_por_prioridade"] = (db.listar_pacientes_por_prioridade, poucas)
+    if com_reconstrucao:
+        operacoes["reconstruir_fila_atual"] = (db.reconstruir_fila_atual, 1)
+
+    resultados = {}
+    for nome, (funcao, vezes) in operacoes.items():
+        resultados[nome] = resumir(_medir(funcao, vezes))
+        print(f"  {nome:<45} p50={resultados[nome]['p50_ms']:9.2f} ms  p99={resultados[nome]['p99_ms']:9.2f} ms")
+    return resultados
+
+
+def executar(escalas, repeticoes: int, semente: int, com_reconstrucao: bool = True,
+             permitir_remoto: bool = False, backend: str = "postgresql") -> dict:
+    resultados = {}
+    for escala in escalas:
+        sorteio = random.Random(semente)
+        db = preparar_banco(escala, permitir_remoto, backend)
+        try:
+            popular(db, ESCALAS[escala], sorteio)
+            print(f"Escala {escala} ({ESCALAS[escala]:,} triagens):")
+            resultados[escala] = medir_operacoes(db, repeticoes, sorteio, com_reconstrucao)
+        finally:
+            db.fechar()
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["10k"])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--sem-reconstrucao", action="store_true",
+                        help="Não mede reconstruir_fila_atual (lento nas escalas maiores)")
+    parser.add_argument("--permitir-remoto", action="store_true")
+    parser.add_argument("--backend", choices=BACKENDS, default="postgresql")
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    resultados = executar(args.escalas, args.repeticoes, args.semente,
+                          not args.sem_reconstrucao, args.permitir_remoto, args.backend)
+    salvar_resultados("banco_dados", resultados, args.saida)
@@ -0,0 +1,167 @@
+# Benchmark dos Comandos Preparados no Servidor
+
+"""
+Compara o BancoDadosUtils com e sem comandos preparados (PREPARE/EXECUTE) sob
+carga contínua de gravação: cadastros de atendimento (CPF novo ou já cadastrado),
+triagens avulsas, buscas por CPF e históricos de pacientes, intercalados em
+rodadas para que as duas versões disputem o servidor nas mesmas condições.
+
+Além da latência de cada operação, mostra o tempo de planejamento que o servidor
+gasta em cada consulta quando recebe o texto (Planning Time do EXPLAIN) e quando
+executa o comando já preparado: é o trabalho economizado a cada chamada.
+
+Usa o banco sintético dos benchmarks (posto_saude_bench_<escala>).
+
+Uso:
+    python benchmarks/bench_comandos_preparados.py [--escala 10k] [--repeticoes 2000] [--saida resultado.json]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import date
+
+from comum import resumir, salvar_resultados
+
+from bench_banco_dados import ESCALAS, PESOS_PRIORIDADES, PRIORIDADES, _consultar_db, _silencioso, popular, preparar_banco
+
+from banco_dados.banco_dados_utils import BancoDadosUtils
+from banco_dados.comandos_preparados import COMANDOS, ComandosPreparados
+from banco_dados.consultas import parametros_atendimento_idempotente
+
+
+def _operacoes(db: BancoDadosUtils, sorteio: random.Random, total_pacientes: int, id_minimo: int, id_maximo: int):
+    cpf_existente = lambda: f"{sorteio.randrange(total_pacientes):011d}"
+    cpf_novo = lambda: f"8{sorteio.randrange(10 ** 10):010d}"
+    prioridade = lambda: sorteio.choices(PRIORIDADES, PESOS_PRIORIDADES)[0]
+    return {
+        "registrar_atendimento": lambda: db.registrar_atendimento(
+            "Paciente Carga", cpf_existente() if sorteio.random() < 0.5 else cpf_novo(), "01/01/1990",
+            "relato", prioridade(), "benchmark"),
+        "adicionar_triagem": lambda: db.adicionar_triagem(
+            sorteio.randint(id_minimo, id_maximo), "relato", prioridade(), "benchmark"),
+        "buscar_paciente_por_cpf": lambda: db.buscar_paciente_por_cpf(cpf_existente()),
+        "buscar_triagens_paciente": lambda: db.buscar_triagens_paciente(sorteio.randint(id_minimo, id_maximo)),
+    }
+
+
+def medir_carga(bancos: dict, repeticoes: int, semente: int, rodada: int = 50) -> dict:
+    """
+    Latência de cada operação em cada versão, alternando rodadas de 'rodada' chamadas.
+
+    Args:
+        bancos: Versão ('sem_preparo', 'com_preparo') -> BancoDadosUtils
+        repeticoes: Chamadas de cada operação por versão
+        semente: Semente dos dados sorteados (a mesma sequência nas duas versões)
+        rodada: Chamadas seguidas de uma operação antes de passar à outra versão
+    """
+    total_pacientes = _consultar_db(bancos["sem_preparo"], "SELECT count(*) FROM pacientes")[0]
+    id_minimo, id_maximo = _consultar_db(bancos["sem_preparo"], "SELECT min(id), max(id) FROM pacientes")
+
+    amostras = {versao: {} for versao in bancos}
+    operacoes = {
+        versao: _operacoes(db, random.Random(semente), total_pacientes, id_minimo, id_maximo)
+        for versao, db in bancos.items()
+    }
+    with _silencioso():
+        for versao in bancos:  # aquecimento: conexões abertas e comandos preparados
+            for funcao in operacoes[versao].values():
+                for _ in range(10):
+                    funcao()
+        for _ in range(0, repeticoes, rodada):
+            for versao in bancos:
+                for nome, funcao in operacoes[versao].items():
+                    lista = amostras[versao].setdefault(nome, [])
+                    for _ in range(rodada):
+                        inicio = time.perf_counter()
+                        funcao()
+                        lista.append(time.perf_counter() - inicio)
+
+    resultados = {}
+    for versao, por_operacao in amostras.items():
+        resultados[versao] = {nome: resumir(lista) for nome, lista in por_operacao.items()}
+    for nome in resultados["sem_preparo"]:
+        sem, com = resultados["sem_preparo"][nome], resultados["com_preparo"][nome]
+        ganho = 1 - com["p50_ms"] / sem["p50_ms"] if sem["p50_ms"] else 0.0
+        print(f"  {nome:<28} sem preparo p50={sem['p50_ms']:7.3f} ms p99={sem['p99_ms']:7.3f} ms   "
+              f"com preparo p50={com['p50_ms']:7.3f} ms p99={com['p99_ms']:7.3f} ms   ({ganho:+.0%})")
+    return resultados
+
+
+def medir_planejamento(db: BancoDadosUtils, semente: int) -> dict:
+    """Planning Time (ms) de cada comando como texto e como comando preparado, dentro de transações desfeitas."""
+    sorteio = random.Random(semente)
+    paciente_id, cpf = _consultar_db(db, "SELECT id, cpf FROM pacientes LIMIT 1")
+    parametros = {
+        "inserir_paciente": ("Paciente Plano", f"7{sorteio.randrange(10 ** 10):010d}", date(1990, 1, 1)),
+        "id_paciente_por_cpf": (cpf,),
+        "inserir_triagem": (paciente_id, "relato", "Comum", "benchmark"),
+        "registrar_atendimento": ("Paciente Plano", cpf, date(1990, 1, 1), "relato", "Comum", "benchmark"),
+        "registrar_atendimento_idempotente": parametros_atendimento_idempotente(
+            "Paciente Plano", cpf, date(1990, 1, 1), "relato", "Comum", "benchmark", "chave-plano"),
+        "buscar_chave_idempotencia": ("chave-plano",),
+        "buscar_paciente_por_cpf": (cpf,),
+        "buscar_triagens_paciente": (paciente_id,),
+    }
+    # Instância própria: 'db' executa o texto das consultas, estes comandos só existem para a medição
+    comandos = ComandosPreparados(True)
+    resultados = {}
+    with db._conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            for nome, (sql, _) in COMANDOS.items():
+                tempos = {}
+                for versao, texto in (("texto", sql), ("preparado", comandos._execute[nome])):
+                    # Mais de 5 execuções: o PostgreSQL passa a usar o plano genérico guardado
+                    for _ in range(7):
+                        if versao == "preparado":
+                            comandos.executar(cursor, nome, parametros[nome])  # prepara na primeira vez
+                            conn.rollback()
+                        cursor.execute("EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) " + texto, parametros[nome])
+                        plano = cursor.fetchone()[0]
+                        plano = json.loads(plano) if isinstance(plano, str) else plano
+                        conn.rollback()
+                    tempos[versao] = plano[0]["Planning Time"]
+                resultados[nome] = tempos
+                print(f"  {nome:<36} planejamento: texto {tempos['texto']:7.3f} ms   preparado {tempos['preparado']:7.3f} ms")
+        finally:
+            conn.rollback()
+            cursor.close()
+    return resultados
+
+
+def executar(escala: str, repeticoes: int, semente: int, permitir_remoto: bool = False) -> dict:
+    base = preparar_banco(escala, permitir_remoto)
+    try:
+        popular(base, ESCALAS[escala], random.Random(semente))
+    finally:
+        base.fechar()
+
+    with _silencioso():
+        bancos = {
+            "sem_preparo": BancoDadosUtils(comandos_preparados=False, cache_pacientes=False),
+            "com_preparo": BancoDadosUtils(comandos_preparados=True, cache_pacientes=False),
+        }
+    try:
+        print(f"Escala {escala} ({ESCALAS[escala]:,} triagens), {repeticoes} chamadas por operação:")
+        resultados = {"carga": medir_carga(bancos, repeticoes, semente)}
+        print("Tempo de planejamento no servidor por chamada:")
+        resultados["planejamento_ms"] = medir_planejamento(bancos["sem_preparo"], semente)
+        return {escala: resultados}
+    finally:
+        for db in bancos.values():
+            db.fechar()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=list(ESCALAS), default="10k")
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--permitir-remoto", action="store_true")
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    resultados = executar(args.escala, args.repeticoes, args.semente, args.permitir_remoto)
+    salvar_resultados("comandos_preparados", resultados, args.saida)
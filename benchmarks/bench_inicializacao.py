@@ -0,0 +1,122 @@
+# Benchmark da Inicialização da Aplicação
+
+"""
+Mede o custo de uma inicialização a frio (como a de um quiosque recém-ligado),
+sempre em processos Python novos, sem módulos já carregados:
+
+- importacao: tempo de importação de cada módulo da aplicação e quais
+  dependências pesadas (psycopg2, pandas, dotenv, multiprocessing) ele carrega;
+- primeira_pagina: tempo até o Streamlit renderizar o formulário de boas-vindas
+  (streamlit.testing.v1.AppTest), separado da importação do próprio Streamlit.
+
+Com --comparar, os p50 são confrontados com um resultado anterior e o script
+termina com código 1 se algum piorar além da tolerância.
+
+Uso:
+    python benchmarks/bench_inicializacao.py [--repeticoes 10] [--saida atual.json]
+    python benchmarks/bench_inicializacao.py --comparar base.json [--tolerancia 0.25]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from comum import SRC_DIR, comparar_resultados, resumir, salvar_resultados
+
+MODULOS = ["banco_dados.config", "banco_dados.banco_dados_utils", "triagem.triagem_ia"]
+DEPENDENCIAS_PESADAS = ["psycopg2", "pandas", "dotenv", "multiprocessing"]
+MAIN_APP = os.path.join(SRC_DIR, "interface", "main_app.py")
+
+_SCRIPT_IMPORTACAO = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"segundos": duracao, "carregados": [m for m in {pesadas!r} if m in sys.modules]}}))
+"""
+
+_SCRIPT_PAGINA = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+importacao = time.perf_counter() - inicio
+inicio = time.perf_counter()
+app = AppTest.from_file({app!r}, default_timeout=120).run()
+renderizacao = time.perf_counter() - inicio
+cabecalhos = [h.value for h in app.header]
+print(json.dumps({{
+    "importacao_streamlit": importacao,
+    "renderizacao": renderizacao,
+    "ok": not app.exception and "Bem-vindo(a)!" in cabecalhos,
+    "carregados": [m for m in {pesadas!r} if m in sys.modules],
+}}))
+"""
+
+
+def _executar_processo(script: str) -> dict:
+    """Roda o script em um interpretador novo e devolve o JSON impresso por ele."""
+    inicio = time.perf_counter()
+    saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+    resultado["processo"] = time.perf_counter() - inicio
+    return resultado
+
+
+def medir_importacoes(repeticoes: int) -> dict:
+    resultados = {}
+    for modulo in MODULOS:
+        script = _SCRIPT_IMPORTACAO.format(src=SRC_DIR, modulo=modulo, pesadas=DEPENDENCIAS_PESADAS)
+        execucoes = [_executar_processo(script) for _ in range(repeticoes)]
+        resultados[modulo] = {
+            **resumir([e["segundos"] for e in execucoes]),
+            "carrega": execucoes[-1]["carregados"],
+        }
+        print(f"importar {modulo:<32} p50={resultados[modulo]['p50_ms']:7.1f} ms  carrega={resultados[modulo]['carrega']}")
+    return resultados
+
+
+def medir_primeira_pagina(repeticoes: int) -> dict:
+    try:
+        import streamlit.testing.v1  # noqa: F401
+    except ImportError:
+        print("Streamlit (com streamlit.testing) não instalado: medição da primeira página ignorada.")
+        return {}
+
+    script = _SCRIPT_PAGINA.format(app=MAIN_APP, pesadas=DEPENDENCIAS_PESADAS)
+    execucoes = [_executar_processo(script) for _ in range(repeticoes)]
+    resultados = {
+        "importacao_streamlit": resumir([e["importacao_streamlit"] for e in execucoes]),
+        "renderizacao": resumir([e["renderizacao"] for e in execucoes]),
+        "processo_total": resumir([e["processo"] for e in execucoes]),
+        "renderizou_boas_vindas": all(e["ok"] for e in execucoes),
+        "carrega": execucoes[-1]["carregados"],
+    }
+    print(f"primeira página: renderização p50={resultados['renderizacao']['p50_ms']:.1f} ms, "
+          f"processo p50={resultados['processo_total']['p50_ms']:.1f} ms, "
+          f"boas-vindas={'sim' if resultados['renderizou_boas_vindas'] else 'NÃO'}, carrega={resultados['carrega']}")
+    return resultados
+
+
+def executar(repeticoes: int) -> dict:
+    return {
+        "importacao": medir_importacoes(repeticoes),
+        "primeira_pagina": medir_primeira_pagina(repeticoes),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    parser.add_argument("--comparar", help="Resultado anterior (JSON) usado como referência")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora relativa aceita no p50 (padrão: 0.25)")
+    args = parser.parse_args()
+
+    documento = salvar_resultados("inicializacao", executar(args.repeticoes), args.saida)
+
+    if args.comparar and not comparar_resultados(documento, args.comparar, {"p50_ms": args.tolerancia}):
+        sys.exit(1)
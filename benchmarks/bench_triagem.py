@@ -0,0 +1,92 @@
+# Benchmark da Classificação de Prioridade da Triagem
+
+"""
+Mede a latência de TriagemIA.classificar_prioridade, chamada a chamada, sobre
+corpora sintéticos com textos de tamanhos diferentes (curto, médio, longo) e
+bases de regras de tamanhos diferentes (1x, 10x, 100x as regras originais).
+Cada combinação é medida sem cache (custo da classificação) e com o cache LRU
+padrão (uso normal, em que os relatos se repetem).
+
+Uso:
+    python benchmarks/bench_triagem.py [--escalas 1 10 100] [--textos 2000] [--saida resultado.json]
+"""
+
+import argparse
+import random
+import time
+
+from comum import resumir, salvar_resultados
+from bench_triagem_automato import FRASES, gerar_regras
+
+from triagem.triagem_ia import TriagemIA
+
+# Quantidade aproximada de caracteres de cada corpus
+TAMANHOS_TEXTO = {"curto": 40, "medio": 300, "longo": 3000}
+
+
+def gerar_corpus(regras: dict, quantidade: int, tamanho: int, sorteio: random.Random) -> list:
+    """Relatos com cerca de 'tamanho' caracteres; 30% contêm uma palavra-chave, em posição aleatória."""
+    todas = [palavra for palavras in regras.values() for palavra in palavras]
+    textos = []
+    for _ in range(quantidade):
+        partes = []
+        while sum(len(parte) + 1 for parte in partes) < tamanho:
+            partes.append(sorteio.choice(FRASES))
+        if sorteio.random() < 0.3:
+            partes.insert(sorteio.randrange(len(partes) + 1), sorteio.choice(todas))
+        textos.append(" ".join(partes))
+    return textos
+
+
+def medir_chamadas(triagem: TriagemIA, textos: list) -> list:
+    """Duração de cada chamada, em segundos (após uma passada de aquecimento)."""
+    for texto in textos[:100]:
+        triagem.classificar_prioridade(texto)
+    amostras = []
+    for texto in textos:
+        inicio = time.perf_counter()
+        triagem.classificar_prioridade(texto)
+        amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+
+def executar(escalas, quantidade_textos, semente) -> dict:
+    sorteio = random.Random(semente)
+    base = TriagemIA().regras_triagem
+    resultados = {}
+
+    for escala in escalas:
+        regras = gerar_regras(base, escala, sorteio)
+        for nome_tamanho, tamanho in TAMANHOS_TEXTO.items():
+            # Relatos repetidos em 1/4 das chamadas, como em uma fila real
+            unicos = gerar_corpus(regras, quantidade_textos, tamanho, sorteio)
+            textos = [sorteio.choice(unicos) if sorteio.random() < 0.25 else texto for texto in unicos]
+
+            sem_cache = TriagemIA(tamanho_cache=0)
+            sem_cache.regras_triagem = regras
+            com_cache = TriagemIA()
+            com_cache.regras_triagem = regras
+
+            chave = f"regras_{escala}x/{nome_tamanho}"
+            resultados[chave] = {
+                "regras": sum(len(palavras) for palavras in regras.values()),
+                "caracteres_medios": sum(map(len, textos)) / len(textos),
+                "sem_cache": resumir(medir_chamadas(sem_cache, textos)),
+                "com_cache": resumir(medir_chamadas(com_cache, textos)),
+            }
+            print(f"{chave:<22} sem_cache p50={resultados[chave]['sem_cache']['p50_ms'] * 1000:8.1f} us "
+                  f"p99={resultados[chave]['sem_cache']['p99_ms'] * 1000:8.1f} us | "
+                  f"com_cache p50={resultados[chave]['com_cache']['p50_ms'] * 1000:6.1f} us")
+
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--textos", type=int, default=2000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    salvar_resultados("triagem", executar(args.escalas, args.textos, args.semente), args.saida)
@@ -0,0 +1,133 @@
+# Benchmark do Autômato de Palavras-Chave da Triagem
+
+"""
+Compara a classificação de prioridade com o autômato de Aho-Corasick contra a
+varredura sequencial original (um 'in' por palavra-chave), com a base de regras
+multiplicada por 1x, 10x, 100x e 1000x. A coluna 'automato' mede a classificação
+com o cache desativado; 'com_cache' mede o uso normal, em que os textos se repetem.
+
+Uso:
+    python benchmarks/bench_triagem_automato.py [--escalas 1 10 100 1000] [--textos 2000] [--saida resultado.json]
+"""
+
+import argparse
+import random
+import time
+
+from comum import medir, resumir, salvar_resultados
+
+from triagem.triagem_ia import NIVEIS_TRIAGEM, TriagemIA, normalizar_texto
+
+SILABAS = ["ca", "be", "do", "ra", "ti", "no", "se", "lu", "ma", "pe", "qui", "vo", "zu", "fe", "gra", "ção", "ções", "lhe"]
+
+FRASES = [
+    "estou com dor no peito intensa desde ontem",
+    "tenho febre alta persistente e calafrios",
+    "minha dor de cabeça forte não passa",
+    "acho que é só um resfriado leve com coriza",
+    "vim para consulta de rotina e retorno",
+    "me sinto um pouco enjoado depois do almoço",
+    "machuquei o braço jogando bola, dor moderada",
+    "tive um desmaio rápido no trabalho",
+]
+
+
+def classificar_legado(regras: dict, sintomas_texto: str):
+    """Varredura sequencial original, mantida aqui como referência."""
+    sintomas_lower = sintomas_texto.lower()
+    for chave, prioridade, modelo in NIVEIS_TRIAGEM:
+        for palavra_chave in regras[chave]:
+            if palavra_chave in sintomas_lower:
+                return prioridade, modelo.format(palavra_chave)
+    return "Comum", "Nenhum sintoma de alta prioridade identificado explicitamente. Classificado como comum para avaliação médica."
+
+
+def palavra_sintetica(sorteio: random.Random) -> str:
+    partes = [
+        "".join(sorteio.choice(SILABAS) for _ in range(sorteio.randint(2, 4)))
+        for _ in range(sorteio.randint(2, 3))
+    ]
+    return " ".join(partes)
+
+
+def gerar_regras(base: dict, escala: int, sorteio: random.Random) -> dict:
+    """Multiplica cada nível de regras por 'escala' com palavras-chave sintéticas."""
+    regras = {}
+    for chave, palavras in base.items():
+        extras = [palavra_sintetica(sorteio) for _ in range(len(palavras) * (escala - 1))]
+        # As regras reais ficam no fim para que a varredura sequencial pague o custo todo
+        regras[chave] = extras + list(palavras)
+    return regras
+
+
+def gerar_textos(regras: dict, quantidade: int, sorteio: random.Random) -> list:
+    """Frases de sintomas, parte delas contendo palavras-chave sintéticas."""
+    todas = [palavra for palavras in regras.values() for palavra in palavras]
+    textos = []
+    for _ in range(quantidade):
+        texto = sorteio.choice(FRASES)
+        if sorteio.random() < 0.3:
+            texto = f"{texto} e também {sorteio.choice(todas)}"
+        textos.append(texto)
+    return textos
+
+
+def executar(escalas, quantidade_textos, semente):
+    sorteio = random.Random(semente)
+    base = TriagemIA().regras_triagem
+    resultados = {}
+
+    for escala in escalas:
+        regras = gerar_regras(base, escala, sorteio)
+        textos = gerar_textos(regras, quantidade_textos, sorteio)
+        total_regras = sum(len(palavras) for palavras in regras.values())
+
+        triagem = TriagemIA(tamanho_cache=0)
+        inicio = time.perf_counter()
+        triagem.regras_triagem = regras
+        triagem.recompilar_regras()
+        compilacao_ms = (time.perf_counter() - inicio) * 1000
+
+        # A triagem compara textos normalizados; a referência recebe as mesmas entradas normalizadas
+        regras_normalizadas = {chave: [normalizar_texto(p) for p in palavras] for chave, palavras in regras.items()}
+        divergencias = sum(
+            triagem.classificar_prioridade(texto)[0]
+            != classificar_legado(regras_normalizadas, normalizar_texto(texto))[0]
+            for texto in textos
+        )
+
+        com_cache = TriagemIA()
+        com_cache.regras_triagem = regras
+
+        legado = medir(lambda: [classificar_legado(regras, texto) for texto in textos], repeticoes=5, aquecimento=1)
+        automato = medir(lambda: [triagem.classificar_prioridade(texto) for texto in textos], repeticoes=5, aquecimento=1)
+        cache = medir(lambda: [com_cache.classificar_prioridade(texto) for texto in textos], repeticoes=5, aquecimento=1)
+
+        por_texto = lambda amostras: [a / len(textos) for a in amostras]
+        resultados[f"{escala}x"] = {
+            "regras": total_regras,
+            "textos": len(textos),
+            "divergencias": divergencias,
+            "compilacao_ms": compilacao_ms,
+            "legado_por_texto": resumir(por_texto(legado)),
+            "automato_por_texto": resumir(por_texto(automato)),
+            "com_cache_por_texto": resumir(por_texto(cache)),
+            "cache": com_cache.estatisticas_cache(),
+            "aceleracao_p50": resumir(legado)["p50_ms"] / resumir(automato)["p50_ms"],
+        }
+        print(f"{escala:>5}x  regras={total_regras:>6}  legado={resumir(legado)['p50_ms'] / len(textos) * 1000:9.2f} us/texto  "
+              f"automato={resumir(automato)['p50_ms'] / len(textos) * 1000:7.2f} us/texto  "
+              f"com_cache={resumir(cache)['p50_ms'] / len(textos) * 1000:6.2f} us/texto  divergencias={divergencias}")
+
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--textos", type=int, default=2000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    salvar_resultados("triagem_automato", executar(args.escalas, args.textos, args.semente), args.saida)
@@ -0,0 +1,191 @@
+# Benchmark da Classificação em Lote da Triagem
+
+"""
+Mede a vazão (textos por segundo) de TriagemIA.classificar_lote para cada
+quantidade de processos, com a base de regras original ou ampliada.
+
+Com --custos, mede também os componentes de custo que definem os padrões de
+classificar_lote e estima a vazão e o ponto de equilíbrio para cada quantidade
+de processos:
+  - classificação no próprio processo (µs por texto);
+  - criação do pool, com a cópia das regras para cada processo (ms);
+  - serialização dos blocos e resultados, no processo principal (serial) e nos
+    processos do pool (µs por texto);
+  - vazão com um único processo no pool para cada tamanho de bloco, que mostra
+    o custo fixo de cada bloco enviado.
+As linhas com mais processos que núcleos não medem ganho de paralelismo; nessa
+situação as estimativas (marcadas como tal na saída) são a referência.
+
+Uso:
+    python benchmarks/bench_triagem_lote.py [--textos 200000] [--processos 1 2 4] [--escala 1] [--saida resultado.json]
+    python benchmarks/bench_triagem_lote.py --custos [--escala 1] [--blocos 500 1000 5000 20000] [--repeticoes 5]
+"""
+
+import argparse
+import os
+import pickle
+import random
+import time
+
+from comum import medir, percentil, salvar_resultados
+from bench_triagem_automato import gerar_regras, gerar_textos
+
+from triagem.triagem_ia import TriagemIA, _blocos, _classificar_bloco, _inicializar_processo
+
+
+def executar(quantidade_textos, lista_processos, escala, tamanho_bloco, semente):
+    sorteio = random.Random(semente)
+    triagem = TriagemIA()
+    triagem.regras_triagem = gerar_regras(triagem.regras_triagem, escala, sorteio)
+    textos = gerar_textos(triagem.regras_triagem, quantidade_textos, sorteio)
+    resultados = {}
+    triagem.classificar_lote(textos[:100], processos=1)  # importa o pandas fora da medição
+
+    for processos in lista_processos:
+        inicio = time.perf_counter()
+        # limiar_paralelo=0 força o pool mesmo com 1 processo, para medir seu custo fixo
+        triagem.classificar_lote(textos, processos=processos, tamanho_bloco=tamanho_bloco,
+                                 limiar_paralelo=0 if processos > 1 else len(textos) + 1)
+        duracao = time.perf_counter() - inicio
+        resultados[f"{processos}_processos"] = {
+            "textos": len(textos),
+            "segundos": duracao,
+            "textos_por_segundo": len(textos) / duracao,
+        }
+        print(f"{processos:>3} processo(s): {len(textos) / duracao:12,.0f} textos/s")
+
+    return resultados
+
+
+def nucleos_disponiveis():
+    """Núcleos que este processo pode usar (afinidade de CPU, quando o sistema informa)."""
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+def _iniciar_pool(regras, processos):
+    """Cria o pool e espera todos os processos ficarem prontos com as regras."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo,
+                             initargs=(regras,)) as executor:
+        list(executor.map(_classificar_bloco, [["aquecimento"]] * processos))
+
+
+def _serializar(blocos, classificados, lado):
+    """Serializa blocos e resultados como o pool faz, do lado do processo principal ou do pool."""
+    for bloco in blocos:
+        if lado == "principal":
+            pickle.dumps(bloco, pickle.HIGHEST_PROTOCOL)
+            pickle.loads(pickle.dumps(classificados[:len(bloco)], pickle.HIGHEST_PROTOCOL))
+        else:
+            pickle.loads(pickle.dumps(bloco, pickle.HIGHEST_PROTOCOL))
+            pickle.dumps(classificados[:len(bloco)], pickle.HIGHEST_PROTOCOL)
+
+
+def medir_custos(quantidade_textos, lista_processos, escala, blocos, tamanho_bloco, repeticoes, semente):
+    """
+    Mede os componentes de custo de classificar_lote e estima, a partir deles, a
+    vazão e o ponto de equilíbrio com o processamento no próprio processo.
+
+    Args:
+        quantidade_textos: Quantidade de textos sintéticos
+        lista_processos: Quantidades de processos a estimar
+        escala: Multiplicador da base de regras
+        blocos: Tamanhos de bloco a medir
+        tamanho_bloco: Tamanho de bloco usado nas estimativas
+        repeticoes: Repetições de cada medição (vale a mediana)
+        semente: Semente dos dados sintéticos
+
+    Returns:
+        dict: Custos medidos e estimativas por quantidade de processos
+    """
+    sorteio = random.Random(semente)
+    triagem = TriagemIA()
+    triagem.regras_triagem = gerar_regras(triagem.regras_triagem, escala, sorteio)
+    textos = gerar_textos(triagem.regras_triagem, quantidade_textos, sorteio)
+    total = len(textos)
+    classificados = [triagem.classificar_prioridade(texto) for texto in textos]
+    mediana = lambda funcao, aquecimento=0: percentil(medir(funcao, repeticoes, aquecimento), 50)
+
+    # Mesmo caminho de classificar_lote abaixo do limiar, começando como os processos do pool: cache vazio
+    def em_processo():
+        triagem.recompilar_regras()
+        triagem.classificar_lote(textos, processos=1)
+
+    em_processo_us = mediana(em_processo, aquecimento=1) / total * 1e6
+    inicio_pool_ms = {n: mediana(lambda: _iniciar_pool(triagem.regras_triagem, n)) * 1000
+                      for n in sorted(set(lista_processos) | {1})}
+
+    por_bloco = {}
+    for tamanho in sorted(set(blocos) | {tamanho_bloco}):
+        divididos = list(_blocos(textos, tamanho))
+        principal_us = mediana(lambda: _serializar(divididos, classificados, "principal")) / total * 1e6
+        processo_us = mediana(lambda: _serializar(divididos, classificados, "processo")) / total * 1e6
+        # Pool de 1 processo, sem a criação do pool: classificação, serialização e custo fixo por bloco
+        pool_1 = mediana(lambda: triagem.classificar_lote(textos, processos=1, tamanho_bloco=tamanho,
+                                                           limiar_paralelo=0))
+        pool_1_us = (pool_1 * 1000 - inicio_pool_ms[1]) / total * 1000
+
+        por_bloco[tamanho] = {
+            "serial_principal_us_por_texto": principal_us,
+            "serializacao_processo_us_por_texto": processo_us,
+            "pool_1_processo_us_por_texto": pool_1_us,
+        }
+        print(f"  bloco {tamanho:>6}: serial no principal {principal_us:5.2f} us/texto  "
+              f"serialização no processo {processo_us:5.2f} us/texto  pool de 1 processo {pool_1_us:6.2f} us/texto")
+
+    # Estimativa: a parte serial fica no processo principal, o resto se divide entre os processos
+    estimativas = {}
+    serial = por_bloco[tamanho_bloco]["serial_principal_us_por_texto"]
+    paralelo = por_bloco[tamanho_bloco]["pool_1_processo_us_por_texto"] - serial
+    for n in lista_processos:
+        por_texto = serial + paralelo / n
+        segundos = inicio_pool_ms[n] / 1000 + total * por_texto / 1e6
+        ganho = em_processo_us - por_texto
+        limiar = round(inicio_pool_ms[n] * 1000 / ganho) if ganho > 0 else None
+        estimativas[f"{n}_processos"] = {
+            "estimativa_textos_por_segundo": total / segundos,
+            "estimativa_limiar_equilibrio": limiar,
+        }
+        print(f"  {n:>3} processo(s): pool criado em {inicio_pool_ms[n]:6.0f} ms  "
+              f"estimativa {total / segundos:10,.0f} textos/s  equilíbrio em ~{limiar or '-'} textos")
+
+    if max(lista_processos) > nucleos_disponiveis():
+        print(f"  (só {nucleos_disponiveis()} núcleo(s): a criação de pools maiores é medida em série e superestimada)")
+    print(f"  no próprio processo: {em_processo_us:.2f} us/texto ({1e6 / em_processo_us:,.0f} textos/s)")
+    return {
+        "textos": total,
+        "em_processo_us_por_texto": em_processo_us,
+        "inicio_pool_ms": {str(n): ms for n, ms in inicio_pool_ms.items()},
+        "por_bloco": {str(tamanho): custos for tamanho, custos in por_bloco.items()},
+        **estimativas,
+    }
+
+
+if __name__ == '__main__':
+    nucleos = nucleos_disponiveis()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--textos", type=int, default=200000)
+    parser.add_argument("--processos", type=int, nargs="+",
+                        default=sorted({1, 2, 4, nucleos} - {n for n in (2, 4) if n > nucleos}))
+    parser.add_argument("--escala", type=int, default=1, help="Multiplicador da base de regras")
+    parser.add_argument("--bloco", type=int, default=5000)
+    parser.add_argument("--custos", action="store_true",
+                        help="Mede os componentes de custo e estima a vazão por quantidade de processos")
+    parser.add_argument("--blocos", type=int, nargs="+", default=[500, 1000, 5000, 20000],
+                        help="Tamanhos de bloco medidos com --custos")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições de cada medição com --custos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    if args.custos:
+        processos = sorted(set(args.processos) | {1, 2, 4})
+        resultados = {"custos": medir_custos(args.textos, processos, args.escala, args.blocos,
+                                               args.bloco, args.repeticoes, args.semente)}
+    else:
+        if max(args.processos) > nucleos:
+            print(f"Aviso: só {nucleos} núcleo(s) disponível(is); linhas com mais processos não medem "
+                  "ganho de paralelismo (use --custos para as estimativas).")
+        resultados = executar(args.textos, args.processos, args.escala, args.bloco, args.semente)
+    salvar_resultados("triagem_lote", {"escala_regras": args.escala, "nucleos": nucleos, **resultados}, args.saida)
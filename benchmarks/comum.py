@@ -0,0 +1,153 @@
+# Utilitários Comuns dos Benchmarks
+
+"""
+Funções compartilhadas pelos scripts de benchmark: medição de tempo,
+percentis, dados do ambiente, gravação dos resultados em JSON e comparação
+com um resultado anterior.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Adicionar o diretório src ao sys.path para permitir importações dos módulos
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+
+def medir(funcao: Callable, repeticoes: int, aquecimento: int = 0) -> List[float]:
+    """Executa a função várias vezes e retorna a duração de cada chamada, em segundos."""
+    for _ in range(aquecimento):
+        funcao()
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+
+def percentil(amostras: List[float], p: float) -> float:
+    """Percentil p (0-100) por interpolação linear entre as amostras ordenadas."""
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return 0.0
+    posicao = (len(ordenadas) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenadas) - 1)
+    return ordenadas[inferior] + (ordenadas[superior] - ordenadas[inferior]) * (posicao - inferior)
+
+
+def resumir(amostras: List[float]) -> Dict:
+    """Resume as amostras (em segundos) em milissegundos."""
+    return {
+        "n": len(amostras),
+        "media_ms": sum(amostras) / len(amostras) * 1000 if amostras else 0.0,
+        "p50_ms": percentil(amostras, 50) * 1000,
+        "p90_ms": percentil(amostras, 90) * 1000,
+        "p99_ms": percentil(amostras, 99) * 1000,
+        "min_ms": min(amostras) * 1000 if amostras else 0.0,
+        "max_ms": max(amostras) * 1000 if amostras else 0.0,
+    }
+
+
+def calibrar(repeticoes: int = 5) -> float:
+    """
+    Mediana, em milissegundos, de uma carga fixa de CPU em Python puro. Serve para
+    descontar, na comparação entre execuções, a diferença de velocidade da máquina.
+    """
+    def carga():
+        total = 0
+        for i in range(1_000_000):
+            total += i * i % 7
+        return total
+    return percentil(medir(carga, repeticoes, aquecimento=1), 50) * 1000
+
+
+def ambiente() -> Dict:
+    """Descreve a máquina em que o benchmark rodou, para comparar resultados."""
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+        "calibracao_ms": calibrar(),
+    }
+
+
+def salvar_resultados(nome: str, resultados: Dict, caminho: str = None):
+    """Imprime os resultados e, se indicado, grava-os em um arquivo JSON."""
+    documento = {
+        "benchmark": nome,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ambiente": ambiente(),
+        "resultados": resultados,
+    }
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    if caminho:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+        print(f"Resultados gravados em {caminho}")
+    else:
+        print(texto)
+    return documento
+
+
+def achatar_percentis(resultados: Dict, campos=("p50_ms", "p99_ms"), prefixo: str = "") -> Dict[str, float]:
+    """Achata resultados aninhados em {"caminho/da/medida:campo": valor} para os percentis indicados."""
+    valores = {}
+    for chave, valor in resultados.items():
+        if not isinstance(valor, dict):
+            continue
+        if any(campo in valor for campo in campos):
+            for campo in campos:
+                if campo in valor:
+                    valores[f"{prefixo}{chave}:{campo}"] = valor[campo]
+        else:
+            valores.update(achatar_percentis(valor, campos, f"{prefixo}{chave}/"))
+    return valores
+
+
+def comparar_resultados(atual: Dict, caminho_base: str, tolerancias: Optional[Dict[str, float]] = None,
+                        folga_ms: float = 0.05, normalizar: bool = True) -> bool:
+    """
+    Compara os percentis de 'atual' (o documento devolvido por salvar_resultados)
+    com os de um JSON gravado anteriormente. Medidas ausentes em um dos lados são
+    ignoradas. Retorna False se alguma piorou além da tolerância relativa do seu
+    percentil e também além de 'folga_ms' em valor absoluto (evita alarmes em
+    medidas de microssegundos).
+
+    Args:
+        atual: Documento da execução atual
+        caminho_base: Arquivo JSON de referência
+        tolerancias: Piora relativa aceita por percentil (padrão: p50 25%, p99 50%)
+        folga_ms: Piora absoluta sempre aceita, em milissegundos
+        normalizar: Ajusta a referência pela razão entre as calibrações das duas máquinas
+    """
+    tolerancias = tolerancias or {"p50_ms": 0.25, "p99_ms": 0.50}
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        documento_base = json.load(arquivo)
+    base = achatar_percentis(documento_base["resultados"], tuple(tolerancias))
+
+    fator = 1.0
+    calibracao_base = documento_base.get("ambiente", {}).get("calibracao_ms")
+    calibracao_atual = atual.get("ambiente", {}).get("calibracao_ms")
+    if normalizar and calibracao_base and calibracao_atual:
+        fator = calibracao_atual / calibracao_base
+        print(f"Referência ajustada pela velocidade da máquina: x{fator:.2f}")
+
+    ok = True
+    for medida, valor in achatar_percentis(atual["resultados"], tuple(tolerancias)).items():
+        if medida not in base:
+            continue
+        referencia = base[medida] * fator
+        variacao = (valor - referencia) / referencia if referencia else 0.0
+        campo = medida.rsplit(":", 1)[1]
+        piorou = variacao > tolerancias[campo] and valor - referencia > folga_ms
+        ok = ok and not piorou
+        print(f"{'PIOROU' if piorou else 'ok':>6}  {medida:<70} {referencia:10.3f} -> {valor:10.3f} ms ({variacao:+.0%})")
+    return ok
@@ -0,0 +1,68 @@
+# Suíte de Benchmarks
+
+"""
+Roda os benchmarks de referência em sequência e grava um único JSON com todos os
+resultados, comparável entre versões:
+
+- triagem: latência de classificar_prioridade por tamanho de texto e de base de regras;
+- banco_dados: latência de cada operação do BancoDadosUtils em um PostgreSQL local;
+- inicializacao: importações e primeira página do Streamlit (opcional).
+
+Com --comparar, os p50/p99 são confrontados com um resultado anterior e o script
+termina com código 1 se algum piorar além da tolerância (para barrar uma versão).
+
+Uso:
+    python benchmarks/executar_suite.py --saida base.json
+    python benchmarks/executar_suite.py --comparar base.json [--tolerancia-p50 0.25] [--tolerancia-p99 0.5]
+"""
+
+import argparse
+import sys
+
+from comum import comparar_resultados, salvar_resultados
+
+import bench_banco_dados
+import bench_inicializacao
+import bench_triagem
+
+COMPONENTES = ["triagem", "banco_dados", "inicializacao"]
+
+
+def executar(componentes, escalas, repeticoes: int, semente: int, permitir_remoto: bool) -> dict:
+    resultados = {}
+    if "triagem" in componentes:
+        print("== triagem ==")
+        resultados["triagem"] = bench_triagem.executar([1, 10, 100], max(repeticoes * 10, 500), semente)
+    if "banco_dados" in componentes:
+        print("== banco_dados ==")
+        resultados["banco_dados"] = bench_banco_dados.executar(
+            escalas, repeticoes, semente, com_reconstrucao=True, permitir_remoto=permitir_remoto
+        )
+    if "inicializacao" in componentes:
+        print("== inicializacao ==")
+        resultados["inicializacao"] = bench_inicializacao.executar(max(repeticoes // 20, 5))
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--componentes", nargs="+", choices=COMPONENTES, default=["triagem", "banco_dados"])
+    parser.add_argument("--escalas", nargs="+", choices=list(bench_banco_dados.ESCALAS), default=["10k"])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--permitir-remoto", action="store_true")
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    parser.add_argument("--comparar", help="Resultado anterior (JSON) usado como referência")
+    parser.add_argument("--tolerancia-p50", type=float, default=0.25)
+    parser.add_argument("--tolerancia-p99", type=float, default=0.50)
+    args = parser.parse_args()
+
+    resultados = executar(args.componentes, args.escalas, args.repeticoes, args.semente, args.permitir_remoto)
+    documento = salvar_resultados("suite", resultados, args.saida)
+
+    if args.comparar:
+        tolerancias = {"p50_ms": args.tolerancia_p50, "p99_ms": args.tolerancia_p99}
+        if not comparar_resultados(documento, args.comparar, tolerancias):
+            print("Há regressões além da tolerância.")
+            sys.exit(1)
+        print("Nenhuma regressão além da tolerância.")
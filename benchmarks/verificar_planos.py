@@ -0,0 +1,184 @@
+# Verificação dos Planos de Execução das Consultas
+
+"""
+Executa EXPLAIN (ANALYZE, BUFFERS) para cada consulta do BancoDadosUtils sobre o
+banco sintético dos benchmarks (posto_saude_bench_<escala>, criado e populado
+por bench_banco_dados na primeira execução) e termina com código 1 se alguma
+delas ler uma tabela grande por Seq Scan: sinal de que um índice sumiu ou de que
+a consulta deixou de usá-lo.
+
+Tabelas com menos de --linhas-minimas linhas estimadas (partições de meses quase
+vazios, por exemplo) podem ser lidas por Seq Scan: nelas é o plano mais barato.
+As poucas consultas que por natureza leem boa parte de uma tabela grande estão em
+SEQ_SCAN_ACEITO, com o motivo; o Seq Scan delas é mostrado, mas não falha.
+As gravações são executadas dentro de uma transação desfeita em seguida.
+
+A sessão usa random_page_cost = 1.1, o valor recomendado para o servidor (SSD;
+ver o README): com o padrão (4), a fila por prioridade lê pacientes por Seq Scan.
+
+Uso:
+    python benchmarks/verificar_planos.py [--escala 10k] [--linhas-minimas 1000] [--mostrar-planos]
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from bench_banco_dados import ESCALAS, popular, preparar_banco
+
+from banco_dados.consultas import (
+    SQL_BUSCAR_CHAVE_IDEMPOTENCIA,
+    SQL_CHAMADAS_FILA_DESDE,
+    SQL_BUSCAR_PACIENTE_POR_CPF,
+    SQL_BUSCAR_TRIAGENS_PACIENTE,
+    SQL_ID_PACIENTE_POR_CPF,
+    SQL_REGISTRAR_ATENDIMENTO,
+    SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE,
+    codificar_cursor,
+    consulta_estatisticas_triagens,
+    consulta_fila,
+    consulta_triagens_desde,
+    consulta_triagens_paciente,
+    parametros_atendimento_idempotente,
+)
+
+# Custo de leitura aleatória recomendado para o servidor (README, seção 2)
+RANDOM_PAGE_COST = 1.1
+
+# Consulta -> (tabelas que ela pode ler por Seq Scan, motivo)
+SEQ_SCAN_ACEITO = {
+    # No banco de 1M, a prioridade Emergência tem ~21 mil pacientes (4% de pacientes). Ler
+    # pacientes inteira e juntar por hash (~27 mil blocos, ~200 ms) custa o mesmo que uma
+    # busca pela chave primária por paciente (~108 mil blocos, ~165 ms), e o planejador
+    # alterna entre os dois planos conforme as estatísticas. As versões paginadas, usadas
+    # pela aplicação, continuam verificadas abaixo.
+    "listar_pacientes_por_prioridade_emergencia": (
+        {"pacientes"}, "lista sem paginação uma fração grande de pacientes"),
+}
+
+
+def consultas_verificadas(cursor) -> list:
+    """Monta (nome, sql, parâmetros) de cada consulta, com valores reais do banco."""
+    cursor.execute("""
+        SELECT p.cpf, t.paciente_id, t.data_triagem, t.id
+        FROM triagens t JOIN pacientes p ON p.id = t.paciente_id
+        ORDER BY t.id DESC LIMIT 1
+    """)
+    cpf, paciente_id, data_triagem, triagem_id = cursor.fetchone()
+    cursor.execute("""
+        SELECT ordem_prioridade, data_triagem, paciente_id FROM fila_atual
+        WHERE ordem_prioridade = 1 ORDER BY data_triagem DESC, paciente_id DESC OFFSET 50 LIMIT 1
+    """)
+    ordem, data_fila, paciente_fila = cursor.fetchone()
+    cursor_fila = codificar_cursor(ordem, data_fila, paciente_fila)
+    cursor_triagens = codificar_cursor(None, data_triagem, triagem_id)
+    nascimento = datetime(1990, 1, 1).date()
+
+    return [
+        ("buscar_paciente_por_cpf", SQL_BUSCAR_PACIENTE_POR_CPF, [cpf]),
+        ("id_paciente_por_cpf", SQL_ID_PACIENTE_POR_CPF, [cpf]),
+        ("buscar_triagens_paciente", SQL_BUSCAR_TRIAGENS_PACIENTE, [paciente_id]),
+        ("paginar_triagens_paciente", *consulta_triagens_paciente(paciente_id, limite=50)),
+        ("paginar_triagens_paciente_cursor", *consulta_triagens_paciente(paciente_id, cursor_triagens, 50)),
+        ("listar_pacientes_por_prioridade_emergencia", *consulta_fila("Emergência")),
+        ("paginar_pacientes_por_prioridade", *consulta_fila(limite=50)),
+        ("paginar_pacientes_por_prioridade_emergencia", *consulta_fila("Emergência", limite=50)),
+        ("paginar_pacientes_por_prioridade_cursor", *consulta_fila(cursor_pagina=cursor_fila, limite=50)),
+        ("listar_triagens_desde", *consulta_triagens_desde(triagem_id - 100, data_triagem - timedelta(days=1))),
+        ("listar_triagens_desde_aguardando",
+         *consulta_triagens_desde(triagem_id - 100, data_triagem - timedelta(days=1), aguardando=True)),
+        ("listar_chamadas_fila_desde", SQL_CHAMADAS_FILA_DESDE, [data_triagem - timedelta(minutes=1)]),
+        ("estatisticas_triagens_hora", *consulta_estatisticas_triagens("hora", data_triagem - timedelta(days=7))),
+        ("estatisticas_triagens_dia", *consulta_estatisticas_triagens("dia", data_triagem - timedelta(days=365))),
+        ("buscar_chave_idempotencia", SQL_BUSCAR_CHAVE_IDEMPOTENCIA, ["chave-inexistente"]),
+        ("registrar_atendimento", SQL_REGISTRAR_ATENDIMENTO,
+         ["Paciente Plano", cpf, nascimento, "relato", "Comum", "verificação"]),
+        ("registrar_atendimento_idempotente", SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE,
+         list(parametros_atendimento_idempotente("Paciente Plano", cpf, nascimento, "relato", "Comum",
+                                                 "verificação", "chave-verificacao-planos"))),
+    ]
+
+
+def _nos(plano: dict):
+    """Percorre todos os nós de um plano do EXPLAIN (FORMAT JSON)."""
+    yield plano
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho)
+
+
+def _resumo_no(no: dict) -> str:
+    tipo = no["Node Type"]
+    if "Index Name" in no:
+        return f"{tipo} ({no['Index Name']})"
+    if "Relation Name" in no:
+        return f"{tipo} ({no['Relation Name']})"
+    return tipo
+
+
+def verificar(cursor, linhas_minimas: int, mostrar_planos: bool) -> list:
+    """Roda o EXPLAIN de cada consulta e retorna os nomes das que leram tabelas grandes por Seq Scan."""
+    cursor.execute("SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'p')")
+    linhas_estimadas = dict(cursor.fetchall())
+
+    regressoes = []
+    for nome, sql, parametros in consultas_verificadas(cursor):
+        cursor.execute("SAVEPOINT plano")
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, parametros)
+        resultado = cursor.fetchone()[0]
+        if isinstance(resultado, str):
+            resultado = json.loads(resultado)
+        cursor.execute("ROLLBACK TO SAVEPOINT plano")
+
+        plano = resultado[0]["Plan"]
+        nos = list(_nos(plano))
+        aceitas, motivo = SEQ_SCAN_ACEITO.get(nome, (set(), None))
+        grandes = [no["Relation Name"] for no in nos if no["Node Type"] == "Seq Scan"
+                   and linhas_estimadas.get(no["Relation Name"], 0) >= linhas_minimas]
+        varreduras = [tabela for tabela in grandes if tabela not in aceitas]
+        # Os contadores de blocos do nó raiz já incluem os dos nós filhos
+        lidos = plano.get("Shared Hit Blocks", 0) + plano.get("Shared Read Blocks", 0)
+        situacao = "FALHA" if varreduras else "ok"
+        print(f"  {situacao:<5} {nome:<45} {resultado[0]['Execution Time']:8.2f} ms  {lidos:6d} blocos  "
+              f"{', '.join(dict.fromkeys(_resumo_no(no) for no in nos if 'Relation Name' in no))}")
+        if varreduras:
+            print(f"        Seq Scan em: {', '.join(varreduras)}")
+            regressoes.append(nome)
+        elif grandes:
+            print(f"        Seq Scan aceito em {', '.join(grandes)}: {motivo}")
+        if mostrar_planos or varreduras:
+            print(json.dumps(plano, indent=2, ensure_ascii=False))
+    return regressoes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=list(ESCALAS), default="10k")
+    parser.add_argument("--linhas-minimas", type=int, default=1000,
+                        help="Tamanho (linhas estimadas) a partir do qual um Seq Scan é considerado regressão")
+    parser.add_argument("--mostrar-planos", action="store_true", help="Imprime o plano completo de cada consulta")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--permitir-remoto", action="store_true")
+    args = parser.parse_args()
+
+    db = preparar_banco(args.escala, args.permitir_remoto)
+    try:
+        popular(db, ESCALAS[args.escala], random.Random(args.semente))
+        print(f"Planos das consultas na escala {args.escala} ({ESCALAS[args.escala]:,} triagens):")
+        with db._conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                # Vale só para esta transação, desfeita no final
+                cursor.execute("SET LOCAL random_page_cost = %s", (RANDOM_PAGE_COST,))
+                regressoes = verificar(cursor, args.linhas_minimas, args.mostrar_planos)
+            finally:
+                conn.rollback()
+                cursor.close()
+    finally:
+        db.fechar()
+
+    if regressoes:
+        print(f"{len(regressoes)} consultas com Seq Scan em tabelas grandes: {', '.join(regressoes)}")
+        sys.exit(1)
+    print("Nenhuma consulta lê tabelas grandes por Seq Scan.")
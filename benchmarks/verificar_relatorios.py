@@ -0,0 +1,84 @@
+# Verificação dos Relatórios de Triagens
+
+"""
+Confere os relatórios de banco_dados.relatorios sobre um banco SQLite em memória
+com triagens conhecidas, e termina com código 1 se algum valor divergir do
+esperado. Cobre o preenchimento dos períodos sem triagens em todo o intervalo
+pedido [inicio, fim), do qual dependem as médias por dia da semana.
+
+Não usa rede nem servidor: roda em qualquer ambiente com as dependências da aplicação.
+
+Uso:
+    python benchmarks/verificar_relatorios.py
+"""
+
+import contextlib
+import io
+import sys
+from datetime import datetime
+
+import comum  # noqa: F401 (coloca src/ no sys.path)
+
+from banco_dados import relatorios
+from banco_dados.banco_dados_sqlite import BancoDadosSQLite
+
+# Três triagens em um único sábado (10/10/2026), às 9h00, 9h10 e 9h20
+SABADO = datetime(2026, 10, 10, 9, 0)
+PRIORIDADES = ["Comum", "Emergência", "Comum"]
+
+
+def preparar_banco() -> BancoDadosSQLite:
+    """Cria o banco em memória com as triagens de SABADO."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = BancoDadosSQLite(":memory:")
+        db.registrar_atendimentos_lote([{
+            'nome_completo': f"Paciente {i}", 'cpf': f"{i:011d}", 'data_nascimento': "01/01/1990",
+            'sintomas': "relato", 'prioridade': prioridade, 'justificativa': "verificação",
+            'chave_idempotencia': f"relatorio-{i}", 'data_triagem': SABADO.replace(minute=10 * i),
+        } for i, prioridade in enumerate(PRIORIDADES)])
+    return db
+
+
+def verificacoes(db) -> list:
+    """Retorna (descrição, obtido, esperado) de cada verificação."""
+    # Duas semanas completas, de segunda 05/10 a domingo 18/10: dois sábados
+    inicio, fim = datetime(2026, 10, 5), datetime(2026, 10, 19)
+    dias = relatorios.triagens_por_dia(db, inicio, fim)
+    horas = relatorios.triagens_por_hora(db, datetime(2026, 10, 10, 7, 30), datetime(2026, 10, 10, 12, 0))
+    semana = relatorios.volume_por_dia_semana(db, inicio, fim)
+    emergencias = relatorios.proporcao_emergencias(db, inicio, fim, "W")
+
+    return [
+        ("dias no período de 14 dias", len(dias), 14),
+        ("primeiro dia", dias.index[0], datetime(2026, 10, 5)),
+        ("último dia", dias.index[-1], datetime(2026, 10, 18)),
+        ("triagens no período", int(dias["Total"].sum()), 3),
+        ("dias até um fim no meio do dia", len(relatorios.triagens_por_dia(db, inicio, datetime(2026, 10, 10, 12))), 6),
+        ("horas de 7h30 às 12h", list(horas.index.hour), [8, 9, 10, 11]),
+        ("triagens das 9h", int(horas.loc[datetime(2026, 10, 10, 9), "Total"]), 3),
+        ("total de sábado", int(semana.loc["Sábado", "Total"]), 3),
+        ("média por sábado (dois sábados)", float(semana.loc["Sábado", "Média por dia"]), 1.5),
+        ("média por segunda (sem triagens)", float(semana.loc["Segunda-feira", "Média por dia"]), 0.0),
+        ("semanas na proporção de emergências", len(emergencias), 2),
+        ("proporção de emergências na 1ª semana", round(float(emergencias["Proporção"].iloc[0]), 4), round(1 / 3, 4)),
+        ("dias sem limites (só os com triagens)", len(relatorios.triagens_por_dia(db)), 1),
+        ("dias de um período sem triagens", len(relatorios.triagens_por_dia(db, datetime(2026, 11, 1))), 0),
+    ]
+
+
+if __name__ == '__main__':
+    db = preparar_banco()
+    try:
+        falhas = 0
+        for descricao, obtido, esperado in verificacoes(db):
+            correto = obtido == esperado
+            falhas += not correto
+            print(f"  {'ok   ' if correto else 'FALHA'} {descricao:<45} {obtido}" +
+                  ("" if correto else f" (esperado: {esperado})"))
+    finally:
+        db.fechar()
+
+    if falhas:
+        print(f"{falhas} verificações dos relatórios falharam.")
+        sys.exit(1)
+    print("Relatórios conferidos.")
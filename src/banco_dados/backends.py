@@ -0,0 +1,110 @@
+# Módulo de Seleção do Armazenamento
+
+"""
+Este módulo define a interface comum dos armazenamentos de dados (o contrato
+seguido pelo BancoDadosUtils, para PostgreSQL, e pelo BancoDadosSQLite, para um
+arquivo local) e cria o armazenamento escolhido em DatabaseConfig
+(variável BANCO_DADOS_BACKEND).
+
+Cada implementação só é importada quando escolhida: um posto que roda com
+SQLite não carrega o psycopg2 nem precisa das credenciais do Azure.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, runtime_checkable
+
+BACKENDS = ("postgresql", "sqlite")
+
+
+@runtime_checkable
+class BackendArmazenamento(Protocol):
+    """Operações oferecidas por todo armazenamento, com os mesmos tipos de retorno."""
+
+    def registrar_ouvinte_triagem(self, ouvinte: Callable) -> None: ...
+
+    def versao_esquema(self) -> Tuple[int, int]: ...
+
+    def migrar_esquema(self, alvo: Optional[int] = None) -> Optional[List[int]]: ...
+
+    def reconstruir_fila_atual(self) -> Optional[int]: ...
+
+    def recalcular_estatisticas_triagens(self, desde: Optional[datetime] = None) -> Optional[int]: ...
+
+    def criar_particoes_triagens(self, meses_a_frente: int = 3) -> Optional[List[str]]: ...
+
+    def arquivar_triagens(self, meses_retencao: int, destino: str) -> Optional[List[str]]: ...
+
+    def adicionar_paciente(self, nome_completo: str, cpf: str, data_nascimento: str) -> Optional[int]: ...
+
+    def adicionar_triagem(self, paciente_id: int, sintomas: str, prioridade: str,
+                          justificativa: str) -> Optional[int]: ...
+
+    def registrar_atendimento(self, nome_completo: str, cpf: str, data_nascimento: str, sintomas: str,
+                              prioridade: str, justificativa: str,
+                              chave_idempotencia: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]: ...
+
+    def registrar_atendimentos_lote(self, atendimentos: Iterable[Dict]) -> List[Tuple[int, int]]: ...
+
+    def reenviar_atendimentos(self, atendimentos: Iterable[Dict]) -> Optional[Tuple[List[Tuple], Dict[str, str]]]: ...
+
+    def adicionar_pacientes_lote(self, pacientes: Iterable, tamanho_bloco: int = 65536) -> Dict[str, int]: ...
+
+    def adicionar_triagens_lote(self, triagens: Iterable, tamanho_bloco: int = 65536) -> List[int]: ...
+
+    def registrar_chamada_fila(self, paciente_id: int) -> bool: ...
+
+    def buscar_paciente_por_cpf(self, cpf: str) -> Optional[Dict]: ...
+
+    def buscar_triagens_paciente(self, paciente_id: int) -> List[Dict]: ...
+
+    def listar_pacientes_por_prioridade(self, prioridade: str = None) -> List[Dict]: ...
+
+    def listar_triagens_desde(self, ultimo_id: int, desde: Optional[datetime] = None,
+                              limite: int = 1000, aguardando: bool = False) -> List[Dict]: ...
+
+    def listar_chamadas_fila_desde(self, desde: datetime) -> List[Dict]: ...
+
+    def estatisticas_triagens(self, granularidade: str = 'dia', inicio: Optional[datetime] = None,
+                              fim: Optional[datetime] = None) -> List[Dict]: ...
+
+    def iterar_exportacao(self, tabela: str, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                          tamanho_lote: int = 10000) -> Iterator[List[tuple]]: ...
+
+    def iterar_triagens_paciente(self, paciente_id: int, itersize: int = 1000) -> Iterator[Dict]: ...
+
+    def iterar_pacientes_por_prioridade(self, prioridade: str = None, itersize: int = 1000,
+                                        desde: Optional[datetime] = None,
+                                        aguardando: bool = False) -> Iterator[Dict]: ...
+
+    def paginar_triagens_paciente(self, paciente_id: int, limite: int = 50,
+                                  cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]: ...
+
+    def paginar_pacientes_por_prioridade(self, prioridade: str = None, limite: int = 50,
+                                         cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]: ...
+
+    def testar_conexao(self) -> bool: ...
+
+    def estatisticas_pool(self) -> Optional[Dict]: ...
+
+    def fechar(self) -> None: ...
+
+
+def criar_backend(nome: Optional[str] = None, **opcoes) -> BackendArmazenamento:
+    """
+    Cria o armazenamento configurado. Levanta ValueError para um nome desconhecido.
+
+    Args:
+        nome: 'postgresql' ou 'sqlite' (padrão: BANCO_DADOS_BACKEND)
+        **opcoes: Repassadas ao construtor (ex.: usar_pool para o PostgreSQL, caminho para o SQLite;
+            verificar_esquema vale para os dois)
+    """
+    from .config import DatabaseConfig
+
+    nome = (nome or DatabaseConfig.get_backend()).lower()
+    if nome == "postgresql":
+        from .banco_dados_utils import BancoDadosUtils
+        return BancoDadosUtils(**opcoes)
+    if nome == "sqlite":
+        from .banco_dados_sqlite import BancoDadosSQLite
+        return BancoDadosSQLite(**opcoes)
+    raise ValueError(f"BANCO_DADOS_BACKEND inválido: {nome!r}. Use um de: {', '.join(BACKENDS)}.")
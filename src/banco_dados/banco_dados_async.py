@@ -0,0 +1,613 @@
+# Módulo de Banco de Dados Assíncrono (PostgreSQL - Azure)
+
+"""
+Este módulo oferece as mesmas operações do BancoDadosUtils para código asyncio
+(quiosques, APIs), usando o modo assíncrono do psycopg2: enquanto uma consulta
+aguarda o Azure, o event loop atende outras, e consultas independentes podem
+rodar ao mesmo tempo com asyncio.gather.
+
+Conexões assíncronas do psycopg2 funcionam sempre em autocommit; por isso cada
+operação aqui é uma única instrução SQL (atômica por si só). O esquema é criado
+pelas migrações ('python -m banco_dados.gerenciar migrar').
+
+Requer um event loop com suporte a add_reader/add_writer (o padrão no Linux e
+no macOS; no Windows, use o WindowsSelectorEventLoopPolicy).
+
+Em relação ao BancoDadosUtils:
+- os ouvintes de triagem (registrar_ouvinte_triagem) recebem as triagens
+  gravadas por adicionar_triagem e registrar_atendimento, como no síncrono;
+- as métricas registram só a duração de cada operação
+  (banco_dados_operacao_segundos); tempo de execução, linhas e erros por
+  consulta são medidos apenas pelos cursores síncronos;
+- as consultas são enviadas como texto, sem os comandos preparados
+  (comandos_preparados.py), que dependem do execute síncrono para preparar e
+  repetir o comando;
+- não há cache de pacientes: buscar_paciente_por_cpf sempre consulta o banco.
+  Os cadastros feitos aqui chegam ao cache de um BancoDadosUtils (deste ou de
+  outro processo) pelo NOTIFY da migração 0005, quando ele escuta as
+  notificações; sem elas, esse cache não guarda CPFs ausentes.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.extras
+
+from .consultas import (
+    ORDEM_PRIORIDADE,
+    SQL_BUSCAR_CHAVE_IDEMPOTENCIA,
+    SQL_BUSCAR_PACIENTE_POR_CPF,
+    SQL_BUSCAR_TRIAGENS_PACIENTE,
+    SQL_ID_PACIENTE_POR_CPF,
+    SQL_INSERIR_PACIENTE,
+    SQL_INSERIR_TRIAGEM,
+    SQL_REGISTRAR_ATENDIMENTO,
+    SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE,
+    consulta_fila,
+    consulta_triagens_paciente,
+    formatar_paciente,
+    pagina_fila,
+    pagina_triagens,
+    parametros_atendimento_idempotente,
+)
+from .metricas import medir_operacao_async
+from .pool_conexoes import PoolEsgotadoError
+
+
+async def _aguardar(conn):
+    """Conduz uma conexão assíncrona até a operação pendente terminar, sem bloquear o loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        estado = conn.poll()
+        if estado == psycopg2.extensions.POLL_OK:
+            return
+
+        pronto = loop.create_future()
+        sinalizar = lambda: pronto.done() or pronto.set_result(None)
+        descritor = conn.fileno()
+        if estado == psycopg2.extensions.POLL_READ:
+            loop.add_reader(descritor, sinalizar)
+            remover = loop.remove_reader
+        elif estado == psycopg2.extensions.POLL_WRITE:
+            loop.add_writer(descritor, sinalizar)
+            remover = loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"Estado de poll inesperado: {estado}")
+
+        try:
+            await pronto
+        finally:
+            remover(descritor)
+
+
+async def _executar(conn, sql: str, parametros=(), dicionario: bool = False):
+    """Executa uma instrução e devolve o cursor com o resultado já disponível."""
+    if dicionario:
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    else:
+        cursor = conn.cursor()
+    cursor.execute(sql, parametros)
+    await _aguardar(conn)
+    return cursor
+
+
+class PoolConexoesAsync:
+    def __init__(self, fabrica: Callable, minimo: int = 1, maximo: int = 10,
+                 tempo_ocioso: float = 300.0, verificar_apos: float = 30.0,
+                 tempo_espera: float = 30.0):
+        """
+        Cria um pool de conexões assíncronas, equivalente ao PoolConexoes.
+        As conexões mínimas são abertas em abrir().
+
+        Args:
+            fabrica: Corrotina sem argumentos que abre uma nova conexão assíncrona
+            minimo: Quantidade de conexões mantidas abertas mesmo sem uso
+            maximo: Quantidade máxima de conexões abertas ao mesmo tempo
+            tempo_ocioso: Segundos que uma conexão pode ficar parada antes de ser fechada
+            verificar_apos: Segundos parada a partir dos quais a conexão é testada
+                com 'SELECT 1' ao ser retirada (0 testa sempre)
+            tempo_espera: Segundos que uma retirada aguarda quando o pool está cheio
+        """
+        if minimo < 0 or maximo < 1 or minimo > maximo:
+            raise ValueError(f"Tamanho de pool inválido: minimo={minimo}, maximo={maximo}")
+
+        self._fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = maximo
+        self.tempo_ocioso = tempo_ocioso
+        self.verificar_apos = verificar_apos
+        self.tempo_espera = tempo_espera
+
+        # O event loop é de uma thread só: não há lock, apenas a condição para esperar vagas
+        self._condicao = asyncio.Condition()
+        self._livres = deque()  # (conexão, instante em que foi devolvida)
+        self._total = 0
+        self._fechado = False
+
+        self._contadores = {
+            "retiradas": 0,
+            "criadas": 0,
+            "descartadas": 0,
+            "expiradas": 0,
+            "falhas_verificacao": 0,
+            "esperas": 0,
+            "esgotamentos": 0,
+        }
+        self._tempo_espera_total = 0.0
+
+    async def abrir(self):
+        """Abre as conexões mínimas do pool."""
+        while self._total < self.minimo:
+            self._total += 1
+            try:
+                conn = await self._fabrica()
+            except Exception:
+                self._total -= 1
+                raise
+            self._contadores["criadas"] += 1
+            self._livres.append((conn, time.monotonic()))
+
+    async def _fechar_conexao(self, conn, motivo: str):
+        """Fecha uma conexão que sai do pool e libera a vaga para outra."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._total -= 1
+        self._contadores[motivo] += 1
+        async with self._condicao:
+            self._condicao.notify()
+
+    async def _conexao_saudavel(self, conn, ociosa_ha: float) -> bool:
+        """Verifica se a conexão ainda pode ser usada antes de entregá-la."""
+        if conn.closed:
+            return False
+        if ociosa_ha < self.verificar_apos:
+            return True
+        try:
+            cursor = await _executar(conn, "SELECT 1")
+            cursor.close()
+            return True
+        except psycopg2.Error:
+            return False
+
+    async def _remover_expiradas(self):
+        """Fecha conexões paradas há mais que o tempo ocioso, respeitando o mínimo."""
+        agora = time.monotonic()
+        while (self._livres and self._total > self.minimo
+               and agora - self._livres[0][1] > self.tempo_ocioso):
+            await self._fechar_conexao(self._livres.popleft()[0], "expiradas")
+
+    async def obter(self, tempo_espera: Optional[float] = None):
+        """
+        Retira uma conexão do pool, abrindo uma nova se houver vaga.
+        Levanta PoolEsgotadoError se nenhuma ficar livre a tempo.
+
+        Args:
+            tempo_espera: Segundos de espera (padrão: o configurado no pool)
+        """
+        await self._remover_expiradas()
+        limite = self.tempo_espera if tempo_espera is None else tempo_espera
+        inicio = time.monotonic()
+
+        while True:
+            if self._fechado:
+                raise PoolEsgotadoError("O pool de conexões foi fechado.")
+
+            async with self._condicao:
+                while not self._livres and self._total >= self.maximo:
+                    restante = limite - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._contadores["esgotamentos"] += 1
+                        raise PoolEsgotadoError(
+                            f"Nenhuma conexão livre após {limite:.1f}s (máximo: {self.maximo})."
+                        )
+                    self._contadores["esperas"] += 1
+                    try:
+                        await asyncio.wait_for(self._condicao.wait(), restante)
+                    except asyncio.TimeoutError:
+                        pass
+
+                if self._livres:
+                    # LIFO: a conexão usada mais recentemente é a mais provável de estar viva
+                    conn, devolvida_em = self._livres.pop()
+                    criar = False
+                else:
+                    # Reserva a vaga antes de abrir a conexão
+                    self._total += 1
+                    criar = True
+
+            if criar:
+                try:
+                    conn = await self._fabrica()
+                except BaseException:
+                    self._total -= 1
+                    async with self._condicao:
+                        self._condicao.notify()
+                    raise
+                self._contadores["criadas"] += 1
+            elif not await self._conexao_saudavel(conn, time.monotonic() - devolvida_em):
+                await self._fechar_conexao(conn, "falhas_verificacao")
+                continue
+
+            self._contadores["retiradas"] += 1
+            self._tempo_espera_total += time.monotonic() - inicio
+            return conn
+
+    async def devolver(self, conn, descartar: bool = False):
+        """
+        Devolve uma conexão ao pool. Conexões com uma consulta ainda em andamento
+        (operação cancelada no meio) são descartadas.
+
+        Args:
+            conn: Conexão obtida por obter()
+            descartar: Fecha a conexão em vez de reaproveitá-la
+        """
+        if descartar or conn.closed or conn.isexecuting() or self._fechado:
+            await self._fechar_conexao(conn, "descartadas")
+            return
+
+        self._livres.append((conn, time.monotonic()))
+        async with self._condicao:
+            self._condicao.notify()
+
+    @asynccontextmanager
+    async def conexao(self, tempo_espera: Optional[float] = None):
+        """
+        Context manager assíncrono que retira uma conexão e a devolve ao final do bloco.
+        Conexões que falharem no meio do uso são descartadas.
+
+        Args:
+            tempo_espera: Segundos de espera (padrão: o configurado no pool)
+        """
+        conn = await self.obter(tempo_espera)
+        descartar = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            descartar = True
+            raise
+        finally:
+            await self.devolver(conn, descartar=descartar)
+
+    def estatisticas(self) -> Dict:
+        """Retorna um retrato do uso do pool, útil para dimensioná-lo."""
+        livres = len(self._livres)
+        retiradas = self._contadores["retiradas"]
+        return {
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "abertas": self._total,
+            "livres": livres,
+            "em_uso": self._total - livres,
+            **self._contadores,
+            "espera_media_ms": (self._tempo_espera_total / retiradas * 1000) if retiradas else 0.0,
+        }
+
+    async def fechar(self):
+        """Fecha todas as conexões livres; as em uso são fechadas ao serem devolvidas."""
+        self._fechado = True
+        while self._livres:
+            await self._fechar_conexao(self._livres.pop()[0], "descartadas")
+        async with self._condicao:
+            self._condicao.notify_all()
+
+
+class BancoDadosAsync:
+    def __init__(self, usar_pool: Optional[bool] = None):
+        """
+        Prepara o acesso assíncrono ao PostgreSQL no Azure. As conexões só são
+        abertas no primeiro uso (ou em abrir()).
+
+        Args:
+            usar_pool: Reaproveita conexões por um pool (padrão: AZURE_POSTGRES_POOL_ATIVO)
+        """
+        from .config import DatabaseConfig
+
+        # Carregar configurações
+        self.config = DatabaseConfig.get_connection_string()
+
+        if usar_pool is None:
+            usar_pool = DatabaseConfig.POOL_ATIVO
+        self.pool = PoolConexoesAsync(self._conectar, **DatabaseConfig.get_pool_config()) if usar_pool else None
+
+        # Funções chamadas a cada triagem gravada (ex.: FilaEspera.ao_registrar_triagem)
+        self._ouvintes_triagem = []
+
+    async def _conectar(self):
+        """Abre uma conexão assíncrona com o banco de dados PostgreSQL."""
+        try:
+            conn = psycopg2.connect(async_=True, **self.config)
+            await _aguardar(conn)
+            return conn
+        except psycopg2.Error as e:
+            print(f"Erro ao conectar ao banco de dados: {e}")
+            raise
+
+    @asynccontextmanager
+    async def _conexao(self):
+        """
+        Fornece uma conexão durante o bloco 'async with': retirada do pool quando ativo,
+        ou aberta e fechada a cada uso quando o pool está desativado.
+        """
+        if self.pool is not None:
+            async with self.pool.conexao() as conn:
+                yield conn
+        else:
+            conn = await self._conectar()
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def registrar_ouvinte_triagem(self, ouvinte: Callable):
+        """
+        Registra uma função chamada após cada triagem gravada com sucesso, com os
+        argumentos (paciente_id, prioridade, data_triagem, **dados). É chamada no
+        próprio event loop: não deve bloquear.
+
+        Args:
+            ouvinte: Função a ser chamada
+        """
+        self._ouvintes_triagem.append(ouvinte)
+
+    def _notificar_triagem(self, paciente_id: int, prioridade: str, data_triagem: datetime, **dados):
+        """Repassa uma triagem gravada aos ouvintes; falhas deles não afetam a gravação."""
+        for ouvinte in self._ouvintes_triagem:
+            try:
+                ouvinte(paciente_id, prioridade, data_triagem, **dados)
+            except Exception as e:
+                print(f"Erro ao notificar ouvinte de triagem: {e}")
+
+    async def abrir(self):
+        """Abre as conexões mínimas do pool (opcional: sem isso, são abertas sob demanda)."""
+        if self.pool is not None:
+            await self.pool.abrir()
+
+    @medir_operacao_async
+    async def adicionar_paciente(self, nome_completo: str, cpf: str, data_nascimento: str) -> Optional[int]:
+        """
+        Adiciona um novo paciente ao banco de dados.
+        Retorna o ID do paciente (ou o do paciente já cadastrado com o CPF) ou None em caso de erro.
+
+        Args:
+            nome_completo: Nome completo do paciente
+            cpf: CPF do paciente (apenas números)
+            data_nascimento: Data de nascimento no formato DD/MM/AAAA
+        """
+        try:
+            data_nascimento_formatada = datetime.strptime(data_nascimento, "%d/%m/%Y").date()
+            async with self._conexao() as conn:
+                try:
+                    cursor = await _executar(conn, SQL_INSERIR_PACIENTE, (nome_completo, cpf, data_nascimento_formatada))
+                except psycopg2.IntegrityError:
+                    print(f"Erro: CPF {cpf} já cadastrado.")
+                    # Recuperar ID do paciente existente
+                    cursor = await _executar(conn, SQL_ID_PACIENTE_POR_CPF, (cpf,))
+                    paciente_existente = cursor.fetchone()
+                    return paciente_existente[0] if paciente_existente else None
+                paciente_id = cursor.fetchone()[0]
+            print(f"Paciente {nome_completo} (CPF: {cpf}) adicionado com ID: {paciente_id}")
+            return paciente_id
+        except (ValueError, psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao adicionar paciente: {e}")
+            return None
+
+    @medir_operacao_async
+    async def adicionar_triagem(self, paciente_id: int, sintomas: str, prioridade: str,
+                                justificativa: str) -> Optional[int]:
+        """
+        Adiciona um novo registro de triagem para um paciente.
+        Retorna o ID da triagem ou None.
+
+        Args:
+            paciente_id: ID do paciente
+            sintomas: Descrição dos sintomas
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            justificativa: Justificativa da triagem
+        """
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, SQL_INSERIR_TRIAGEM, (paciente_id, sintomas, prioridade, justificativa))
+                triagem_id, data_triagem, nome_completo, cpf = cursor.fetchone()
+            print(f"Triagem para paciente ID {paciente_id} adicionada com ID: {triagem_id} (Prioridade: {prioridade})")
+            self._notificar_triagem(paciente_id, prioridade, data_triagem, nome_completo=nome_completo, cpf=cpf)
+            return triagem_id
+        except (psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao adicionar triagem: {e}")
+            return None
+
+    @medir_operacao_async
+    async def registrar_atendimento(self, nome_completo: str, cpf: str, data_nascimento: str,
+                                    sintomas: str, prioridade: str, justificativa: str,
+                                    chave_idempotencia: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Registra (ou reaproveita) o paciente e grava sua triagem em uma única instrução.
+        Retorna (ID do paciente, ID da triagem) ou (None, None) em caso de erro.
+
+        Args:
+            nome_completo: Nome completo do paciente
+            cpf: CPF do paciente (apenas números)
+            data_nascimento: Data de nascimento no formato DD/MM/AAAA
+            sintomas: Descrição dos sintomas
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            justificativa: Justificativa da triagem
+            chave_idempotencia: Identificador do envio (opcional); reenviar a mesma chave
+                devolve o registro original em vez de gravar outra triagem
+        """
+        try:
+            data_nascimento_formatada = datetime.strptime(data_nascimento, "%d/%m/%Y").date()
+            async with self._conexao() as conn:
+                if chave_idempotencia is None:
+                    cursor = await _executar(conn, SQL_REGISTRAR_ATENDIMENTO, (
+                        nome_completo, cpf, data_nascimento_formatada, sintomas, prioridade, justificativa
+                    ))
+                    paciente_id, triagem_id, data_triagem = cursor.fetchone()
+                else:
+                    try:
+                        parametros = parametros_atendimento_idempotente(
+                            nome_completo, cpf, data_nascimento_formatada, sintomas, prioridade, justificativa,
+                            chave_idempotencia
+                        )
+                        cursor = await _executar(conn, SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE, parametros)
+                        linha = cursor.fetchone()
+                    except psycopg2.errors.UniqueViolation:
+                        # Envio simultâneo da mesma chave: o outro já gravou
+                        linha = None
+                    if linha is None:
+                        cursor = await _executar(conn, SQL_BUSCAR_CHAVE_IDEMPOTENCIA, (chave_idempotencia,))
+                        paciente_id, triagem_id = cursor.fetchone()
+                        print(f"Atendimento já registrado com a chave {chave_idempotencia}.")
+                        return paciente_id, triagem_id
+                    paciente_id, triagem_id, data_triagem = linha
+            print(f"Atendimento registrado: paciente ID {paciente_id}, triagem ID {triagem_id} (Prioridade: {prioridade})")
+            self._notificar_triagem(paciente_id, prioridade, data_triagem, nome_completo=nome_completo, cpf=cpf)
+            return paciente_id, triagem_id
+        except (ValueError, psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao registrar atendimento: {e}")
+            return None, None
+
+    @medir_operacao_async
+    async def buscar_paciente_por_cpf(self, cpf: str) -> Optional[Dict]:
+        """
+        Busca um paciente pelo CPF.
+        Retorna um dicionário com os dados ou None.
+
+        Args:
+            cpf: CPF do paciente
+        """
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, SQL_BUSCAR_PACIENTE_POR_CPF, (cpf,), dicionario=True)
+                paciente = cursor.fetchone()
+            return formatar_paciente(paciente) if paciente else None
+        except (psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao buscar paciente por CPF: {e}")
+            return None
+
+    @medir_operacao_async
+    async def buscar_triagens_paciente(self, paciente_id: int) -> List[Dict]:
+        """
+        Busca todos os registros de triagem de um paciente.
+        Retorna uma lista de dicionários.
+
+        Args:
+            paciente_id: ID do paciente
+        """
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, SQL_BUSCAR_TRIAGENS_PACIENTE, (paciente_id,), dicionario=True)
+                return [dict(triagem) for triagem in cursor.fetchall()]
+        except (psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao buscar triagens do paciente: {e}")
+            return []
+
+    @medir_operacao_async
+    async def listar_pacientes_por_prioridade(self, prioridade: str = None) -> List[Dict]:
+        """
+        Lista pacientes com suas últimas triagens, opcionalmente filtrados por prioridade,
+        na mesma ordem do BancoDadosUtils.
+
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return []
+
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, *consulta_fila(prioridade), dicionario=True)
+                return [dict(paciente) for paciente in cursor.fetchall()]
+        except (psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao listar pacientes: {e}")
+            return []
+
+    @medir_operacao_async
+    async def paginar_triagens_paciente(self, paciente_id: int, limite: int = 50,
+                                        cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página das triagens de um paciente e o cursor da próxima página
+        (None quando não há mais páginas). Os cursores são os mesmos do BancoDadosUtils.
+
+        Args:
+            paciente_id: ID do paciente
+            limite: Quantidade de triagens por página
+            cursor_pagina: Cursor devolvido pela página anterior (None para a primeira)
+        """
+        sql, parametros = consulta_triagens_paciente(paciente_id, cursor_pagina, limite)
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, sql, parametros, dicionario=True)
+                return pagina_triagens([dict(triagem) for triagem in cursor.fetchall()], limite)
+        except (psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao paginar triagens do paciente: {e}")
+            return [], None
+
+    @medir_operacao_async
+    async def paginar_pacientes_por_prioridade(self, prioridade: str = None, limite: int = 50,
+                                               cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página da fila de pacientes e o cursor da próxima página
+        (None quando não há mais páginas). Os cursores são os mesmos do BancoDadosUtils.
+
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+            limite: Quantidade de pacientes por página
+            cursor_pagina: Cursor devolvido pela página anterior (None para a primeira)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return [], None
+
+        sql, parametros = consulta_fila(prioridade, cursor_pagina=cursor_pagina, limite=limite)
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, sql, parametros, dicionario=True)
+                return pagina_fila([dict(paciente) for paciente in cursor.fetchall()], limite)
+        except (psycopg2.Error, PoolEsgotadoError) as e:
+            print(f"Erro ao paginar pacientes: {e}")
+            return [], None
+
+    async def testar_conexao(self) -> bool:
+        """Testa a conexão com o banco de dados."""
+        try:
+            async with self._conexao() as conn:
+                cursor = await _executar(conn, "SELECT 1")
+                cursor.close()
+            print("Conexão com PostgreSQL estabelecida com sucesso!")
+            return True
+        except Exception as e:
+            print(f"Erro ao conectar com PostgreSQL: {e}")
+            return False
+
+    def estatisticas_pool(self) -> Optional[Dict]:
+        """Retorna as estatísticas do pool de conexões, ou None se o pool estiver desativado."""
+        return self.pool.estatisticas() if self.pool is not None else None
+
+    async def fechar(self):
+        """Fecha as conexões mantidas pelo pool."""
+        if self.pool is not None:
+            await self.pool.fechar()
+
+
+if __name__ == '__main__':
+    async def demonstracao():
+        db = BancoDadosAsync()
+        if not await db.testar_conexao():
+            return
+        # Consultas independentes rodam ao mesmo tempo
+        emergencias, urgencias = await asyncio.gather(
+            db.listar_pacientes_por_prioridade('Emergência'),
+            db.listar_pacientes_por_prioridade('Urgência'),
+        )
+        print(f"Emergências na fila: {len(emergencias)}; urgências: {len(urgencias)}")
+        print(f"Pool: {db.estatisticas_pool()}")
+        await db.fechar()
+
+    asyncio.run(demonstracao())
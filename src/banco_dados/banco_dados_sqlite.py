@@ -0,0 +1,1034 @@
+# Módulo de Utilitários de Banco de Dados (SQLite local)
+
+"""
+Este módulo oferece as mesmas operações do BancoDadosUtils sobre um arquivo
+SQLite local, para postos de saúde pequenos que rodam sem servidor (e para
+testes sem o Azure). Os métodos devolvem os mesmos tipos e dicionários do
+PostgreSQL: datas como date/datetime, CPF já cadastrado sem erro, fila mantida
+por gatilho e paginação com os mesmos cursores.
+
+Ajustes de desempenho:
+- journal_mode=WAL e synchronous=NORMAL: leituras não esperam as gravações e
+  cada commit não força um fsync;
+- uma conexão por thread, mantida aberta entre as operações;
+- consultas em texto fixo, reaproveitadas pelo cache de comandos preparados de
+  cada conexão (cached_statements) em vez de recompiladas a cada chamada.
+"""
+
+import csv
+import gzip
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import migrador
+from .consultas import (
+    ORDEM_PRIORIDADE,
+    SQL_CHAMADAS_FILA_DESDE,
+    consulta_estatisticas_triagens,
+    consulta_exportacao,
+    consulta_fila,
+    consulta_triagens_desde,
+    consulta_triagens_paciente,
+    formatar_paciente,
+    limite_retencao,
+    pagina_fila,
+    pagina_triagens,
+)
+
+DIRETORIO_MIGRACOES_SQLITE = os.path.join(os.path.dirname(__file__), "migracoes_sqlite")
+
+# Comandos preparados mantidos por conexão
+_CACHE_COMANDOS = 256
+
+# Hora local, no mesmo formato do DEFAULT das tabelas: o SQLite só tem milissegundos,
+# completados com zeros para as seis casas que _para_banco grava nos datetime
+_AGORA = "strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')"
+
+SQL_INSERIR_PACIENTE = """
+    INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
+    VALUES (?, ?, ?)
+    RETURNING id
+"""
+
+SQL_ID_PACIENTE_POR_CPF = "SELECT id FROM pacientes WHERE cpf = ?"
+
+# Erros de um atendimento com dados que o banco recusa (restrição ou data inválida):
+# repetir o envio não adianta, ao contrário de um arquivo bloqueado ou inacessível
+_ERROS_DADOS = (sqlite3.IntegrityError, sqlite3.DataError, ValueError)
+
+# Também devolvem o nome e o CPF do paciente, repassados aos ouvintes de triagem
+_PACIENTE_DA_TRIAGEM = """(SELECT nome_completo FROM pacientes WHERE id = paciente_id),
+              (SELECT cpf FROM pacientes WHERE id = paciente_id)"""
+
+SQL_INSERIR_TRIAGEM = f"""
+    INSERT INTO triagens (paciente_id, sintomas, prioridade, justificativa_triagem)
+    VALUES (?, ?, ?, ?)
+    RETURNING id, data_triagem, {_PACIENTE_DA_TRIAGEM}
+"""
+
+SQL_GARANTIR_PACIENTE = """
+    INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
+    VALUES (?, ?, ?)
+    ON CONFLICT (cpf) DO UPDATE SET cpf = excluded.cpf
+    RETURNING id
+"""
+
+# O paciente pode vir pelo ID ou pelo CPF; sem nenhum dos dois o NOT NULL rejeita o lote
+SQL_INSERIR_TRIAGEM_LOTE = f"""
+    INSERT INTO triagens (paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem)
+    VALUES (COALESCE(?, (SELECT id FROM pacientes WHERE cpf = ?)), ?, ?, ?, COALESCE(?, {_AGORA}))
+    RETURNING id, paciente_id, data_triagem, {_PACIENTE_DA_TRIAGEM}
+"""
+
+SQL_BUSCAR_CHAVE_IDEMPOTENCIA = "SELECT paciente_id, triagem_id FROM chaves_idempotencia WHERE chave = ?"
+
+SQL_GRAVAR_CHAVE_IDEMPOTENCIA = "INSERT INTO chaves_idempotencia (chave, paciente_id, triagem_id) VALUES (?, ?, ?)"
+
+SQL_REGISTRAR_CHAMADA_FILA = f"""
+    INSERT INTO chamadas_fila (paciente_id, chamado_em)
+    VALUES (?, {_AGORA})
+    ON CONFLICT (paciente_id) DO UPDATE SET chamado_em = excluded.chamado_em
+"""
+
+SQL_BUSCAR_PACIENTE_POR_CPF = """
+    SELECT id, nome_completo, cpf, data_nascimento, data_registro
+    FROM pacientes WHERE cpf = ?
+"""
+
+SQL_BUSCAR_TRIAGENS_PACIENTE = """
+    SELECT id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem
+    FROM triagens
+    WHERE paciente_id = ?
+    ORDER BY data_triagem DESC, id DESC
+"""
+
+SQL_TRIAGENS_DO_MES = """
+    SELECT id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem
+    FROM triagens
+    WHERE data_triagem >= ? AND data_triagem < ?
+    ORDER BY id
+"""
+
+SQL_POPULAR_FILA_ATUAL = """
+    INSERT INTO fila_atual (paciente_id, triagem_id, prioridade, ordem_prioridade, data_triagem)
+    SELECT paciente_id, id, prioridade,
+           CASE prioridade WHEN 'Emergência' THEN 1 WHEN 'Urgência' THEN 2 WHEN 'Prioridade' THEN 3 ELSE 4 END,
+           data_triagem
+    FROM (
+        SELECT paciente_id, id, prioridade, data_triagem,
+               row_number() OVER (PARTITION BY paciente_id
+                                  ORDER BY data_triagem DESC NULLS LAST, id DESC) AS posicao
+        FROM triagens
+    )
+    WHERE posicao = 1
+"""
+
+SQL_CONTAR_TRIAGENS_POR_HORA = """
+    INSERT INTO estatisticas_triagens_hora (hora, prioridade, quantidade)
+    SELECT strftime('%Y-%m-%d %H:00:00.000000', data_triagem), prioridade, count(*)
+    FROM triagens
+    WHERE data_triagem >= ?
+    GROUP BY 1, 2
+"""
+
+# O dia sai das horas recém-calculadas, sem reler as triagens
+SQL_CONTAR_TRIAGENS_POR_DIA = """
+    INSERT INTO estatisticas_triagens_dia (dia, prioridade, quantidade)
+    SELECT date(hora), prioridade, sum(quantidade)
+    FROM estatisticas_triagens_hora
+    WHERE hora >= ?
+    GROUP BY 1, 2
+"""
+
+
+def _para_sqlite(sql: str) -> str:
+    """Adapta uma consulta de consultas.py (parâmetros %s) ao SQLite (parâmetros ?)."""
+    return sql.replace("%s", "?")
+
+
+def _data_nascimento(data_nascimento) -> date:
+    """Converte DD/MM/AAAA para date, como o BancoDadosUtils (levanta ValueError se inválida)."""
+    if isinstance(data_nascimento, date):
+        return data_nascimento
+    return datetime.strptime(data_nascimento, "%d/%m/%Y").date()
+
+
+# Datas como texto ISO de tamanho fixo (comparável como texto) na gravação e como
+# date/datetime na leitura. A conversão é feita pelas conexões deste módulo, e não por
+# sqlite3.register_adapter/register_converter, que valeriam para todas as conexões
+# SQLite do processo (inclusive a do diário offline). Na leitura, as colunas são
+# reconhecidas pelo nome: as colunas DATE e TIMESTAMP do esquema
+_COLUNAS_DATA = frozenset({"data_nascimento", "dia"})
+_COLUNAS_HORARIO = frozenset({"data_registro", "data_triagem", "criada_em", "hora", "chamado_em"})
+
+
+def _para_banco(valor):
+    """Converte date/datetime no texto gravado no banco; os demais valores passam inalterados."""
+    if isinstance(valor, datetime):
+        return valor.isoformat(" ", "microseconds")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def _parametros(parametros):
+    """Aplica _para_banco aos parâmetros de um comando (sequência ou dicionário)."""
+    if isinstance(parametros, dict):
+        return {chave: _para_banco(valor) for chave, valor in parametros.items()}
+    return tuple(_para_banco(valor) for valor in parametros)
+
+
+class _Cursor(sqlite3.Cursor):
+    """Cursor que converte os parâmetros e guarda os conversores das colunas do resultado."""
+
+    def execute(self, sql, parametros=()):
+        self._conversores = None
+        return super().execute(sql, _parametros(parametros))
+
+    def executemany(self, sql, sequencia):
+        self._conversores = None
+        return super().executemany(sql, (_parametros(parametros) for parametros in sequencia))
+
+
+class _Conexao(sqlite3.Connection):
+    """Conexão cujos comandos passam por _Cursor (Connection.execute não usaria cursor())."""
+
+    def cursor(self, factory=_Cursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
+
+
+def _linha(cursor: _Cursor, valores: tuple) -> sqlite3.Row:
+    """row_factory: converte as colunas de data e de horário e devolve um sqlite3.Row."""
+    conversores = cursor._conversores
+    if conversores is None:
+        # Calculados uma vez por consulta, na primeira linha
+        conversores = cursor._conversores = [
+            (posicao, date.fromisoformat if coluna[0] in _COLUNAS_DATA else datetime.fromisoformat)
+            for posicao, coluna in enumerate(cursor.description)
+            if coluna[0] in _COLUNAS_DATA or coluna[0] in _COLUNAS_HORARIO
+        ]
+    if conversores:
+        valores = list(valores)
+        for posicao, converter in conversores:
+            if isinstance(valores[posicao], str):
+                valores[posicao] = converter(valores[posicao])
+        valores = tuple(valores)
+    return sqlite3.Row(cursor, valores)
+
+
+class BancoDadosSQLite:
+    def __init__(self, caminho: Optional[str] = None, verificar_esquema: bool = True):
+        """
+        Abre (ou cria) o banco SQLite local. Sem servidor nem outros processos para
+        coordenar, as migrações pendentes são aplicadas na própria inicialização.
+
+        Args:
+            caminho: Arquivo do banco (padrão: BANCO_DADOS_SQLITE_CAMINHO ou data/posto_saude.db)
+            verificar_esquema: Aplica as migrações pendentes ao abrir (desligado apenas pelo comando 'migrar')
+        """
+        if caminho is None:
+            from .config import DatabaseConfig
+            caminho = DatabaseConfig.get_sqlite_caminho()
+        self.caminho = caminho
+        # ':memory:' daria a cada conexão (uma por thread) um banco vazio próprio: as
+        # conexões abrem o mesmo banco em memória, compartilhado e exclusivo desta instância
+        self._memoria = caminho == ":memory:"
+        if self._memoria:
+            self._uri = f"file:posto_saude_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+
+        self._local = threading.local()
+        self._conexoes = []
+        self._lock = threading.Lock()
+        # No cache compartilhado, uma escrita concorrente falha na hora em vez de
+        # esperar o busy_timeout: as escritas no banco em memória são feitas uma por vez
+        self._lock_escrita = threading.Lock()
+
+        # Funções chamadas a cada triagem gravada (ex.: FilaEspera.ao_registrar_triagem)
+        self._ouvintes_triagem = []
+
+        if verificar_esquema:
+            self.migrar_esquema()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão desta thread, abrindo-a e configurando-a no primeiro uso."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self._uri if self._memoria else self.caminho,
+                uri=self._memoria,
+                factory=_Conexao,
+                isolation_level=None,  # transações explícitas em _transacao()
+                cached_statements=_CACHE_COMANDOS,
+                check_same_thread=False,  # apenas para fechar() poder encerrá-la
+            )
+            conn.row_factory = _linha
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            if self._memoria:
+                # Leituras não esperam (nem falham) pelas tabelas travadas por uma escrita
+                conn.execute("PRAGMA read_uncommitted = 1")
+            self._local.conn = conn
+            with self._lock:
+                self._conexoes.append(conn)
+        return conn
+
+    @contextmanager
+    def _transacao(self):
+        """
+        Executa o bloco em uma transação de escrita. BEGIN IMMEDIATE reserva a escrita
+        já no início, evitando o erro 'database is locked' ao promover uma leitura.
+        """
+        conn = self._conexao()
+        with self._trava_escrita():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _trava_escrita(self):
+        """Lock das escritas no banco em memória (no arquivo, o próprio SQLite coordena)."""
+        return self._lock_escrita if self._memoria else nullcontext()
+
+    def registrar_ouvinte_triagem(self, ouvinte: Callable):
+        """
+        Registra uma função chamada após cada triagem gravada com sucesso, com os
+        argumentos (paciente_id, prioridade, data_triagem, **dados).
+
+        Args:
+            ouvinte: Função a ser chamada
+        """
+        self._ouvintes_triagem.append(ouvinte)
+
+    def _notificar_triagem(self, paciente_id: int, prioridade: str, data_triagem: datetime, **dados):
+        """Repassa uma triagem gravada aos ouvintes; falhas deles não afetam a gravação."""
+        for ouvinte in self._ouvintes_triagem:
+            try:
+                ouvinte(paciente_id, prioridade, data_triagem, **dados)
+            except Exception as e:
+                print(f"Erro ao notificar ouvinte de triagem: {e}")
+
+    def versao_esquema(self) -> Tuple[int, int]:
+        """Retorna (versão do esquema no banco, versão exigida pelo código)."""
+        versao = self._conexao().execute("PRAGMA user_version").fetchone()[0]
+        return versao, migrador.versao_esperada(DIRETORIO_MIGRACOES_SQLITE)
+
+    def migrar_esquema(self, alvo: Optional[int] = None) -> Optional[List[int]]:
+        """
+        Aplica as migrações pendentes de banco_dados/migracoes_sqlite, cada uma em
+        sua transação, registrando a versão em PRAGMA user_version.
+        Retorna as versões aplicadas ou None em caso de erro.
+
+        Args:
+            alvo: Última versão a aplicar (padrão: todas)
+        """
+        conn = self._conexao()
+        aplicadas = []
+        try:
+            atual = conn.execute("PRAGMA user_version").fetchone()[0]
+            for versao, nome, caminho in migrador.listar_migracoes(DIRETORIO_MIGRACOES_SQLITE):
+                if versao <= atual or (alvo is not None and versao > alvo):
+                    continue
+                with open(caminho, encoding="utf-8") as arquivo:
+                    script = arquivo.read()
+                # executescript não aceita parâmetros; a versão é um inteiro vindo do nome do arquivo
+                with self._trava_escrita():
+                    conn.executescript(f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version = {int(versao)};\nCOMMIT;")
+                aplicadas.append(versao)
+                print(f"Migração {versao:04d}_{nome} aplicada.")
+            if aplicadas:
+                print(f"Migração do esquema concluída: {len(aplicadas)} migrações aplicadas.")
+            return aplicadas
+        except (sqlite3.Error, OSError) as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Erro ao migrar o esquema: {e}")
+            return None
+
+    def reconstruir_fila_atual(self) -> Optional[int]:
+        """
+        Reconstrói a tabela 'fila_atual' a partir do histórico de triagens.
+        Retorna a quantidade de pacientes na fila ou None em caso de erro.
+        """
+        try:
+            with self._transacao() as conn:
+                conn.execute("DELETE FROM fila_atual")
+                total = conn.execute(SQL_POPULAR_FILA_ATUAL).rowcount
+            print(f"Fila atual reconstruída com {total} pacientes.")
+            return total
+        except sqlite3.Error as e:
+            print(f"Erro ao reconstruir a fila atual: {e}")
+            return None
+
+    def recalcular_estatisticas_triagens(self, desde: Optional[datetime] = None) -> Optional[int]:
+        """
+        Recalcula as tabelas de estatísticas (por hora e por dia) a partir das triagens
+        gravadas desde o dia de 'desde' (padrão: o da mais antiga ainda no banco; os
+        meses já arquivados mantêm suas contagens). Retorna a quantidade de dias
+        recalculados ou None em caso de erro.
+
+        Args:
+            desde: Início do recálculo (opcional)
+        """
+        try:
+            with self._transacao() as conn:
+                if desde is None:
+                    desde = conn.execute("SELECT min(data_triagem) AS inicio FROM triagens").fetchone()[0]
+                total = 0
+                if desde is not None:
+                    inicio = datetime.fromisoformat(str(desde)).replace(hour=0, minute=0, second=0, microsecond=0)
+                    conn.execute("DELETE FROM estatisticas_triagens_hora WHERE hora >= ?", (inicio,))
+                    conn.execute("DELETE FROM estatisticas_triagens_dia WHERE dia >= ?", (inicio.date(),))
+                    conn.execute(SQL_CONTAR_TRIAGENS_POR_HORA, (inicio,))
+                    conn.execute(SQL_CONTAR_TRIAGENS_POR_DIA, (inicio,))
+                    total = conn.execute("SELECT count(DISTINCT dia) FROM estatisticas_triagens_dia WHERE dia >= ?",
+                                         (inicio.date(),)).fetchone()[0]
+            print(f"Estatísticas de triagens recalculadas: {total} dias.")
+            return total
+        except sqlite3.Error as e:
+            print(f"Erro ao recalcular as estatísticas de triagens: {e}")
+            return None
+
+    def criar_particoes_triagens(self, meses_a_frente: int = 3) -> Optional[List[str]]:
+        """
+        O SQLite não tem particionamento: não há partições a criar. Existe para que
+        o comando 'criar-particoes' funcione com qualquer armazenamento.
+
+        Args:
+            meses_a_frente: Ignorado
+        """
+        return []
+
+    def arquivar_triagens(self, meses_retencao: int, destino: str) -> Optional[List[str]]:
+        """
+        Exporta as triagens anteriores ao período de retenção para um arquivo por mês
+        (destino/triagens_pAAAAMM.csv.gz, no mesmo formato do PostgreSQL) e as exclui,
+        um mês por transação. A fila atual e as chaves de idempotência não são alteradas.
+        Retorna os arquivos gravados ou None em caso de erro.
+
+        Args:
+            meses_retencao: Meses completos mantidos antes do mês atual
+            destino: Pasta dos arquivos exportados
+        """
+        limite = limite_retencao(meses_retencao)
+        arquivos = []
+        try:
+            os.makedirs(destino, exist_ok=True)
+            conn = self._conexao()
+            meses = [linha[0] for linha in conn.execute(
+                "SELECT DISTINCT substr(data_triagem, 1, 7) FROM triagens WHERE data_triagem < ? ORDER BY 1",
+                (limite,)
+            )]
+            for mes in meses:
+                inicio = date(int(mes[:4]), int(mes[5:7]), 1)
+                fim = date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+                caminho = os.path.join(destino, f"triagens_p{inicio:%Y%m}.csv.gz")
+                temporario = caminho + ".tmp"
+                with self._transacao() as conn:
+                    cursor = conn.execute(SQL_TRIAGENS_DO_MES, (inicio, fim))
+                    with open(temporario, "wb") as bruto:
+                        with gzip.open(bruto, "wt", encoding="utf-8", newline="") as arquivo:
+                            escritor = csv.writer(arquivo)
+                            escritor.writerow([coluna[0] for coluna in cursor.description])
+                            escritor.writerows(cursor)
+                        bruto.flush()
+                        os.fsync(bruto.fileno())
+                    os.replace(temporario, caminho)
+                    conn.execute("DELETE FROM triagens WHERE data_triagem >= ? AND data_triagem < ?", (inicio, fim))
+                arquivos.append(caminho)
+                print(f"Triagens de {inicio:%m/%Y} arquivadas em {caminho}.")
+            print(f"Arquivamento concluído: {len(arquivos)} meses anteriores a {limite:%m/%Y}.")
+            return arquivos
+        except (sqlite3.Error, OSError) as e:
+            print(f"Erro ao arquivar triagens: {e}")
+            return None
+
+    def adicionar_paciente(self, nome_completo: str, cpf: str, data_nascimento: str) -> Optional[int]:
+        """
+        Adiciona um novo paciente ao banco de dados.
+        Retorna o ID do paciente ou None em caso de erro.
+
+        Args:
+            nome_completo: Nome completo do paciente
+            cpf: CPF do paciente (apenas números)
+            data_nascimento: Data de nascimento no formato DD/MM/AAAA
+        """
+        try:
+            with self._transacao() as conn:
+                paciente_id = conn.execute(
+                    SQL_INSERIR_PACIENTE, (nome_completo, cpf, _data_nascimento(data_nascimento))
+                ).fetchone()[0]
+            print(f"Paciente {nome_completo} (CPF: {cpf}) adicionado com ID: {paciente_id}")
+            return paciente_id
+
+        except sqlite3.IntegrityError:
+            print(f"Erro: CPF {cpf} já cadastrado.")
+            # Recuperar ID do paciente existente
+            paciente_existente = self._conexao().execute(SQL_ID_PACIENTE_POR_CPF, (cpf,)).fetchone()
+            return paciente_existente[0] if paciente_existente else None
+
+        except Exception as e:
+            print(f"Erro ao adicionar paciente: {e}")
+            return None
+
+    def adicionar_triagem(self, paciente_id: int, sintomas: str, prioridade: str, justificativa: str) -> Optional[int]:
+        """
+        Adiciona um novo registro de triagem para um paciente.
+        Retorna o ID da triagem ou None.
+
+        Args:
+            paciente_id: ID do paciente
+            sintomas: Descrição dos sintomas
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            justificativa: Justificativa da triagem
+        """
+        try:
+            with self._transacao() as conn:
+                triagem_id, data_triagem, nome_completo, cpf = conn.execute(
+                    SQL_INSERIR_TRIAGEM, (paciente_id, sintomas, prioridade, justificativa)
+                ).fetchone()
+            print(f"Triagem para paciente ID {paciente_id} adicionada com ID: {triagem_id} (Prioridade: {prioridade})")
+            self._notificar_triagem(paciente_id, prioridade, data_triagem, nome_completo=nome_completo, cpf=cpf)
+            return triagem_id
+
+        except Exception as e:
+            print(f"Erro ao adicionar triagem: {e}")
+            return None
+
+    def registrar_atendimento(self, nome_completo: str, cpf: str, data_nascimento: str,
+                              sintomas: str, prioridade: str, justificativa: str,
+                              chave_idempotencia: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Registra (ou reaproveita) o paciente e grava sua triagem em uma única transação.
+        Retorna (ID do paciente, ID da triagem) ou (None, None) em caso de erro.
+
+        Args:
+            nome_completo: Nome completo do paciente
+            cpf: CPF do paciente (apenas números)
+            data_nascimento: Data de nascimento no formato DD/MM/AAAA
+            sintomas: Descrição dos sintomas
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            justificativa: Justificativa da triagem
+            chave_idempotencia: Identificador do envio (opcional); reenviar a mesma chave
+                devolve o registro original em vez de gravar outra triagem
+        """
+        if chave_idempotencia is not None:
+            resultado = self.registrar_atendimentos_lote([{
+                'nome_completo': nome_completo, 'cpf': cpf, 'data_nascimento': data_nascimento,
+                'sintomas': sintomas, 'prioridade': prioridade, 'justificativa': justificativa,
+                'chave_idempotencia': chave_idempotencia,
+            }])
+            return resultado[0] if resultado else (None, None)
+
+        try:
+            with self._transacao() as conn:
+                paciente_id = conn.execute(
+                    SQL_GARANTIR_PACIENTE, (nome_completo, cpf, _data_nascimento(data_nascimento))
+                ).fetchone()[0]
+                triagem_id, data_triagem, _, _ = conn.execute(
+                    SQL_INSERIR_TRIAGEM, (paciente_id, sintomas, prioridade, justificativa)
+                ).fetchone()
+            print(f"Atendimento registrado: paciente ID {paciente_id}, triagem ID {triagem_id} (Prioridade: {prioridade})")
+            self._notificar_triagem(paciente_id, prioridade, data_triagem,
+                                    nome_completo=nome_completo, cpf=cpf)
+            return paciente_id, triagem_id
+
+        except Exception as e:
+            print(f"Erro ao registrar atendimento: {e}")
+            return None, None
+
+    def registrar_atendimentos_lote(self, atendimentos: Iterable[Dict]) -> List[Tuple[int, int]]:
+        """
+        Registra vários atendimentos com chave de idempotência em uma única transação.
+        Chaves já gravadas não geram nova triagem: devolvem o registro original.
+        Retorna [(ID do paciente, ID da triagem), ...] na ordem da entrada, ou uma
+        lista vazia em caso de erro (nada do lote é gravado).
+
+        Args:
+            atendimentos: Iterável de dicionários com 'nome_completo', 'cpf', 'data_nascimento'
+                (DD/MM/AAAA), 'sintomas', 'prioridade', 'justificativa', 'chave_idempotencia'
+                e, opcionalmente, 'data_triagem' (padrão: o horário da gravação)
+        """
+        try:
+            resultados, _ = self._gravar_atendimentos(list(atendimentos), isolar_recusados=False)
+            return resultados
+
+        except Exception as e:
+            print(f"Erro ao registrar atendimentos: {e}")
+            return []
+
+    def reenviar_atendimentos(self, atendimentos: Iterable[Dict]) -> Optional[Tuple[List[Tuple], Dict[str, str]]]:
+        """
+        Variante de registrar_atendimentos_lote para o reenvio do diário offline: um
+        atendimento recusado pelo banco (dados inválidos) não impede a gravação dos demais.
+        Retorna (resultados, recusados): resultados na ordem da entrada, com
+        (ID do paciente, ID da triagem) ou (None, None) para os recusados, e
+        {chave de idempotência: erro} dos recusados. Retorna None se o banco falhou
+        (arquivo bloqueado ou inacessível): nada do lote é gravado.
+
+        Args:
+            atendimentos: Iterável de dicionários no formato de registrar_atendimentos_lote
+        """
+        try:
+            return self._gravar_atendimentos(list(atendimentos), isolar_recusados=True)
+
+        except Exception as e:
+            print(f"Erro ao reenviar atendimentos: {e}")
+            return None
+
+    def _gravar_atendimentos(self, atendimentos: List[Dict],
+                             isolar_recusados: bool) -> Tuple[List[Tuple], Dict[str, str]]:
+        """
+        Grava os atendimentos em uma transação e retorna (resultados, recusados);
+        levanta a exceção do banco em caso de erro. Com isolar_recusados, um erro de
+        dados faz o lote ser refeito com um savepoint por atendimento, deixando de
+        fora apenas os recusados.
+        """
+        recusados = None
+        while True:
+            resultados, gravados = [], []
+            try:
+                with self._transacao() as conn:
+                    for atendimento in atendimentos:
+                        chave = atendimento['chave_idempotencia']
+                        existente = conn.execute(SQL_BUSCAR_CHAVE_IDEMPOTENCIA, (chave,)).fetchone()
+                        if existente is not None:
+                            resultados.append(tuple(existente))
+                            continue
+                        if recusados is not None:
+                            conn.execute("SAVEPOINT atendimento")
+                        try:
+                            paciente_id = conn.execute(SQL_GARANTIR_PACIENTE, (
+                                atendimento['nome_completo'], atendimento['cpf'],
+                                _data_nascimento(atendimento['data_nascimento'])
+                            )).fetchone()[0]
+                            triagem_id, _, data_triagem, _, _ = conn.execute(SQL_INSERIR_TRIAGEM_LOTE, (
+                                paciente_id, None, atendimento['sintomas'], atendimento['prioridade'],
+                                atendimento['justificativa'], atendimento.get('data_triagem')
+                            )).fetchone()
+                            conn.execute(SQL_GRAVAR_CHAVE_IDEMPOTENCIA, (chave, paciente_id, triagem_id))
+                        except _ERROS_DADOS as e:
+                            if recusados is None:
+                                raise
+                            conn.execute("ROLLBACK TO atendimento")
+                            conn.execute("RELEASE atendimento")
+                            recusados[chave] = str(e)
+                            resultados.append((None, None))
+                            continue
+                        if recusados is not None:
+                            conn.execute("RELEASE atendimento")
+                        resultados.append((paciente_id, triagem_id))
+                        gravados.append((paciente_id, atendimento, data_triagem))
+                break
+            except _ERROS_DADOS:
+                if recusados is not None or not isolar_recusados:
+                    raise
+                recusados = {}
+
+        recusados = recusados or {}
+        print(f"Atendimentos registrados: {len(gravados)} novos, "
+              f"{len(resultados) - len(gravados) - len(recusados)} já gravados, {len(recusados)} recusados.")
+        for paciente_id, atendimento, data_triagem in gravados:
+            self._notificar_triagem(paciente_id, atendimento['prioridade'], data_triagem,
+                                    nome_completo=atendimento['nome_completo'], cpf=atendimento['cpf'])
+        return resultados, recusados
+
+    def adicionar_pacientes_lote(self, pacientes: Iterable, tamanho_bloco: int = 65536) -> Dict[str, int]:
+        """
+        Adiciona pacientes em lote, em uma única transação. CPFs já cadastrados (ou
+        repetidos no próprio lote) são ignorados, sem erro de integridade.
+        Retorna um dicionário {cpf: id do paciente} para todos os CPFs do lote,
+        ou um dicionário vazio em caso de erro.
+
+        Args:
+            pacientes: Iterável (lista, gerador...) de tuplas (nome_completo, cpf, data_nascimento)
+                ou de dicionários com essas chaves; a data no formato DD/MM/AAAA
+            tamanho_bloco: Ignorado (mantido pela compatibilidade com o BancoDadosUtils)
+        """
+        def linhas():
+            for paciente in pacientes:
+                if isinstance(paciente, dict):
+                    paciente = (paciente['nome_completo'], paciente['cpf'], paciente['data_nascimento'])
+                nome_completo, cpf, data_nascimento = paciente
+                yield nome_completo, cpf, _data_nascimento(data_nascimento)
+
+        try:
+            with self._transacao() as conn:
+                conn.execute("""
+                    CREATE TEMP TABLE IF NOT EXISTS pacientes_staging (
+                        nome_completo TEXT, cpf TEXT, data_nascimento DATE
+                    )
+                """)
+                conn.execute("DELETE FROM pacientes_staging")
+                conn.executemany(
+                    "INSERT INTO pacientes_staging (nome_completo, cpf, data_nascimento) VALUES (?, ?, ?)",
+                    linhas()
+                )
+                # Somente a primeira ocorrência de cada CPF novo é inserida
+                inseridos = conn.execute("""
+                    INSERT OR IGNORE INTO pacientes (nome_completo, cpf, data_nascimento)
+                    SELECT nome_completo, cpf, data_nascimento FROM pacientes_staging ORDER BY rowid
+                """).rowcount
+                mapa_ids = dict(conn.execute("""
+                    SELECT p.cpf, p.id
+                    FROM pacientes p
+                    JOIN (SELECT DISTINCT cpf FROM pacientes_staging) s ON s.cpf = p.cpf
+                """).fetchall())
+                conn.execute("DELETE FROM pacientes_staging")
+            print(f"Lote de pacientes processado: {inseridos} novos, {len(mapa_ids) - inseridos} já cadastrados.")
+            return mapa_ids
+
+        except Exception as e:
+            print(f"Erro ao adicionar pacientes em lote: {e}")
+            return {}
+
+    def adicionar_triagens_lote(self, triagens: Iterable, tamanho_bloco: int = 65536) -> List[int]:
+        """
+        Adiciona triagens em lote, em uma única transação.
+        O paciente pode ser indicado pelo ID ou pelo CPF.
+        Retorna a lista de IDs das triagens na mesma ordem da entrada,
+        ou uma lista vazia em caso de erro (nenhuma triagem do lote é gravada).
+
+        Args:
+            triagens: Iterável de tuplas (paciente_id, sintomas, prioridade, justificativa[, data_triagem])
+                ou de dicionários com as chaves 'paciente_id' ou 'cpf', 'sintomas', 'prioridade',
+                'justificativa' e, opcionalmente, 'data_triagem'
+            tamanho_bloco: Ignorado (mantido pela compatibilidade com o BancoDadosUtils)
+        """
+        ids, gravadas = [], []
+        try:
+            with self._transacao() as conn:
+                for triagem in triagens:
+                    if isinstance(triagem, dict):
+                        paciente_id, cpf = triagem.get('paciente_id'), triagem.get('cpf')
+                        sintomas, prioridade = triagem['sintomas'], triagem['prioridade']
+                        justificativa, data_triagem = triagem.get('justificativa'), triagem.get('data_triagem')
+                    else:
+                        cpf = None
+                        paciente_id, sintomas, prioridade, justificativa, *resto = triagem
+                        data_triagem = resto[0] if resto else None
+                    triagem_id, paciente_id, data_triagem, nome_completo, cpf = conn.execute(
+                        SQL_INSERIR_TRIAGEM_LOTE,
+                        (paciente_id, cpf, sintomas, prioridade, justificativa, data_triagem)
+                    ).fetchone()
+                    ids.append(triagem_id)
+                    gravadas.append((paciente_id, prioridade, data_triagem, nome_completo, cpf))
+            print(f"Lote de triagens processado: {len(ids)} triagens adicionadas.")
+            if self._ouvintes_triagem:
+                for paciente_id, prioridade, data_triagem, nome_completo, cpf in gravadas:
+                    self._notificar_triagem(paciente_id, prioridade, data_triagem,
+                                            nome_completo=nome_completo, cpf=cpf)
+            return ids
+
+        except Exception as e:
+            print(f"Erro ao adicionar triagens em lote: {e}")
+            return []
+
+    def registrar_chamada_fila(self, paciente_id: int) -> bool:
+        """
+        Registra que o paciente foi chamado (ou saiu) da fila de espera, para que a
+        fila recarregada do banco não o traga de volta até uma nova triagem.
+        Retorna se a chamada foi gravada.
+
+        Args:
+            paciente_id: ID do paciente
+        """
+        try:
+            with self._transacao() as conn:
+                conn.execute(SQL_REGISTRAR_CHAMADA_FILA, (paciente_id,))
+            return True
+
+        except Exception as e:
+            print(f"Erro ao registrar a chamada do paciente ID {paciente_id}: {e}")
+            return False
+
+    def buscar_paciente_por_cpf(self, cpf: str) -> Optional[Dict]:
+        """
+        Busca um paciente pelo CPF.
+        Retorna um dicionário com os dados ou None.
+
+        Args:
+            cpf: CPF do paciente
+        """
+        try:
+            paciente = self._conexao().execute(SQL_BUSCAR_PACIENTE_POR_CPF, (cpf,)).fetchone()
+            # Converte data_nascimento para o formato brasileiro
+            return formatar_paciente(paciente) if paciente else None
+
+        except Exception as e:
+            print(f"Erro ao buscar paciente por CPF: {e}")
+            return None
+
+    def buscar_triagens_paciente(self, paciente_id: int) -> List[Dict]:
+        """
+        Busca todos os registros de triagem de um paciente.
+        Retorna uma lista de dicionários.
+
+        Args:
+            paciente_id: ID do paciente
+        """
+        try:
+            cursor = self._conexao().execute(SQL_BUSCAR_TRIAGENS_PACIENTE, (paciente_id,))
+            return [dict(triagem) for triagem in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Erro ao buscar triagens do paciente: {e}")
+            return []
+
+    def listar_pacientes_por_prioridade(self, prioridade: str = None) -> List[Dict]:
+        """
+        Lista pacientes pela prioridade de sua última triagem, na ordem de atendimento.
+        Retorna uma lista de dicionários.
+
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return []
+
+        sql, parametros = consulta_fila(prioridade)
+        try:
+            cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+            return [dict(paciente) for paciente in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Erro ao listar pacientes por prioridade: {e}")
+            return []
+
+    def listar_triagens_desde(self, ultimo_id: int, desde: Optional[datetime] = None,
+                              limite: int = 1000, aguardando: bool = False) -> List[Dict]:
+        """
+        Lista as triagens com ID maior que 'ultimo_id', em ordem de ID, com o nome e
+        o CPF do paciente. Retorna uma lista de dicionários (vazia em caso de erro).
+
+        Args:
+            ultimo_id: Maior ID de triagem já conhecido (0 para começar do início)
+            desde: Considera apenas triagens a partir deste horário (opcional)
+            limite: Quantidade máxima de triagens
+            aguardando: Omite as triagens de pacientes chamados da fila depois delas
+        """
+        sql, parametros = consulta_triagens_desde(ultimo_id, desde, limite, aguardando)
+        try:
+            cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+            return [dict(triagem) for triagem in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Erro ao listar triagens recentes: {e}")
+            return []
+
+    def listar_chamadas_fila_desde(self, desde: datetime) -> List[Dict]:
+        """
+        Lista as chamadas da fila ('paciente_id', 'chamado_em') gravadas a partir de
+        'desde', em ordem de horário. Retorna uma lista de dicionários (vazia em caso de erro).
+
+        Args:
+            desde: Horário a partir do qual as chamadas são listadas
+        """
+        try:
+            cursor = self._conexao().execute(_para_sqlite(SQL_CHAMADAS_FILA_DESDE), (desde,))
+            return [dict(chamada) for chamada in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Erro ao listar chamadas da fila: {e}")
+            return []
+
+    def estatisticas_triagens(self, granularidade: str = 'dia', inicio: Optional[datetime] = None,
+                              fim: Optional[datetime] = None) -> List[Dict]:
+        """
+        Lista a quantidade de triagens por período e prioridade, em ordem de período
+        ('hora' ou 'dia', 'prioridade', 'quantidade'), lida das tabelas de estatísticas
+        mantidas por gatilho. Retorna uma lista de dicionários (vazia em caso de erro).
+
+        Args:
+            granularidade: 'hora' ou 'dia'
+            inicio: Início do período (opcional)
+            fim: Fim do período, exclusivo (opcional)
+        """
+        sql, parametros = consulta_estatisticas_triagens(granularidade, inicio, fim)
+        try:
+            cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+            return [dict(linha) for linha in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Erro ao listar as estatísticas de triagens: {e}")
+            return []
+
+    def _iterar(self, sql: str, parametros: list, itersize: int) -> Iterator[Dict]:
+        """Percorre o resultado de uma consulta trazendo 'itersize' linhas por vez."""
+        cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+        try:
+            while True:
+                linhas = cursor.fetchmany(itersize)
+                if not linhas:
+                    break
+                for linha in linhas:
+                    yield dict(linha)
+        except sqlite3.Error as e:
+            # Diferente das listagens, não devolve um resultado parcial como se fosse completo
+            print(f"Erro ao percorrer resultados: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    def iterar_exportacao(self, tabela: str, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                          tamanho_lote: int = 10000) -> Iterator[List[tuple]]:
+        """
+        Gerador com os pacientes ou as triagens do período em blocos de até
+        'tamanho_lote' linhas (tuplas nas colunas de COLUNAS_EXPORTACAO), sem carregar
+        o resultado inteiro em memória.
+
+        Args:
+            tabela: 'pacientes' ou 'triagens'
+            inicio: Início do período (opcional)
+            fim: Fim do período, exclusivo (opcional)
+            tamanho_lote: Quantidade de linhas lidas por vez
+        """
+        sql, parametros = consulta_exportacao(tabela, inicio, fim)
+        cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+        try:
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                yield [tuple(linha) for linha in linhas]
+        except sqlite3.Error as e:
+            print(f"Erro ao percorrer resultados: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    def iterar_triagens_paciente(self, paciente_id: int, itersize: int = 1000) -> Iterator[Dict]:
+        """
+        Gerador com as triagens de um paciente, da mais recente para a mais antiga,
+        sem carregar todo o histórico em memória.
+
+        Args:
+            paciente_id: ID do paciente
+            itersize: Quantidade de linhas lidas por vez
+        """
+        sql, parametros = consulta_triagens_paciente(paciente_id)
+        return self._iterar(sql, parametros, itersize)
+
+    def iterar_pacientes_por_prioridade(self, prioridade: str = None, itersize: int = 1000,
+                                        desde: Optional[datetime] = None,
+                                        aguardando: bool = False) -> Iterator[Dict]:
+        """
+        Gerador equivalente a listar_pacientes_por_prioridade, sem carregar a fila
+        inteira em memória.
+
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+            itersize: Quantidade de linhas lidas por vez
+            desde: Considera apenas pacientes cuja última triagem é a partir deste horário (opcional)
+            aguardando: Omite os pacientes chamados depois da última triagem (registrar_chamada_fila)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return iter(())
+
+        sql, parametros = consulta_fila(prioridade, desde, aguardando=aguardando)
+        return self._iterar(sql, parametros, itersize)
+
+    def paginar_triagens_paciente(self, paciente_id: int, limite: int = 50,
+                                  cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página das triagens de um paciente (da mais recente para a mais
+        antiga) e o cursor da próxima página, ou None quando não há mais páginas.
+
+        Args:
+            paciente_id: ID do paciente
+            limite: Quantidade de triagens por página
+            cursor_pagina: Cursor devolvido pela página anterior (None para a primeira)
+        """
+        sql, parametros = consulta_triagens_paciente(paciente_id, cursor_pagina, limite)
+        try:
+            cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+            return pagina_triagens([dict(triagem) for triagem in cursor.fetchall()], limite)
+
+        except Exception as e:
+            print(f"Erro ao paginar triagens do paciente: {e}")
+            return [], None
+
+    def paginar_pacientes_por_prioridade(self, prioridade: str = None, limite: int = 50,
+                                         cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página da fila de pacientes (mesma ordem de listar_pacientes_por_prioridade)
+        e o cursor da próxima página, ou None quando não há mais páginas.
+
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+            limite: Quantidade de pacientes por página
+            cursor_pagina: Cursor devolvido pela página anterior (None para a primeira)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return [], None
+
+        sql, parametros = consulta_fila(prioridade, cursor_pagina=cursor_pagina, limite=limite)
+        try:
+            cursor = self._conexao().execute(_para_sqlite(sql), parametros)
+            return pagina_fila([dict(paciente) for paciente in cursor.fetchall()], limite)
+
+        except Exception as e:
+            print(f"Erro ao paginar pacientes: {e}")
+            return [], None
+
+    def testar_conexao(self) -> bool:
+        """Testa a conexão com o banco de dados."""
+        try:
+            self._conexao().execute("SELECT 1")
+            print(f"Banco de dados SQLite aberto com sucesso: {self.caminho}")
+            return True
+        except Exception as e:
+            print(f"Erro ao abrir o banco de dados SQLite: {e}")
+            return False
+
+    def estatisticas_pool(self) -> Optional[Dict]:
+        """Sem pool de conexões no SQLite: retorna sempre None."""
+        return None
+
+    def fechar(self):
+        """Fecha as conexões abertas por todas as threads."""
+        with self._lock:
+            conexoes, self._conexoes = self._conexoes, []
+        for conn in conexoes:
+            conn.close()
+        self._local = threading.local()
+
+
+if __name__ == '__main__':
+    print("Iniciando teste do módulo de Banco de Dados SQLite...")
+    db_utils = BancoDadosSQLite(":memory:")
+
+    paciente_id, _ = db_utils.registrar_atendimento("João da Silva", "11122233344", "01/01/1980",
+                                                    "Dor de cabeça forte e febre", "Prioridade",
+                                                    "Paciente relata dor de cabeça intensa e febre há 2 dias.")
+    db_utils.registrar_atendimento("Maria Oliveira", "55566677788", "15/05/1992",
+                                   "Falta de ar intensa e dor no peito", "Emergência",
+                                   "Sintomas clássicos de emergência cardíaca.")
+
+    print("\nBuscando paciente CPF 11122233344:")
+    print(db_utils.buscar_paciente_por_cpf("11122233344"))
+    print(db_utils.buscar_triagens_paciente(paciente_id))
+
+    print("\nFila de atendimento:")
+    for paciente in db_utils.listar_pacientes_por_prioridade():
+        print(paciente)
+
+    print("\nTeste do módulo de Banco de Dados SQLite concluído.")
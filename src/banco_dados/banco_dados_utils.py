@@ -6,14 +6,139 @@ armazenando informações dos pacientes e os resultados da triagem.
 """
 
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
+import psycopg2.sql
+import gzip
 import os
-from datetime import datetime
-from typing import Optional, Dict, List
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Optional, Dict, List, Tuple, Iterable, Iterator, Callable
+
+from .cache_pacientes import CachePacientes, OuvinteInvalidacoes
+from .comandos_preparados import ComandosPreparados
+from .consultas import (
+    ORDEM_PRIORIDADE,
+    SQL_CHAMADAS_FILA_DESDE,
+    SQL_REGISTRAR_CHAMADA_FILA,
+    consulta_estatisticas_triagens,
+    consulta_exportacao,
+    consulta_fila,
+    consulta_triagens_desde,
+    consulta_triagens_paciente,
+    formatar_paciente,
+    limite_retencao,
+    pagina_fila,
+    pagina_triagens,
+    parametros_atendimento_idempotente,
+)
+from . import metricas, migrador
+from .migrador import SchemaDesatualizadoError
+from .pool_conexoes import PoolConexoes
+
+# Partições mensais de triagens (migração 0003): triagens_pAAAAMM
+_PADRAO_PARTICAO = re.compile(r"^triagens_p(\d{4})(\d{2})$")
+
+SQL_LISTAR_PARTICOES = """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'triagens'::regclass
+    ORDER BY c.relname
+"""
+
+# Erros de um atendimento com dados que o banco recusa (tamanho, tipo, restrição
+# ou data inválida): repetir o envio não adianta, ao contrário das falhas de conexão
+_ERROS_DADOS = (psycopg2.DataError, psycopg2.IntegrityError, ValueError)
+
+# Caracteres que precisam de escape no formato texto do COPY
+_ESCAPES_COPY = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _valor_copy(valor) -> str:
+    """Converte um valor Python para um campo do COPY em formato texto."""
+    if valor is None:
+        return "\\N"
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor).translate(_ESCAPES_COPY)
+
+
+def _data_iso(data_nascimento) -> Optional[str]:
+    """Converte uma data DD/MM/AAAA (ou date) para AAAA-MM-DD sem passar por strptime."""
+    if data_nascimento is None or isinstance(data_nascimento, date):
+        return data_nascimento
+    if len(data_nascimento) == 10 and data_nascimento[2] == '/' and data_nascimento[5] == '/':
+        return f"{data_nascimento[6:]}-{data_nascimento[3:5]}-{data_nascimento[:2]}"
+    # Formato inesperado: o PostgreSQL valida e rejeita o lote
+    return data_nascimento
+
+
+def _exportar_tabela(cursor, tabela: str, caminho: str):
+    """
+    Grava uma tabela em CSV compactado (com cabeçalho) via COPY TO STDOUT. O arquivo
+    só aparece com o nome final depois de gravado e sincronizado com o disco.
+    """
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as bruto:
+        with gzip.open(bruto, "wt", encoding="utf-8", newline="") as arquivo:
+            cursor.copy_expert(psycopg2.sql.SQL("COPY (SELECT * FROM {} ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER)")
+                               .format(psycopg2.sql.Identifier(tabela)), arquivo)
+        bruto.flush()
+        os.fsync(bruto.fileno())
+    os.replace(temporario, caminho)
+
+
+class _FluxoCopy:
+    """
+    Adapta um iterável de linhas ao arquivo lido pelo COPY FROM STDIN,
+    gerando os dados sob demanda em vez de montar o lote inteiro em memória.
+    """
+
+    def __init__(self, linhas: Iterable[str]):
+        self._linhas = iter(linhas)
+        self._resto = ""
+
+    def read(self, tamanho: int = -1) -> str:
+        partes = [self._resto]
+        total = len(self._resto)
+        while tamanho < 0 or total < tamanho:
+            linha = next(self._linhas, None)
+            if linha is None:
+                break
+            partes.append(linha)
+            total += len(linha)
+        dados = "".join(partes)
+        if tamanho < 0:
+            self._resto = ""
+            return dados
+        self._resto = dados[tamanho:]
+        return dados[:tamanho]
+
+    def readline(self, tamanho: int = -1) -> str:
+        if self._resto:
+            linha, self._resto = self._resto, ""
+            return linha
+        return next(self._linhas, "")
+
 
 class BancoDadosUtils:
-    def __init__(self):
-        """Inicializa a conexão com o banco de dados PostgreSQL no Azure."""
+    def __init__(self, usar_pool: Optional[bool] = None, verificar_esquema: bool = True,
+                 comandos_preparados: Optional[bool] = None, cache_pacientes: Optional[bool] = None):
+        """
+        Inicializa a conexão com o banco de dados PostgreSQL no Azure.
+        Levanta SchemaDesatualizadoError se o banco não tiver as migrações exigidas.
+
+        Args:
+            usar_pool: Reaproveita conexões por um pool (padrão: AZURE_POSTGRES_POOL_ATIVO)
+            verificar_esquema: Confere a versão do esquema ao iniciar (desligado apenas pelo comando 'migrar')
+            comandos_preparados: Prepara as consultas frequentes no servidor, uma vez por
+                conexão (padrão: AZURE_POSTGRES_COMANDOS_PREPARADOS)
+            cache_pacientes: Guarda em memória as buscas por CPF (padrão: AZURE_POSTGRES_CACHE_PACIENTES)
+        """
         from .config import DatabaseConfig
         
         # Carregar configurações
@@ -24,11 +149,45 @@ class BancoDadosUtils:
         self.password = self.config['password']
         self.port = self.config['port']
         self.sslmode = self.config['sslmode']
-        
-        self._criar_tabelas()
+
+        # Funções chamadas a cada triagem gravada (ex.: FilaEspera.ao_registrar_triagem)
+        self._ouvintes_triagem = []
+
+        # Métricas por consulta (desligadas por padrão); valem para o processo todo
+        metricas.configurar(**DatabaseConfig.get_metricas_config())
+
+        if usar_pool is None:
+            usar_pool = DatabaseConfig.POOL_ATIVO
+        if comandos_preparados is None:
+            comandos_preparados = DatabaseConfig.COMANDOS_PREPARADOS
+        self.comandos = ComandosPreparados(comandos_preparados)
+        with metricas.em_operacao("abrir_pool"):
+            self.pool = PoolConexoes(self._conectar, **DatabaseConfig.get_pool_config()) if usar_pool else None
+
+        if verificar_esquema:
+            with metricas.em_operacao("verificar_esquema"), self._conexao() as conn:
+                migrador.verificar_esquema(conn)
+
+        config_cache = DatabaseConfig.get_cache_pacientes_config()
+        if cache_pacientes is None:
+            cache_pacientes = config_cache['ativo']
+        # Sem as notificações, um CPF cadastrado por outro processo só seria visto depois
+        # da validade da ausência guardada: por padrão, ausências só são guardadas com elas
+        ttl_ausentes = config_cache['ttl_ausentes']
+        if ttl_ausentes is None:
+            ttl_ausentes = config_cache['ttl'] if config_cache['notificacoes'] else 0
+        self.cache_pacientes = (CachePacientes(config_cache['capacidade'], config_cache['ttl'], ttl_ausentes)
+                                if cache_pacientes else None)
+        # Alterações de pacientes feitas por outros processos (NOTIFY da migração 0005)
+        self._ouvinte_pacientes = None
+        if self.cache_pacientes is not None and config_cache['notificacoes']:
+            self._ouvinte_pacientes = OuvinteInvalidacoes(self.cache_pacientes, self._conectar)
+            self._ouvinte_pacientes.iniciar()
 
     def _conectar(self):
         """Retorna uma conexão com o banco de dados PostgreSQL."""
+        instrumentar = metricas.REGISTRO.instrumentar
+        inicio = time.perf_counter()
         try:
             conn = psycopg2.connect(
                 host=self.host,
@@ -36,59 +195,227 @@ class BancoDadosUtils:
                 user=self.user,
                 password=self.password,
                 port=self.port,
-                sslmode=self.sslmode
+                sslmode=self.sslmode,
+                connection_factory=metricas.ConexaoInstrumentada if instrumentar else None
             )
+            if metricas.REGISTRO.ativo:
+                metricas.REGISTRO.observar("banco_dados_conexao_segundos", time.perf_counter() - inicio,
+                                           metricas.operacao_atual())
             return conn
         except psycopg2.Error as e:
+            if metricas.REGISTRO.ativo:
+                metricas.REGISTRO.incrementar("banco_dados_erros_total", 1, metricas.operacao_atual(), type(e).__name__)
             print(f"Erro ao conectar ao banco de dados: {e}")
             raise
 
-    def _criar_tabelas(self):
-        """Cria as tabelas 'pacientes' e 'triagens' se elas não existirem."""
-        conn = self._conectar()
-        cursor = conn.cursor()
-        
-        try:
-            # Tabela de Pacientes
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pacientes (
-                    id SERIAL PRIMARY KEY,
-                    nome_completo VARCHAR(255) NOT NULL,
-                    cpf VARCHAR(11) NOT NULL UNIQUE,
-                    data_nascimento DATE NOT NULL,
-                    data_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Tabela de Triagens
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS triagens (
-                    id SERIAL PRIMARY KEY,
-                    paciente_id INTEGER NOT NULL,
-                    sintomas TEXT NOT NULL,
-                    prioridade VARCHAR(50) NOT NULL CHECK (prioridade IN ('Emergência', 'Urgência', 'Prioridade', 'Comum')),
-                    justificativa_triagem TEXT,
-                    data_triagem TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (paciente_id) REFERENCES pacientes (id)
-                )
-            """)
+    @contextmanager
+    def _conexao(self):
+        """
+        Fornece uma conexão durante o bloco 'with': retirada do pool quando ativo,
+        ou aberta e fechada a cada uso quando o pool está desativado.
+        """
+        if self.pool is not None:
+            if not metricas.REGISTRO.ativo:
+                with self.pool.conexao() as conn:
+                    yield conn
+                return
+            inicio = time.perf_counter()
+            with self.pool.conexao() as conn:
+                metricas.REGISTRO.observar("banco_dados_espera_pool_segundos", time.perf_counter() - inicio,
+                                           metricas.operacao_atual())
+                yield conn
+        else:
+            conn = self._conectar()
+            try:
+                yield conn
+            finally:
+                conn.close()
 
-            # Criar índices para melhor performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pacientes_cpf ON pacientes(cpf)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_triagens_paciente_id ON triagens(paciente_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_triagens_data ON triagens(data_triagem)")
+    def registrar_ouvinte_triagem(self, ouvinte: Callable):
+        """
+        Registra uma função chamada após cada triagem gravada com sucesso, com os
+        argumentos (paciente_id, prioridade, data_triagem, **dados).
 
-            conn.commit()
-            print("Tabelas criadas/verificadas com sucesso no PostgreSQL.")
-            
+        Args:
+            ouvinte: Função a ser chamada
+        """
+        self._ouvintes_triagem.append(ouvinte)
+
+    def _notificar_triagem(self, paciente_id: int, prioridade: str, data_triagem: datetime, **dados):
+        """Repassa uma triagem gravada aos ouvintes; falhas deles não afetam a gravação."""
+        for ouvinte in self._ouvintes_triagem:
+            try:
+                ouvinte(paciente_id, prioridade, data_triagem, **dados)
+            except Exception as e:
+                print(f"Erro ao notificar ouvinte de triagem: {e}")
+
+    @metricas.medir_operacao
+    def versao_esquema(self) -> Tuple[int, int]:
+        """Retorna (versão do esquema no banco, versão exigida pelo código)."""
+        with self._conexao() as conn:
+            return migrador.versao_atual(conn), migrador.versao_esperada()
+
+    @metricas.medir_operacao
+    def migrar_esquema(self, alvo: Optional[int] = None) -> Optional[List[int]]:
+        """
+        Aplica as migrações pendentes do esquema (tabelas, índices, gatilhos).
+        Retorna as versões aplicadas ou None em caso de erro.
+
+        Args:
+            alvo: Última versão a aplicar (padrão: todas)
+        """
+        try:
+            with self._conexao() as conn:
+                novas = migrador.migrar(conn, alvo)
+            print(f"Migração do esquema concluída: {len(novas)} migrações aplicadas.")
+            return novas
         except psycopg2.Error as e:
-            print(f"Erro ao criar tabelas: {e}")
-            conn.rollback()
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+            print(f"Erro ao migrar o esquema: {e}")
+            return None
+
+    def _popular_fila_atual(self, cursor) -> int:
+        """Recalcula 'fila_atual' a partir de todas as triagens. Retorna a quantidade de pacientes."""
+        # Bloqueia novas entradas na fila (os gatilhos esperam), mas não as leituras
+        cursor.execute("LOCK TABLE fila_atual IN EXCLUSIVE MODE")
+        cursor.execute("DELETE FROM fila_atual")
+        # Na ordem de idx_triagens_paciente_data (data_triagem é NOT NULL desde a migração 0003)
+        cursor.execute("""
+            INSERT INTO fila_atual (paciente_id, triagem_id, prioridade, ordem_prioridade, data_triagem)
+            SELECT DISTINCT ON (paciente_id)
+                   paciente_id, id, prioridade, ordem_prioridade(prioridade), data_triagem
+            FROM triagens
+            ORDER BY paciente_id, data_triagem DESC, id DESC
+        """)
+        return cursor.rowcount
+
+    @metricas.medir_operacao
+    def reconstruir_fila_atual(self) -> Optional[int]:
+        """
+        Reconstrói a tabela 'fila_atual' a partir do histórico de triagens.
+        Retorna a quantidade de pacientes na fila ou None em caso de erro.
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                total = self._popular_fila_atual(cursor)
+                conn.commit()
+                print(f"Fila atual reconstruída com {total} pacientes.")
+                return total
+
+            except Exception as e:
+                print(f"Erro ao reconstruir a fila atual: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def recalcular_estatisticas_triagens(self, desde: Optional[datetime] = None) -> Optional[int]:
+        """
+        Recalcula as tabelas de estatísticas (por hora e por dia) a partir das triagens
+        gravadas desde o dia de 'desde' (padrão: o da mais antiga ainda no banco; os
+        meses já arquivados mantêm suas contagens). Retorna a quantidade de dias
+        recalculados ou None em caso de erro.
+
+        Args:
+            desde: Início do recálculo (opcional)
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute("SELECT recalcular_estatisticas_triagens(%s)", (desde,))
+                total = cursor.fetchone()[0]
+                conn.commit()
+                print(f"Estatísticas de triagens recalculadas: {total} dias.")
+                return total
+
+            except Exception as e:
+                print(f"Erro ao recalcular as estatísticas de triagens: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def criar_particoes_triagens(self, meses_a_frente: int = 3) -> Optional[List[str]]:
+        """
+        Cria as partições mensais de 'triagens' do mês atual e dos próximos meses, e
+        move para a partição do mês as triagens que caíram em triagens_padrao.
+        Deve rodar periodicamente (ex.: diariamente, pelo comando 'criar-particoes').
+        Retorna os nomes das partições criadas ou None em caso de erro.
 
+        Args:
+            meses_a_frente: Quantidade de meses, além do atual, que devem ter partição
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute("SELECT criar_particoes_triagens(%s)", (meses_a_frente,))
+                criadas = [linha[0] for linha in cursor.fetchall()]
+                conn.commit()
+                print(f"Partições de triagens criadas: {', '.join(criadas) or 'nenhuma'}.")
+                return criadas
+
+            except Exception as e:
+                print(f"Erro ao criar partições de triagens: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def arquivar_triagens(self, meses_retencao: int, destino: str) -> Optional[List[str]]:
+        """
+        Desanexa as partições mensais anteriores ao período de retenção, exporta cada
+        uma para destino/triagens_pAAAAMM.csv.gz e a exclui, uma partição por transação
+        (se a exportação falhar, a partição continua anexada).
+        A fila atual e as chaves de idempotência não são alteradas.
+        Retorna os arquivos gravados ou None em caso de erro.
+
+        Args:
+            meses_retencao: Meses completos mantidos antes do mês atual
+            destino: Pasta dos arquivos exportados
+        """
+        limite = limite_retencao(meses_retencao)
+        os.makedirs(destino, exist_ok=True)
+        arquivos = []
+
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                # Triagens retroativas de meses sem partição também são arquivadas
+                cursor.execute("SELECT criar_particoes_triagens(0)")
+                conn.commit()
+
+                cursor.execute(SQL_LISTAR_PARTICOES)
+                for (particao,) in cursor.fetchall():
+                    encontrado = _PADRAO_PARTICAO.match(particao)
+                    if not encontrado or date(int(encontrado.group(1)), int(encontrado.group(2)), 1) >= limite:
+                        continue
+                    caminho = os.path.join(destino, f"{particao}.csv.gz")
+                    tabela = psycopg2.sql.Identifier(particao)
+                    cursor.execute(psycopg2.sql.SQL("ALTER TABLE triagens DETACH PARTITION {}").format(tabela))
+                    _exportar_tabela(cursor, particao, caminho)
+                    cursor.execute(psycopg2.sql.SQL("DROP TABLE {}").format(tabela))
+                    conn.commit()
+                    arquivos.append(caminho)
+                    print(f"Partição {particao} arquivada em {caminho}.")
+
+                print(f"Arquivamento concluído: {len(arquivos)} partições anteriores a {limite:%m/%Y}.")
+                return arquivos
+
+            except Exception as e:
+                print(f"Erro ao arquivar triagens: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
     def adicionar_paciente(self, nome_completo: str, cpf: str, data_nascimento: str) -> Optional[int]:
         """
         Adiciona um novo paciente ao banco de dados. 
@@ -99,40 +426,37 @@ class BancoDadosUtils:
             cpf: CPF do paciente (apenas números)
             data_nascimento: Data de nascimento no formato DD/MM/AAAA
         """
-        conn = self._conectar()
-        cursor = conn.cursor()
+        with self._conexao() as conn:
+            cursor = conn.cursor()
         
-        try:
-            # Converter data do formato brasileiro para formato PostgreSQL
-            data_nascimento_formatada = datetime.strptime(data_nascimento, "%d/%m/%Y").date()
+            try:
+                # Converter data do formato brasileiro para formato PostgreSQL
+                data_nascimento_formatada = datetime.strptime(data_nascimento, "%d/%m/%Y").date()
             
-            cursor.execute("""
-                INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
-                VALUES (%s, %s, %s)
-                RETURNING id
-            """, (nome_completo, cpf, data_nascimento_formatada))
+                self.comandos.executar(cursor, "inserir_paciente", (nome_completo, cpf, data_nascimento_formatada))
             
-            paciente_id = cursor.fetchone()[0]
-            conn.commit()
-            print(f"Paciente {nome_completo} (CPF: {cpf}) adicionado com ID: {paciente_id}")
-            return paciente_id
+                paciente_id = cursor.fetchone()[0]
+                conn.commit()
+                self._cadastro_pacientes([cpf])
+                print(f"Paciente {nome_completo} (CPF: {cpf}) adicionado com ID: {paciente_id}")
+                return paciente_id
             
-        except psycopg2.IntegrityError:
-            print(f"Erro: CPF {cpf} já cadastrado.")
-            conn.rollback()
-            # Recuperar ID do paciente existente
-            cursor.execute("SELECT id FROM pacientes WHERE cpf = %s", (cpf,))
-            paciente_existente = cursor.fetchone()
-            return paciente_existente[0] if paciente_existente else None
+            except psycopg2.IntegrityError:
+                print(f"Erro: CPF {cpf} já cadastrado.")
+                conn.rollback()
+                # Recuperar ID do paciente existente
+                self.comandos.executar(cursor, "id_paciente_por_cpf", (cpf,))
+                paciente_existente = cursor.fetchone()
+                return paciente_existente[0] if paciente_existente else None
             
-        except Exception as e:
-            print(f"Erro ao adicionar paciente: {e}")
-            conn.rollback()
-            return None
-        finally:
-            cursor.close()
-            conn.close()
+            except Exception as e:
+                print(f"Erro ao adicionar paciente: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
 
+    @metricas.medir_operacao
     def adicionar_triagem(self, paciente_id: int, sintomas: str, prioridade: str, justificativa: str) -> Optional[int]:
         """
         Adiciona um novo registro de triagem para um paciente. 
@@ -144,62 +468,425 @@ class BancoDadosUtils:
             prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
             justificativa: Justificativa da triagem
         """
-        conn = self._conectar()
-        cursor = conn.cursor()
+        with self._conexao() as conn:
+            cursor = conn.cursor()
         
-        try:
-            cursor.execute("""
-                INSERT INTO triagens (paciente_id, sintomas, prioridade, justificativa_triagem)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id
-            """, (paciente_id, sintomas, prioridade, justificativa))
+            try:
+                self.comandos.executar(cursor, "inserir_triagem", (paciente_id, sintomas, prioridade, justificativa))
             
-            triagem_id = cursor.fetchone()[0]
-            conn.commit()
-            print(f"Triagem para paciente ID {paciente_id} adicionada com ID: {triagem_id} (Prioridade: {prioridade})")
-            return triagem_id
+                triagem_id, data_triagem, nome_completo, cpf = cursor.fetchone()
+                conn.commit()
+                print(f"Triagem para paciente ID {paciente_id} adicionada com ID: {triagem_id} (Prioridade: {prioridade})")
+                self._notificar_triagem(paciente_id, prioridade, data_triagem, nome_completo=nome_completo, cpf=cpf)
+                return triagem_id
             
+            except Exception as e:
+                print(f"Erro ao adicionar triagem: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def registrar_atendimento(self, nome_completo: str, cpf: str, data_nascimento: str,
+                              sintomas: str, prioridade: str, justificativa: str,
+                              chave_idempotencia: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Registra (ou reaproveita) o paciente e grava sua triagem em uma única
+        transação e uma única ida ao banco.
+        Retorna (ID do paciente, ID da triagem) ou (None, None) em caso de erro.
+        
+        Args:
+            nome_completo: Nome completo do paciente
+            cpf: CPF do paciente (apenas números)
+            data_nascimento: Data de nascimento no formato DD/MM/AAAA
+            sintomas: Descrição dos sintomas
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            justificativa: Justificativa da triagem
+            chave_idempotencia: Identificador do envio (opcional); reenviar a mesma chave
+                devolve o registro original em vez de gravar outra triagem
+        """
+        if chave_idempotencia is not None:
+            resultado = self.registrar_atendimentos_lote([{
+                'nome_completo': nome_completo, 'cpf': cpf, 'data_nascimento': data_nascimento,
+                'sintomas': sintomas, 'prioridade': prioridade, 'justificativa': justificativa,
+                'chave_idempotencia': chave_idempotencia,
+            }])
+            return resultado[0] if resultado else (None, None)
+
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                data_nascimento_formatada = datetime.strptime(data_nascimento, "%d/%m/%Y").date()
+
+                self.comandos.executar(cursor, "registrar_atendimento", (
+                    nome_completo, cpf, data_nascimento_formatada, sintomas, prioridade, justificativa
+                ))
+
+                paciente_id, triagem_id, data_triagem = cursor.fetchone()
+                conn.commit()
+                self._cadastro_pacientes([cpf])
+                print(f"Atendimento registrado: paciente ID {paciente_id}, triagem ID {triagem_id} (Prioridade: {prioridade})")
+                self._notificar_triagem(paciente_id, prioridade, data_triagem,
+                                        nome_completo=nome_completo, cpf=cpf)
+                return paciente_id, triagem_id
+
+            except Exception as e:
+                print(f"Erro ao registrar atendimento: {e}")
+                conn.rollback()
+                return None, None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def registrar_atendimentos_lote(self, atendimentos: Iterable[Dict]) -> List[Tuple[int, int]]:
+        """
+        Registra vários atendimentos com chave de idempotência em uma única transação.
+        Chaves já gravadas não geram nova triagem: devolvem o registro original.
+        Retorna [(ID do paciente, ID da triagem), ...] na ordem da entrada, ou uma
+        lista vazia em caso de erro (nada do lote é gravado; reenviar é seguro).
+        
+        Args:
+            atendimentos: Iterável de dicionários com 'nome_completo', 'cpf', 'data_nascimento'
+                (DD/MM/AAAA), 'sintomas', 'prioridade', 'justificativa', 'chave_idempotencia'
+                e, opcionalmente, 'data_triagem' (padrão: o horário da gravação)
+        """
+        try:
+            resultados, _ = self._gravar_atendimentos(list(atendimentos), isolar_recusados=False)
+            return resultados
         except Exception as e:
-            print(f"Erro ao adicionar triagem: {e}")
-            conn.rollback()
+            print(f"Erro ao registrar atendimentos: {e}")
+            return []
+
+    @metricas.medir_operacao
+    def reenviar_atendimentos(self, atendimentos: Iterable[Dict]) -> Optional[Tuple[List[Tuple], Dict[str, str]]]:
+        """
+        Variante de registrar_atendimentos_lote para o reenvio do diário offline: um
+        atendimento recusado pelo banco (dados inválidos, como um nome longo demais)
+        não impede a gravação dos demais.
+        Retorna (resultados, recusados): resultados na ordem da entrada, com
+        (ID do paciente, ID da triagem) ou (None, None) para os recusados, e
+        {chave de idempotência: erro} dos recusados. Retorna None se o banco falhou
+        (conexão, tempo esgotado): nada do lote é gravado e reenviar é seguro.
+
+        Args:
+            atendimentos: Iterável de dicionários no formato de registrar_atendimentos_lote
+        """
+        try:
+            return self._gravar_atendimentos(list(atendimentos), isolar_recusados=True)
+        except Exception as e:
+            print(f"Erro ao reenviar atendimentos: {e}")
             return None
-        finally:
-            cursor.close()
-            conn.close()
+
+    def _gravar_atendimentos(self, atendimentos: List[Dict],
+                             isolar_recusados: bool) -> Tuple[List[Tuple], Dict[str, str]]:
+        """
+        Grava os atendimentos em uma transação e retorna (resultados, recusados);
+        levanta a exceção do banco em caso de erro. Com isolar_recusados, um erro de
+        dados faz o lote ser refeito com um savepoint por atendimento, deixando de
+        fora apenas os recusados.
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                isolar, repetido = False, False
+                while True:
+                    recusados = {} if isolar else None
+                    try:
+                        resultados, gravados = self._registrar_atendimentos(cursor, atendimentos, recusados)
+                        conn.commit()
+                        break
+                    except psycopg2.errors.UniqueViolation:
+                        # Se outro processo gravar a mesma chave ao mesmo tempo, o lote falha com
+                        # UniqueViolation; na segunda tentativa a chave já aparece como gravada
+                        conn.rollback()
+                        if repetido:
+                            raise
+                        repetido = True
+                    except _ERROS_DADOS:
+                        conn.rollback()
+                        if isolar or not isolar_recusados:
+                            raise
+                        isolar = True
+
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        recusados = recusados or {}
+        print(f"Atendimentos registrados: {len(gravados)} novos, "
+              f"{len(resultados) - len(gravados) - len(recusados)} já gravados, {len(recusados)} recusados.")
+        self._cadastro_pacientes(atendimento['cpf'] for atendimento in atendimentos
+                                 if atendimento['chave_idempotencia'] not in recusados)
+        for paciente_id, atendimento, data_triagem in gravados:
+            self._notificar_triagem(paciente_id, atendimento['prioridade'], data_triagem,
+                                    nome_completo=atendimento['nome_completo'], cpf=atendimento['cpf'])
+        return resultados, recusados
+
+    def _registrar_atendimentos(self, cursor, atendimentos: List[Dict],
+                                recusados: Optional[Dict[str, str]] = None) -> Tuple[List[Tuple], List]:
+        """
+        Executa SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE para cada atendimento, sem commit.
+        Com 'recusados', cada atendimento fica em um savepoint: o que falhar por erro de
+        dados é desfeito, anotado em recusados ({chave: erro}) e devolvido como (None, None).
+        """
+        resultados, gravados = [], []
+        for atendimento in atendimentos:
+            chave = atendimento['chave_idempotencia']
+            if recusados is not None:
+                cursor.execute("SAVEPOINT atendimento")
+            try:
+                self.comandos.executar(cursor, "registrar_atendimento_idempotente", parametros_atendimento_idempotente(
+                    atendimento['nome_completo'], atendimento['cpf'],
+                    datetime.strptime(atendimento['data_nascimento'], "%d/%m/%Y").date(),
+                    atendimento['sintomas'], atendimento['prioridade'], atendimento['justificativa'],
+                    chave, atendimento.get('data_triagem')
+                ))
+            except psycopg2.errors.UniqueViolation:
+                raise
+            except _ERROS_DADOS as e:
+                if recusados is None:
+                    raise
+                cursor.execute("ROLLBACK TO SAVEPOINT atendimento")
+                cursor.execute("RELEASE SAVEPOINT atendimento")
+                recusados[chave] = str(e).strip()
+                resultados.append((None, None))
+                continue
+            linha = cursor.fetchone()
+            if recusados is not None:
+                cursor.execute("RELEASE SAVEPOINT atendimento")
+            if linha is None:
+                # Chave já usada: devolve o que foi gravado no primeiro envio
+                self.comandos.executar(cursor, "buscar_chave_idempotencia", (chave,))
+                resultados.append(tuple(cursor.fetchone()))
+                continue
+            paciente_id, triagem_id, data_triagem = linha
+            resultados.append((paciente_id, triagem_id))
+            gravados.append((paciente_id, atendimento, data_triagem))
+        return resultados, gravados
+
+    @metricas.medir_operacao
+    def adicionar_pacientes_lote(self, pacientes: Iterable, tamanho_bloco: int = 65536) -> Dict[str, int]:
+        """
+        Adiciona pacientes em lote via COPY FROM STDIN, em uma única transação.
+        CPFs já cadastrados (ou repetidos no próprio lote) são resolvidos por uma
+        tabela temporária de staging, sem erro de integridade.
+        Retorna um dicionário {cpf: id do paciente} para todos os CPFs do lote,
+        ou um dicionário vazio em caso de erro.
+        
+        Args:
+            pacientes: Iterável (lista, gerador...) de tuplas (nome_completo, cpf, data_nascimento)
+                ou de dicionários com essas chaves; a data no formato DD/MM/AAAA
+            tamanho_bloco: Quantidade de bytes enviada por vez ao COPY
+        """
+        def linhas():
+            for paciente in pacientes:
+                if isinstance(paciente, dict):
+                    paciente = (paciente['nome_completo'], paciente['cpf'], paciente['data_nascimento'])
+                nome_completo, cpf, data_nascimento = paciente
+                yield (f"{_valor_copy(nome_completo)}\t{_valor_copy(cpf)}\t"
+                       f"{_valor_copy(_data_iso(data_nascimento))}\n")
+
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute("""
+                    CREATE TEMP TABLE pacientes_staging (
+                        nome_completo VARCHAR(255),
+                        cpf VARCHAR(11),
+                        data_nascimento DATE
+                    ) ON COMMIT DROP
+                """)
+                cursor.copy_expert(
+                    "COPY pacientes_staging (nome_completo, cpf, data_nascimento) FROM STDIN",
+                    _FluxoCopy(linhas()), size=tamanho_bloco
+                )
+
+                # Somente a primeira ocorrência de cada CPF novo é inserida
+                cursor.execute("""
+                    INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
+                    SELECT DISTINCT ON (cpf) nome_completo, cpf, data_nascimento
+                    FROM pacientes_staging
+                    ORDER BY cpf
+                    ON CONFLICT (cpf) DO NOTHING
+                """)
+                inseridos = cursor.rowcount
+
+                cursor.execute("""
+                    SELECT p.cpf, p.id
+                    FROM pacientes p
+                    JOIN (SELECT DISTINCT cpf FROM pacientes_staging) s ON s.cpf = p.cpf
+                """)
+                mapa_ids = dict(cursor.fetchall())
+                conn.commit()
+                if inseridos:
+                    self._cadastro_pacientes(mapa_ids)
+                print(f"Lote de pacientes processado: {inseridos} novos, {len(mapa_ids) - inseridos} já cadastrados.")
+                return mapa_ids
+
+            except Exception as e:
+                print(f"Erro ao adicionar pacientes em lote: {e}")
+                conn.rollback()
+                return {}
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def adicionar_triagens_lote(self, triagens: Iterable, tamanho_bloco: int = 65536) -> List[int]:
+        """
+        Adiciona triagens em lote via COPY FROM STDIN, em uma única transação.
+        O paciente pode ser indicado pelo ID ou pelo CPF, resolvido em bloco.
+        Retorna a lista de IDs das triagens na mesma ordem da entrada,
+        ou uma lista vazia em caso de erro (nenhuma triagem do lote é gravada).
+        
+        Args:
+            triagens: Iterável de tuplas (paciente_id, sintomas, prioridade, justificativa[, data_triagem])
+                ou de dicionários com as chaves 'paciente_id' ou 'cpf', 'sintomas', 'prioridade',
+                'justificativa' e, opcionalmente, 'data_triagem'
+            tamanho_bloco: Quantidade de bytes enviada por vez ao COPY
+        """
+        def linhas():
+            for seq, triagem in enumerate(triagens):
+                if isinstance(triagem, dict):
+                    paciente_id, cpf = triagem.get('paciente_id'), triagem.get('cpf')
+                    sintomas, prioridade = triagem['sintomas'], triagem['prioridade']
+                    justificativa, data_triagem = triagem.get('justificativa'), triagem.get('data_triagem')
+                else:
+                    cpf = None
+                    paciente_id, sintomas, prioridade, justificativa, *resto = triagem
+                    data_triagem = resto[0] if resto else None
+                yield "\t".join((
+                    str(seq), _valor_copy(paciente_id), _valor_copy(cpf), _valor_copy(sintomas),
+                    _valor_copy(prioridade), _valor_copy(justificativa), _valor_copy(data_triagem)
+                )) + "\n"
+
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                # Os IDs são reservados já no staging para devolvê-los na ordem da entrada
+                cursor.execute("SELECT pg_get_serial_sequence('triagens', 'id')")
+                sequencia = cursor.fetchone()[0]
+                cursor.execute(psycopg2.sql.SQL("""
+                    CREATE TEMP TABLE triagens_staging (
+                        seq BIGINT,
+                        paciente_id INTEGER,
+                        cpf VARCHAR(11),
+                        sintomas TEXT,
+                        prioridade prioridade_triagem,
+                        justificativa TEXT,
+                        data_triagem TIMESTAMP,
+                        id INTEGER DEFAULT nextval({}::regclass)
+                    ) ON COMMIT DROP
+                """).format(psycopg2.sql.Literal(sequencia)))
+                cursor.copy_expert(
+                    "COPY triagens_staging (seq, paciente_id, cpf, sintomas, prioridade, justificativa, data_triagem) FROM STDIN",
+                    _FluxoCopy(linhas()), size=tamanho_bloco
+                )
+
+                inserir = """
+                    INSERT INTO triagens (id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem)
+                    SELECT s.id, COALESCE(s.paciente_id, p.id), s.sintomas, s.prioridade, s.justificativa,
+                           COALESCE(s.data_triagem, CURRENT_TIMESTAMP)
+                    FROM triagens_staging s
+                    LEFT JOIN pacientes p ON s.paciente_id IS NULL AND p.cpf = s.cpf
+                    ORDER BY s.seq
+                """
+                if self._ouvintes_triagem:
+                    # O RETURNING evita ler de volta as triagens (o que, sem a data,
+                    # consultaria o índice de cada partição); nome e CPF vão aos ouvintes
+                    cursor.execute(f"""
+                        WITH gravadas AS ({inserir} RETURNING paciente_id, prioridade, data_triagem)
+                        SELECT g.paciente_id, g.prioridade, g.data_triagem, p.nome_completo, p.cpf
+                        FROM gravadas g
+                        JOIN pacientes p ON p.id = g.paciente_id
+                    """)
+                    gravadas = cursor.fetchall()
+                else:
+                    cursor.execute(inserir)
+                    gravadas = []
+
+                cursor.execute("SELECT id FROM triagens_staging ORDER BY seq")
+                ids = [linha[0] for linha in cursor.fetchall()]
+
+                conn.commit()
+                print(f"Lote de triagens processado: {len(ids)} triagens adicionadas.")
+                for paciente_id, prioridade, data_triagem, nome_completo, cpf in gravadas:
+                    self._notificar_triagem(paciente_id, prioridade, data_triagem,
+                                            nome_completo=nome_completo, cpf=cpf)
+                return ids
+
+            except Exception as e:
+                print(f"Erro ao adicionar triagens em lote: {e}")
+                conn.rollback()
+                return []
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def registrar_chamada_fila(self, paciente_id: int) -> bool:
+        """
+        Registra que o paciente foi chamado (ou saiu) da fila de espera, para que a
+        fila recarregada do banco não o traga de volta até uma nova triagem.
+        Retorna se a chamada foi gravada.
+
+        Args:
+            paciente_id: ID do paciente
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(SQL_REGISTRAR_CHAMADA_FILA, (paciente_id,))
+                conn.commit()
+                return True
+
+            except Exception as e:
+                print(f"Erro ao registrar a chamada do paciente ID {paciente_id}: {e}")
+                conn.rollback()
+                return False
+            finally:
+                cursor.close()
 
     def buscar_paciente_por_cpf(self, cpf: str) -> Optional[Dict]:
         """
-        Busca um paciente pelo CPF. 
+        Busca um paciente pelo CPF, no cache de pacientes quando ativo.
         Retorna um dicionário com os dados ou None.
         
         Args:
             cpf: CPF do paciente
         """
-        conn = self._conectar()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
         try:
-            cursor.execute("""
-                SELECT id, nome_completo, cpf, data_nascimento, data_registro 
-                FROM pacientes WHERE cpf = %s
-            """, (cpf,))
-            
-            paciente = cursor.fetchone()
-            if paciente:
-                # Converter data_nascimento para formato brasileiro
-                paciente_dict = dict(paciente)
-                if paciente_dict['data_nascimento']:
-                    paciente_dict['data_nascimento'] = paciente_dict['data_nascimento'].strftime("%d/%m/%Y")
-                return paciente_dict
-            return None
-            
+            if self.cache_pacientes is not None:
+                return self.cache_pacientes.obter(cpf, self._consultar_paciente_por_cpf)
+            return self._consultar_paciente_por_cpf(cpf)
         except Exception as e:
             print(f"Erro ao buscar paciente por CPF: {e}")
             return None
-        finally:
-            cursor.close()
-            conn.close()
 
+    def _consultar_paciente_por_cpf(self, cpf: str) -> Optional[Dict]:
+        """Lê o paciente do banco (None se não existir); levanta exceção em caso de erro."""
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            try:
+                self.comandos.executar(cursor, "buscar_paciente_por_cpf", (cpf,))
+                paciente = cursor.fetchone()
+                # Converte data_nascimento para o formato brasileiro
+                return formatar_paciente(paciente) if paciente else None
+            finally:
+                cursor.close()
+
+    def _cadastro_pacientes(self, cpfs: Iterable[str]):
+        """Avisa o cache de pacientes de que os CPFs passaram a existir no banco."""
+        if self.cache_pacientes is not None:
+            self.cache_pacientes.registrar_cadastros(cpfs)
+
+    @metricas.medir_operacao
     def buscar_triagens_paciente(self, paciente_id: int) -> List[Dict]:
         """
         Busca todos os registros de triagem de um paciente. 
@@ -208,95 +895,315 @@ class BancoDadosUtils:
         Args:
             paciente_id: ID do paciente
         """
-        conn = self._conectar()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        try:
-            cursor.execute("""
-                SELECT id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem 
-                FROM triagens 
-                WHERE paciente_id = %s 
-                ORDER BY data_triagem DESC
-            """, (paciente_id,))
+            try:
+                self.comandos.executar(cursor, "buscar_triagens_paciente", (paciente_id,))
             
-            triagens = cursor.fetchall()
-            return [dict(triagem) for triagem in triagens]
+                triagens = cursor.fetchall()
+                return [dict(triagem) for triagem in triagens]
             
-        except Exception as e:
-            print(f"Erro ao buscar triagens do paciente: {e}")
-            return []
-        finally:
-            cursor.close()
-            conn.close()
+            except Exception as e:
+                print(f"Erro ao buscar triagens do paciente: {e}")
+                return []
+            finally:
+                cursor.close()
 
+    @metricas.medir_operacao
     def listar_pacientes_por_prioridade(self, prioridade: str = None) -> List[Dict]:
         """
         Lista pacientes com suas últimas triagens, opcionalmente filtrados por prioridade.
+        Lê a tabela 'fila_atual', mantida por gatilho, na ordem do índice
+        (prioridade, data da triagem).
         
         Args:
             prioridade: Filtro de prioridade (opcional)
         """
-        conn = self._conectar()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return []
+
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        try:
-            if prioridade:
-                cursor.execute("""
-                    SELECT DISTINCT p.id, p.nome_completo, p.cpf, t.prioridade, t.data_triagem
-                    FROM pacientes p
-                    JOIN triagens t ON p.id = t.paciente_id
-                    WHERE t.prioridade = %s
-                    AND t.data_triagem = (
-                        SELECT MAX(t2.data_triagem) 
-                        FROM triagens t2 
-                        WHERE t2.paciente_id = p.id
-                    )
-                    ORDER BY t.data_triagem DESC
-                """, (prioridade,))
-            else:
-                cursor.execute("""
-                    SELECT DISTINCT p.id, p.nome_completo, p.cpf, t.prioridade, t.data_triagem
-                    FROM pacientes p
-                    JOIN triagens t ON p.id = t.paciente_id
-                    WHERE t.data_triagem = (
-                        SELECT MAX(t2.data_triagem) 
-                        FROM triagens t2 
-                        WHERE t2.paciente_id = p.id
-                    )
-                    ORDER BY 
-                        CASE t.prioridade 
-                            WHEN 'Emergência' THEN 1
-                            WHEN 'Urgência' THEN 2
-                            WHEN 'Prioridade' THEN 3
-                            WHEN 'Comum' THEN 4
-                        END,
-                        t.data_triagem DESC
-                """)
+            try:
+                cursor.execute(*consulta_fila(prioridade))
             
-            pacientes = cursor.fetchall()
-            return [dict(paciente) for paciente in pacientes]
+                pacientes = cursor.fetchall()
+                return [dict(paciente) for paciente in pacientes]
             
-        except Exception as e:
-            print(f"Erro ao listar pacientes: {e}")
-            return []
-        finally:
-            cursor.close()
-            conn.close()
+            except Exception as e:
+                print(f"Erro ao listar pacientes: {e}")
+                return []
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def listar_triagens_desde(self, ultimo_id: int, desde: Optional[datetime] = None,
+                              limite: int = 1000, aguardando: bool = False) -> List[Dict]:
+        """
+        Lista as triagens com ID maior que 'ultimo_id', em ordem de ID, com o nome e
+        o CPF do paciente, para atualizar painéis sem reler a fila inteira.
+        Retorna uma lista de dicionários (vazia em caso de erro).
+
+        Os IDs são reservados antes do commit: uma transação mais lenta pode gravar um
+        ID menor que outro já lido. Quem acompanha as triagens deve reler alguns IDs
+        antes do último visto.
+
+        Args:
+            ultimo_id: Maior ID de triagem já conhecido (0 para começar do início)
+            desde: Considera apenas triagens a partir deste horário (opcional)
+            limite: Quantidade máxima de triagens
+            aguardando: Omite as triagens de pacientes chamados da fila depois delas
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(*consulta_triagens_desde(ultimo_id, desde, limite, aguardando))
+                return [dict(triagem) for triagem in cursor.fetchall()]
+
+            except Exception as e:
+                print(f"Erro ao listar triagens recentes: {e}")
+                return []
+            finally:
+                cursor.close()
 
+    @metricas.medir_operacao
+    def listar_chamadas_fila_desde(self, desde: datetime) -> List[Dict]:
+        """
+        Lista as chamadas da fila ('paciente_id', 'chamado_em') gravadas a partir de
+        'desde', em ordem de horário. Retorna uma lista de dicionários (vazia em caso de erro).
+
+        Como as triagens, uma chamada pode ficar visível depois de outra mais recente:
+        quem acompanha as chamadas deve reler um intervalo antes da última vista.
+
+        Args:
+            desde: Horário a partir do qual as chamadas são listadas
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(SQL_CHAMADAS_FILA_DESDE, (desde,))
+                return [dict(chamada) for chamada in cursor.fetchall()]
+
+            except Exception as e:
+                print(f"Erro ao listar chamadas da fila: {e}")
+                return []
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def estatisticas_triagens(self, granularidade: str = 'dia', inicio: Optional[datetime] = None,
+                              fim: Optional[datetime] = None) -> List[Dict]:
+        """
+        Lista a quantidade de triagens por período e prioridade, em ordem de período
+        ('hora' ou 'dia', 'prioridade', 'quantidade'), lida das tabelas de estatísticas
+        mantidas por gatilho. Retorna uma lista de dicionários (vazia em caso de erro).
+
+        Args:
+            granularidade: 'hora' ou 'dia'
+            inicio: Início do período (opcional)
+            fim: Fim do período, exclusivo (opcional)
+        """
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(*consulta_estatisticas_triagens(granularidade, inicio, fim))
+                return [dict(linha) for linha in cursor.fetchall()]
+
+            except Exception as e:
+                print(f"Erro ao listar as estatísticas de triagens: {e}")
+                return []
+            finally:
+                cursor.close()
+
+    def _iterar(self, sql: str, parametros: tuple, itersize: int, operacao: str) -> Iterator[Dict]:
+        """
+        Percorre o resultado de uma consulta com um cursor nomeado (do lado do servidor),
+        trazendo 'itersize' linhas por vez em vez do resultado inteiro. O gerador só
+        começa depois que o método que o criou retornou, por isso recebe o nome da
+        operação para as métricas.
+        """
+        with metricas.em_operacao(operacao), self._conexao() as conn:
+            cursor = conn.cursor(name=f"cursor_{uuid.uuid4().hex}", cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.itersize = itersize
+
+            try:
+                cursor.execute(sql, parametros)
+                for linha in cursor:
+                    yield dict(linha)
+            except psycopg2.Error as e:
+                # Diferente das listagens, não devolve um resultado parcial como se fosse completo
+                print(f"Erro ao percorrer resultados: {e}")
+                raise
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def iterar_exportacao(self, tabela: str, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                          tamanho_lote: int = 10000) -> Iterator[List[tuple]]:
+        """
+        Gerador com os pacientes ou as triagens do período em blocos de até
+        'tamanho_lote' linhas (tuplas nas colunas de COLUNAS_EXPORTACAO), lidos por um
+        cursor do lado do servidor: a memória usada depende do bloco, não do total
+        exportado. A conexão fica reservada até o gerador ser esgotado ou fechado.
+
+        Args:
+            tabela: 'pacientes' ou 'triagens'
+            inicio: Início do período (opcional)
+            fim: Fim do período, exclusivo (opcional)
+            tamanho_lote: Quantidade de linhas buscadas no servidor por vez
+        """
+        sql, parametros = consulta_exportacao(tabela, inicio, fim)
+        return self._iterar_lotes(sql, tuple(parametros), tamanho_lote, metricas.operacao_atual())
+
+    def _iterar_lotes(self, sql: str, parametros: tuple, tamanho_lote: int, operacao: str) -> Iterator[List[tuple]]:
+        """Como _iterar, mas devolve blocos de tuplas (sem montar um dicionário por linha)."""
+        with metricas.em_operacao(operacao), self._conexao() as conn:
+            cursor = conn.cursor(name=f"cursor_{uuid.uuid4().hex}")
+
+            try:
+                cursor.execute(sql, parametros)
+                while True:
+                    linhas = cursor.fetchmany(tamanho_lote)
+                    if not linhas:
+                        break
+                    yield linhas
+            except psycopg2.Error as e:
+                print(f"Erro ao percorrer resultados: {e}")
+                raise
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def iterar_triagens_paciente(self, paciente_id: int, itersize: int = 1000) -> Iterator[Dict]:
+        """
+        Gerador com as triagens de um paciente, da mais recente para a mais antiga,
+        sem carregar todo o histórico em memória. A conexão fica reservada até o
+        gerador ser esgotado ou fechado.
+        
+        Args:
+            paciente_id: ID do paciente
+            itersize: Quantidade de linhas buscadas no servidor por vez
+        """
+        sql, parametros = consulta_triagens_paciente(paciente_id)
+        return self._iterar(sql, tuple(parametros), itersize, metricas.operacao_atual())
+
+    @metricas.medir_operacao
+    def iterar_pacientes_por_prioridade(self, prioridade: str = None, itersize: int = 1000,
+                                        desde: Optional[datetime] = None,
+                                        aguardando: bool = False) -> Iterator[Dict]:
+        """
+        Gerador equivalente a listar_pacientes_por_prioridade, sem carregar a fila
+        inteira em memória. A conexão fica reservada até o gerador ser esgotado ou fechado.
+        
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+            itersize: Quantidade de linhas buscadas no servidor por vez
+            desde: Considera apenas pacientes cuja última triagem é a partir deste horário (opcional)
+            aguardando: Omite os pacientes chamados depois da última triagem (registrar_chamada_fila)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return iter(())
+
+        sql, parametros = consulta_fila(prioridade, desde, aguardando=aguardando)
+        return self._iterar(sql, tuple(parametros), itersize, metricas.operacao_atual())
+
+    @metricas.medir_operacao
+    def paginar_triagens_paciente(self, paciente_id: int, limite: int = 50,
+                                  cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página das triagens de um paciente (da mais recente para a mais
+        antiga) e o cursor da próxima página, ou None quando não há mais páginas.
+        Usa paginação por chave (data_triagem, id): o custo não cresce com o número da página.
+        
+        Args:
+            paciente_id: ID do paciente
+            limite: Quantidade de triagens por página
+            cursor_pagina: Cursor devolvido pela página anterior (None para a primeira)
+        """
+        sql, parametros = consulta_triagens_paciente(paciente_id, cursor_pagina, limite)
+
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(sql, parametros)
+                return pagina_triagens([dict(triagem) for triagem in cursor.fetchall()], limite)
+
+            except Exception as e:
+                print(f"Erro ao paginar triagens do paciente: {e}")
+                return [], None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
+    def paginar_pacientes_por_prioridade(self, prioridade: str = None, limite: int = 50,
+                                         cursor_pagina: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página da fila de pacientes (mesma ordem de listar_pacientes_por_prioridade)
+        e o cursor da próxima página, ou None quando não há mais páginas.
+        Usa paginação por chave (prioridade, data_triagem, id), sem OFFSET.
+        
+        Args:
+            prioridade: Filtro de prioridade (opcional)
+            limite: Quantidade de pacientes por página
+            cursor_pagina: Cursor devolvido pela página anterior (None para a primeira)
+        """
+        if prioridade and prioridade not in ORDEM_PRIORIDADE:
+            return [], None
+
+        sql, parametros = consulta_fila(prioridade, cursor_pagina=cursor_pagina, limite=limite)
+
+        with self._conexao() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+            try:
+                cursor.execute(sql, parametros)
+                return pagina_fila([dict(paciente) for paciente in cursor.fetchall()], limite)
+
+            except Exception as e:
+                print(f"Erro ao paginar pacientes: {e}")
+                return [], None
+            finally:
+                cursor.close()
+
+    @metricas.medir_operacao
     def testar_conexao(self) -> bool:
         """Testa a conexão com o banco de dados."""
         try:
-            conn = self._conectar()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-            conn.close()
+            with self._conexao() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
             print("Conexão com PostgreSQL estabelecida com sucesso!")
             return True
         except Exception as e:
             print(f"Erro ao conectar com PostgreSQL: {e}")
             return False
 
+    def estatisticas_pool(self) -> Optional[Dict]:
+        """Retorna as estatísticas do pool de conexões, ou None se o pool estiver desativado."""
+        return self.pool.estatisticas() if self.pool is not None else None
+
+    def estatisticas_cache_pacientes(self) -> Optional[Dict]:
+        """Retorna as estatísticas do cache de pacientes, ou None se o cache estiver desativado."""
+        return self.cache_pacientes.estatisticas() if self.cache_pacientes is not None else None
+
+    def texto_metricas(self) -> str:
+        """Retorna as métricas de acesso ao banco no formato texto do Prometheus."""
+        return metricas.REGISTRO.texto_prometheus()
+
+    def fechar(self):
+        """Fecha as conexões mantidas pelo pool e a escuta de alterações de pacientes."""
+        if self._ouvinte_pacientes is not None:
+            self._ouvinte_pacientes.parar()
+        if self.pool is not None:
+            self.pool.fechar()
+
 
 if __name__ == '__main__':
     print("Iniciando teste do módulo de Banco de Dados PostgreSQL...")
@@ -349,6 +1256,9 @@ if __name__ == '__main__':
         for paciente in pacientes_emergencia:
             print(paciente)
 
+        print("\nEstatísticas do pool de conexões:")
+        print(db_utils.estatisticas_pool())
+
         print("\nTeste do módulo de Banco de Dados PostgreSQL concluído.")
         
     except ValueError as e:
@@ -0,0 +1,245 @@
+# Módulo do Cache de Pacientes
+
+"""
+Este módulo guarda em memória o resultado de BancoDadosUtils.buscar_paciente_por_cpf:
+um paciente que volta ao posto é procurado pelo CPF várias vezes na mesma visita
+(e em visitas seguidas), e cada busca custava uma conexão, uma consulta e a
+formatação da data. O cache tem tamanho limitado (descarta o menos usado) e
+validade (TTL). CPFs não encontrados têm validade própria (ttl_ausentes).
+
+Cadastros feitos pelo próprio processo descartam a ausência guardada do CPF.
+Alterações feitas por outros processos chegam pelo LISTEN/NOTIFY do PostgreSQL
+(canal 'pacientes_alterados', migração 0005) quando OuvinteInvalidacoes está
+ativo; sem ele, uma entrada desatualizada vive no máximo até o fim do TTL. Por
+isso, sem as notificações, BancoDadosUtils não guarda ausências: um paciente
+cadastrado por outro quiosque seria dado como inexistente até o fim da validade.
+"""
+
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+import psycopg2
+
+from . import metricas
+
+# Canal do NOTIFY enviado pelo gatilho de pacientes (migração 0005)
+CANAL_INVALIDACOES = "pacientes_alterados"
+
+
+class CachePacientes:
+    def __init__(self, capacidade: int = 10000, ttl: float = 300.0, ttl_ausentes: Optional[float] = None):
+        """
+        Cria um cache vazio.
+
+        Args:
+            capacidade: Quantidade máxima de CPFs guardados
+            ttl: Segundos durante os quais uma entrada é devolvida sem consultar o banco
+            ttl_ausentes: Validade de um CPF não encontrado (padrão: ttl; 0 não guarda ausências)
+        """
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.ttl_ausentes = ttl if ttl_ausentes is None else ttl_ausentes
+        # CPF -> (paciente formatado ou None, instante em que foi lido do banco)
+        self._entradas: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação: uma leitura do banco iniciada antes dela pode
+        # estar desatualizada e não é guardada
+        self._geracao = 0
+        self._contadores = {"acertos": 0, "faltas": 0, "expirados": 0, "invalidacoes": 0, "despejos": 0}
+        self._idade_total = 0.0
+        self._idade_maxima = 0.0
+
+    def obter(self, cpf: str, carregar: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Retorna o paciente do CPF, do cache ou de carregar(cpf) (que deve levantar
+        exceção em caso de erro, para que a falha não seja guardada como ausência).
+
+        Args:
+            cpf: CPF do paciente
+            carregar: Função que consulta o banco e retorna o paciente ou None
+        """
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(cpf)
+            if entrada is not None:
+                paciente, lido_em = entrada
+                idade = agora - lido_em
+                if idade < (self.ttl if paciente is not None else self.ttl_ausentes):
+                    self._entradas.move_to_end(cpf)
+                    self._contadores["acertos"] += 1
+                    self._idade_total += idade
+                    self._idade_maxima = max(self._idade_maxima, idade)
+                    resultado = "acerto"
+                else:
+                    del self._entradas[cpf]
+                    self._contadores["expirados"] += 1
+                    resultado = "expirado"
+            else:
+                self._contadores["faltas"] += 1
+                resultado = "falta"
+            geracao = self._geracao
+
+        if metricas.REGISTRO.ativo:
+            metricas.REGISTRO.incrementar("banco_dados_cache_pacientes_total", 1, resultado)
+        if resultado == "acerto":
+            if metricas.REGISTRO.ativo:
+                metricas.REGISTRO.observar("banco_dados_cache_pacientes_idade_segundos", idade)
+            # Cópia: quem chamou pode alterar o dicionário sem afetar o cache
+            return dict(paciente) if paciente is not None else None
+
+        paciente = carregar(cpf)
+        despejos = 0
+        with self._lock:
+            if self._geracao == geracao and (paciente is not None or self.ttl_ausentes > 0):
+                self._entradas[cpf] = (paciente, agora)
+                self._entradas.move_to_end(cpf)
+                while len(self._entradas) > self.capacidade:
+                    self._entradas.popitem(last=False)
+                    despejos += 1
+                self._contadores["despejos"] += despejos
+        if despejos and metricas.REGISTRO.ativo:
+            metricas.REGISTRO.incrementar("banco_dados_cache_pacientes_despejos_total", despejos)
+        return dict(paciente) if paciente is not None else None
+
+    def invalidar(self, cpf: str, origem: str = "local"):
+        """
+        Descarta o CPF do cache (paciente alterado ou excluído).
+
+        Args:
+            cpf: CPF do paciente
+            origem: Quem pediu a invalidação, para as métricas ('local', 'notificacao')
+        """
+        with self._lock:
+            self._geracao += 1
+            descartada = self._entradas.pop(cpf, None) is not None
+            self._contadores["invalidacoes"] += descartada
+        if descartada and metricas.REGISTRO.ativo:
+            metricas.REGISTRO.incrementar("banco_dados_cache_pacientes_invalidacoes_total", 1, origem)
+
+    def registrar_cadastros(self, cpfs: Iterable[str]):
+        """
+        Informa que os CPFs passaram a existir no banco: descarta as ausências guardadas.
+        Um paciente já guardado continua valendo (o cadastro não altera quem já existe).
+
+        Args:
+            cpfs: CPFs dos pacientes cadastrados
+        """
+        cpfs = cpfs if isinstance(cpfs, (set, dict)) else set(cpfs)
+        with self._lock:
+            self._geracao += 1
+            # Percorre o menor dos dois (um lote pode ter milhões de CPFs)
+            if len(cpfs) <= len(self._entradas):
+                ausentes = [cpf for cpf in cpfs if cpf in self._entradas and self._entradas[cpf][0] is None]
+            else:
+                ausentes = [cpf for cpf, (paciente, _) in self._entradas.items() if paciente is None and cpf in cpfs]
+            for cpf in ausentes:
+                del self._entradas[cpf]
+            self._contadores["invalidacoes"] += len(ausentes)
+        if ausentes and metricas.REGISTRO.ativo:
+            metricas.REGISTRO.incrementar("banco_dados_cache_pacientes_invalidacoes_total", len(ausentes), "local")
+
+    def limpar(self, origem: str = "local"):
+        """
+        Esvazia o cache.
+
+        Args:
+            origem: Quem pediu a limpeza, para as métricas ('local', 'notificacao', 'reconexao')
+        """
+        with self._lock:
+            self._geracao += 1
+            descartadas = len(self._entradas)
+            self._entradas.clear()
+            self._contadores["invalidacoes"] += descartadas
+        if descartadas and metricas.REGISTRO.ativo:
+            metricas.REGISTRO.incrementar("banco_dados_cache_pacientes_invalidacoes_total", descartadas, origem)
+
+    def estatisticas(self) -> Dict:
+        """Retorna tamanho, contadores, taxa de acertos e idade (média e máxima, em s) das entradas devolvidas."""
+        with self._lock:
+            estatisticas = dict(self._contadores)
+            estatisticas["tamanho"] = len(self._entradas)
+            estatisticas["capacidade"] = self.capacidade
+            buscas = estatisticas["acertos"] + estatisticas["faltas"] + estatisticas["expirados"]
+            estatisticas["taxa_acertos"] = estatisticas["acertos"] / buscas if buscas else 0.0
+            estatisticas["idade_media"] = self._idade_total / estatisticas["acertos"] if estatisticas["acertos"] else 0.0
+            estatisticas["idade_maxima"] = self._idade_maxima
+        return estatisticas
+
+
+class OuvinteInvalidacoes:
+    def __init__(self, cache: CachePacientes, conectar: Callable, canal: str = CANAL_INVALIDACOES,
+                 intervalo_maximo: float = 60.0):
+        """
+        Escuta (LISTEN) as alterações de pacientes feitas por outros processos e as
+        aplica ao cache, em uma thread de fundo com conexão própria.
+
+        Args:
+            cache: Cache a invalidar
+            conectar: Função que abre uma conexão nova com o PostgreSQL
+            canal: Canal do NOTIFY
+            intervalo_maximo: Maior espera entre tentativas de reconexão
+        """
+        self.cache = cache
+        self._conectar = conectar
+        self.canal = canal
+        self.intervalo_maximo = intervalo_maximo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _escutar(self):
+        conn = self._conectar()
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {self.canal}")
+            cursor.close()
+            # Enquanto não estava escutando, alterações podem ter passado despercebidas
+            self.cache.limpar("reconexao")
+            while not self._parar.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notificacao = conn.notifies.pop(0)
+                    if notificacao.payload == "*":
+                        self.cache.limpar("notificacao")
+                    else:
+                        self.cache.invalidar(notificacao.payload, "notificacao")
+        finally:
+            conn.close()
+
+    def _executar(self):
+        espera = 1.0
+        while not self._parar.is_set():
+            inicio = time.monotonic()
+            try:
+                self._escutar()
+            except (psycopg2.Error, OSError) as e:
+                print(f"Erro ao escutar as alterações de pacientes: {e}")
+            # Conexão que durou um bom tempo: a falha é nova, recomeça a espera do início
+            if time.monotonic() - inicio > self.intervalo_maximo:
+                espera = 1.0
+            self._parar.wait(espera)
+            espera = min(espera * 2, self.intervalo_maximo)
+
+    def iniciar(self):
+        """Inicia a thread de fundo (uma vez)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, name="cache-pacientes-listen", daemon=True)
+        self._thread.start()
+
+    def parar(self, tempo_limite: float = 5.0):
+        """
+        Interrompe a escuta e fecha a conexão.
+
+        Args:
+            tempo_limite: Segundos de espera pelo fim da thread
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(tempo_limite)
+            self._thread = None
@@ -0,0 +1,122 @@
+# Módulo de Comandos Preparados no Servidor
+
+"""
+Este módulo prepara no PostgreSQL (PREPARE) as consultas mais frequentes do
+BancoDadosUtils, uma vez por conexão do pool, e as executa pelo nome (EXECUTE).
+Assim o servidor deixa de analisar e planejar o mesmo texto a cada chamada: o
+plano fica guardado na sessão e é reaproveitado enquanto a conexão viver.
+
+Cada conexão guarda quais comandos já preparou. Uma conexão nova (o pool
+descartou a anterior ou abriu mais uma) começa sem nenhum e prepara cada
+comando no primeiro uso. Se o servidor não tiver mais o comando (sessão
+reiniciada, DISCARD ALL), ele é preparado de novo e a execução repetida, desde
+que nada mais tenha sido feito na transação.
+
+Atrás de um PgBouncer em modo 'transaction', cada transação pode cair em outra
+sessão do servidor: desative os comandos preparados (AZURE_POSTGRES_COMANDOS_PREPARADOS=false).
+"""
+
+import threading
+import weakref
+from typing import Dict, Sequence, Tuple
+
+import psycopg2.errors
+import psycopg2.extensions
+
+from .consultas import (
+    SQL_BUSCAR_CHAVE_IDEMPOTENCIA,
+    SQL_BUSCAR_PACIENTE_POR_CPF,
+    SQL_BUSCAR_TRIAGENS_PACIENTE,
+    SQL_ID_PACIENTE_POR_CPF,
+    SQL_INSERIR_PACIENTE,
+    SQL_INSERIR_TRIAGEM,
+    SQL_REGISTRAR_ATENDIMENTO,
+    SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE,
+)
+
+# Nome: (consulta com parâmetros %s, tipos dos parâmetros na ordem). Os tipos são
+# declarados porque em INSERT ... SELECT o PostgreSQL não os deduz da tabela.
+COMANDOS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "inserir_paciente": (SQL_INSERIR_PACIENTE, ("varchar", "varchar", "date")),
+    "id_paciente_por_cpf": (SQL_ID_PACIENTE_POR_CPF, ("varchar",)),
+    "inserir_triagem": (SQL_INSERIR_TRIAGEM, ("integer", "text", "prioridade_triagem", "text")),
+    "registrar_atendimento": (SQL_REGISTRAR_ATENDIMENTO,
+                              ("varchar", "varchar", "date", "text", "prioridade_triagem", "text")),
+    "registrar_atendimento_idempotente": (SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE,
+                                          ("varchar", "varchar", "date", "varchar", "text",
+                                           "prioridade_triagem", "text", "timestamp", "varchar")),
+    "buscar_chave_idempotencia": (SQL_BUSCAR_CHAVE_IDEMPOTENCIA, ("varchar",)),
+    "buscar_paciente_por_cpf": (SQL_BUSCAR_PACIENTE_POR_CPF, ("varchar",)),
+    "buscar_triagens_paciente": (SQL_BUSCAR_TRIAGENS_PACIENTE, ("integer",)),
+}
+
+# Prefixo dos nomes no servidor, para não colidir com comandos preparados por outras bibliotecas
+_PREFIXO = "posto_"
+
+
+def _posicional(sql: str) -> str:
+    """Troca os parâmetros %s pelos $1, $2... exigidos pelo PREPARE."""
+    partes = sql.split("%s")
+    return "".join(parte + (f"${i}" if i < len(partes) else "") for i, parte in enumerate(partes, 1))
+
+
+class ComandosPreparados:
+    def __init__(self, ativo: bool = True, comandos: Dict[str, Tuple[str, Sequence[str]]] = COMANDOS):
+        """
+        Executa os comandos pelo nome, preparando-os no servidor quando ativo.
+
+        Args:
+            ativo: Usa PREPARE/EXECUTE (False executa o texto da consulta, como antes)
+            comandos: Comandos conhecidos, no formato de COMANDOS
+        """
+        self.ativo = ativo
+        self._sql = {nome: sql for nome, (sql, _) in comandos.items()}
+        self._prepare = {
+            nome: f"PREPARE {_PREFIXO}{nome} ({', '.join(tipos)}) AS {_posicional(sql)}"
+            for nome, (sql, tipos) in comandos.items()
+        }
+        self._execute = {
+            nome: f"EXECUTE {_PREFIXO}{nome} ({', '.join(['%s'] * len(tipos))})"
+            for nome, (sql, tipos) in comandos.items()
+        }
+        # Conexão -> nomes já preparados nela; a entrada some quando o pool descarta a conexão
+        self._por_conexao = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _preparados(self, conn) -> set:
+        with self._lock:
+            return self._por_conexao.setdefault(conn, set())
+
+    def executar(self, cursor, nome: str, parametros: Sequence = ()):
+        """
+        Executa um comando de COMANDOS no cursor (o resultado fica no cursor, como em execute).
+
+        Args:
+            cursor: Cursor da conexão em uso
+            nome: Chave do comando em COMANDOS
+            parametros: Parâmetros, na ordem da consulta
+        """
+        if not self.ativo:
+            cursor.execute(self._sql[nome], parametros)
+            return
+
+        conn = cursor.connection
+        preparados = self._preparados(conn)
+        # Só é seguro desfazer e repetir se o comando for o primeiro da transação
+        transacao_nova = conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        for tentativa in range(2):
+            try:
+                if nome not in preparados:
+                    cursor.execute(self._prepare[nome])
+                    preparados.add(nome)
+                cursor.execute(self._execute[nome], parametros)
+                return
+            except (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.DuplicatePreparedStatement) as e:
+                # O servidor perdeu o comando (sessão reiniciada) ou já o tinha: corrige o registro
+                if isinstance(e, psycopg2.errors.InvalidSqlStatementName):
+                    preparados.discard(nome)
+                else:
+                    preparados.add(nome)
+                if tentativa or not transacao_nova:
+                    raise
+                conn.rollback()
@@ -6,24 +6,118 @@ a partir de variáveis de ambiente ou arquivo .env
 """
 
 import os
-from dotenv import load_dotenv
 
-# Carregar variáveis de ambiente do arquivo .env se existir
-load_dotenv()
 
 class DatabaseConfig:
-    """Configurações do banco de dados PostgreSQL no Azure"""
-    
-    HOST = os.getenv('AZURE_POSTGRES_HOST')
-    DATABASE = os.getenv('AZURE_POSTGRES_DATABASE', 'posto_saude')
-    USER = os.getenv('AZURE_POSTGRES_USER')
-    PASSWORD = os.getenv('AZURE_POSTGRES_PASSWORD')
-    PORT = int(os.getenv('AZURE_POSTGRES_PORT', '5432'))
-    SSLMODE = os.getenv('AZURE_POSTGRES_SSLMODE', 'require')
+    """
+    Configurações do banco de dados PostgreSQL no Azure.
+    O arquivo .env só é lido na primeira chamada a carregar() (feita pelos
+    métodos abaixo), e não na importação do módulo.
+    """
+
+    _carregado = False
+
+    # Armazenamento: 'postgresql' (Azure) ou 'sqlite' (arquivo local)
+    BACKEND = None
+    SQLITE_CAMINHO = None
+
+    # Diário offline (gravação local com reenvio em segundo plano)
+    DIARIO_ATIVO = None
+    DIARIO_CAMINHO = None
+    DIARIO_INTERVALO = None
+
+    HOST = None
+    DATABASE = None
+    USER = None
+    PASSWORD = None
+    PORT = None
+    SSLMODE = None
+
+    # Pool de conexões
+    POOL_ATIVO = None
+    POOL_MINIMO = None
+    POOL_MAXIMO = None
+    POOL_TEMPO_OCIOSO = None
+    POOL_VERIFICAR_APOS = None
+    POOL_TEMPO_ESPERA = None
+
+    # Consultas frequentes preparadas no servidor (PREPARE/EXECUTE) em cada conexão
+    COMANDOS_PREPARADOS = None
+
+    # Cache em memória das buscas de pacientes por CPF
+    CACHE_PACIENTES_ATIVO = None
+    CACHE_PACIENTES_TAMANHO = None
+    CACHE_PACIENTES_TTL = None
+    CACHE_PACIENTES_TTL_AUSENTES = None
+    CACHE_PACIENTES_NOTIFICACOES = None
+
+    # Métricas e log de consultas lentas
+    METRICAS_ATIVAS = None
+    METRICAS_PORTA = None
+    METRICAS_ARQUIVO = None
+    LIMIAR_LENTO_MS = None
+
+    # Chave secreta da pseudonimização dos CPFs nas exportações
+    EXPORTACAO_CHAVE_PSEUDONIMO = None
+
+    @classmethod
+    def carregar(cls):
+        """Lê o arquivo .env (se existir) e as variáveis de ambiente, uma única vez."""
+        if cls._carregado:
+            return
+        from dotenv import load_dotenv
+
+        # Carregar variáveis de ambiente do arquivo .env se existir
+        load_dotenv()
+
+        cls.BACKEND = os.getenv('BANCO_DADOS_BACKEND', 'postgresql').lower()
+        cls.SQLITE_CAMINHO = os.getenv('BANCO_DADOS_SQLITE_CAMINHO') or os.path.join(
+            os.path.dirname(__file__), '..', '..', 'data', 'posto_saude.db'
+        )
+
+        cls.DIARIO_ATIVO = os.getenv('BANCO_DADOS_DIARIO_OFFLINE', 'false').lower() in ('1', 'true', 'sim')
+        cls.DIARIO_CAMINHO = os.getenv('BANCO_DADOS_DIARIO_CAMINHO') or os.path.join(
+            os.path.dirname(__file__), '..', '..', 'data', 'diario_offline.db'
+        )
+        cls.DIARIO_INTERVALO = float(os.getenv('BANCO_DADOS_DIARIO_INTERVALO', '5'))
+        cls.DIARIO_MAX_TENTATIVAS = int(os.getenv('BANCO_DADOS_DIARIO_MAX_TENTATIVAS', '3'))
+
+        cls.HOST = os.getenv('AZURE_POSTGRES_HOST')
+        cls.DATABASE = os.getenv('AZURE_POSTGRES_DATABASE', 'posto_saude')
+        cls.USER = os.getenv('AZURE_POSTGRES_USER')
+        cls.PASSWORD = os.getenv('AZURE_POSTGRES_PASSWORD')
+        cls.PORT = int(os.getenv('AZURE_POSTGRES_PORT', '5432'))
+        cls.SSLMODE = os.getenv('AZURE_POSTGRES_SSLMODE', 'require')
+
+        cls.POOL_ATIVO = os.getenv('AZURE_POSTGRES_POOL_ATIVO', 'true').lower() in ('1', 'true', 'sim')
+        cls.POOL_MINIMO = int(os.getenv('AZURE_POSTGRES_POOL_MINIMO', '1'))
+        cls.POOL_MAXIMO = int(os.getenv('AZURE_POSTGRES_POOL_MAXIMO', '10'))
+        cls.POOL_TEMPO_OCIOSO = float(os.getenv('AZURE_POSTGRES_POOL_TEMPO_OCIOSO', '300'))
+        cls.POOL_VERIFICAR_APOS = float(os.getenv('AZURE_POSTGRES_POOL_VERIFICAR_APOS', '30'))
+        cls.POOL_TEMPO_ESPERA = float(os.getenv('AZURE_POSTGRES_POOL_TEMPO_ESPERA', '30'))
+        cls.COMANDOS_PREPARADOS = os.getenv('AZURE_POSTGRES_COMANDOS_PREPARADOS', 'true').lower() in ('1', 'true', 'sim')
+
+        cls.CACHE_PACIENTES_ATIVO = os.getenv('AZURE_POSTGRES_CACHE_PACIENTES', 'true').lower() in ('1', 'true', 'sim')
+        cls.CACHE_PACIENTES_TAMANHO = int(os.getenv('AZURE_POSTGRES_CACHE_PACIENTES_TAMANHO', '10000'))
+        cls.CACHE_PACIENTES_TTL = float(os.getenv('AZURE_POSTGRES_CACHE_PACIENTES_TTL', '300'))
+        # Sem valor, BancoDadosUtils decide: o TTL com as notificações ativas, 0 sem elas
+        ttl_ausentes = os.getenv('AZURE_POSTGRES_CACHE_PACIENTES_TTL_AUSENTES')
+        cls.CACHE_PACIENTES_TTL_AUSENTES = float(ttl_ausentes) if ttl_ausentes else None
+        cls.CACHE_PACIENTES_NOTIFICACOES = os.getenv(
+            'AZURE_POSTGRES_CACHE_PACIENTES_NOTIFICACOES', 'false').lower() in ('1', 'true', 'sim')
+
+        cls.METRICAS_ATIVAS = os.getenv('AZURE_POSTGRES_METRICAS', 'false').lower() in ('1', 'true', 'sim')
+        cls.METRICAS_PORTA = int(os.getenv('AZURE_POSTGRES_METRICAS_PORTA', '0'))
+        cls.METRICAS_ARQUIVO = os.getenv('AZURE_POSTGRES_METRICAS_ARQUIVO') or None
+        cls.LIMIAR_LENTO_MS = float(os.getenv('AZURE_POSTGRES_LIMIAR_LENTO_MS', '0'))
+
+        cls.EXPORTACAO_CHAVE_PSEUDONIMO = os.getenv('EXPORTACAO_CHAVE_PSEUDONIMO') or None
+        cls._carregado = True
     
     @classmethod
     def validate(cls):
         """Valida se todas as configurações necessárias estão presentes"""
+        cls.carregar()
         required_vars = ['HOST', 'DATABASE', 'USER', 'PASSWORD']
         missing_vars = []
         
@@ -52,3 +146,66 @@ class DatabaseConfig:
             'sslmode': cls.SSLMODE
         }
 
+    @classmethod
+    def get_pool_config(cls):
+        """Retorna os parâmetros do pool de conexões"""
+        cls.carregar()
+        return {
+            'minimo': cls.POOL_MINIMO,
+            'maximo': cls.POOL_MAXIMO,
+            'tempo_ocioso': cls.POOL_TEMPO_OCIOSO,
+            'verificar_apos': cls.POOL_VERIFICAR_APOS,
+            'tempo_espera': cls.POOL_TEMPO_ESPERA
+        }
+
+    @classmethod
+    def get_backend(cls):
+        """Retorna o nome do armazenamento configurado ('postgresql' ou 'sqlite')"""
+        cls.carregar()
+        return cls.BACKEND
+
+    @classmethod
+    def get_sqlite_caminho(cls):
+        """Retorna o caminho do arquivo do banco SQLite local"""
+        cls.carregar()
+        return cls.SQLITE_CAMINHO
+
+    @classmethod
+    def get_diario_config(cls):
+        """Retorna os parâmetros do diário offline"""
+        cls.carregar()
+        return {
+            'ativo': cls.DIARIO_ATIVO,
+            'caminho': cls.DIARIO_CAMINHO,
+            'intervalo': cls.DIARIO_INTERVALO,
+            'max_tentativas': cls.DIARIO_MAX_TENTATIVAS
+        }
+
+    @classmethod
+    def get_cache_pacientes_config(cls):
+        """Retorna os parâmetros do cache de pacientes"""
+        cls.carregar()
+        return {
+            'ativo': cls.CACHE_PACIENTES_ATIVO,
+            'capacidade': cls.CACHE_PACIENTES_TAMANHO,
+            'ttl': cls.CACHE_PACIENTES_TTL,
+            'ttl_ausentes': cls.CACHE_PACIENTES_TTL_AUSENTES,
+            'notificacoes': cls.CACHE_PACIENTES_NOTIFICACOES
+        }
+
+    @classmethod
+    def get_metricas_config(cls):
+        """Retorna os parâmetros das métricas e do log de consultas lentas"""
+        cls.carregar()
+        return {
+            'ativo': cls.METRICAS_ATIVAS,
+            'limiar_lento_ms': cls.LIMIAR_LENTO_MS,
+            'porta': cls.METRICAS_PORTA,
+            'arquivo': cls.METRICAS_ARQUIVO
+        }
+
+    @classmethod
+    def get_chave_pseudonimo(cls):
+        """Retorna a chave da pseudonimização dos CPFs exportados (None se não configurada)"""
+        cls.carregar()
+        return cls.EXPORTACAO_CHAVE_PSEUDONIMO
@@ -0,0 +1,401 @@
+# Módulo de Consultas SQL do Banco de Dados
+
+"""
+Este módulo reúne as consultas SQL usadas tanto pelo BancoDadosUtils (síncrono)
+quanto pelo BancoDadosAsync, para que as duas camadas devolvam exatamente os
+mesmos dados, na mesma ordem.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from triagem.triagem_ia import CODIGOS_PRIORIDADE
+
+# Posição de cada nível na fila de atendimento (menor é atendido primeiro): os
+# códigos de prioridade da triagem, que seguem a ordem do tipo prioridade_triagem
+# no PostgreSQL
+ORDEM_PRIORIDADE = CODIGOS_PRIORIDADE
+
+# A mesma posição calculada em SQL, para ordenar igual nos dois armazenamentos: no
+# SQLite a prioridade é TEXT, e ORDER BY prioridade seria a ordem alfabética
+SQL_ORDEM_PRIORIDADE = "CASE prioridade {} END".format(
+    " ".join(f"WHEN '{prioridade}' THEN {ordem}" for prioridade, ordem in ORDEM_PRIORIDADE.items())
+)
+
+SQL_INSERIR_PACIENTE = """
+    INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
+    VALUES (%s, %s, %s)
+    RETURNING id
+"""
+
+SQL_ID_PACIENTE_POR_CPF = "SELECT id FROM pacientes WHERE cpf = %s"
+
+# Também devolve o nome e o CPF do paciente, repassados aos ouvintes de triagem
+SQL_INSERIR_TRIAGEM = """
+    WITH triagem AS (
+        INSERT INTO triagens (paciente_id, sintomas, prioridade, justificativa_triagem)
+        VALUES (%s, %s, %s, %s)
+        RETURNING id, paciente_id, data_triagem
+    )
+    SELECT t.id, t.data_triagem, p.nome_completo, p.cpf
+    FROM triagem t
+    JOIN pacientes p ON p.id = t.paciente_id
+"""
+
+# O DO UPDATE sem alteração real garante que o RETURNING traga o ID
+# também quando o CPF já está cadastrado
+SQL_REGISTRAR_ATENDIMENTO = """
+    WITH paciente AS (
+        INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (cpf) DO UPDATE SET cpf = EXCLUDED.cpf
+        RETURNING id
+    )
+    INSERT INTO triagens (paciente_id, sintomas, prioridade, justificativa_triagem)
+    SELECT id, %s, %s, %s FROM paciente
+    RETURNING paciente_id, id, data_triagem
+"""
+
+# Versão com chave de idempotência (e data da triagem opcional, para reenvios do
+# diário offline): se a chave já foi usada nada é gravado e nenhuma linha volta,
+# e o registro original é lido com SQL_BUSCAR_CHAVE_IDEMPOTENCIA. Dois envios
+# simultâneos da mesma chave: o segundo falha com UniqueViolation e também lê o original.
+SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE = """
+    WITH paciente AS (
+        INSERT INTO pacientes (nome_completo, cpf, data_nascimento)
+        SELECT %s, %s, %s
+        WHERE NOT EXISTS (SELECT 1 FROM chaves_idempotencia WHERE chave = %s)
+        ON CONFLICT (cpf) DO UPDATE SET cpf = EXCLUDED.cpf
+        RETURNING id
+    ), triagem AS (
+        INSERT INTO triagens (paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem)
+        SELECT id, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP) FROM paciente
+        RETURNING paciente_id, id, data_triagem
+    ), chave AS (
+        INSERT INTO chaves_idempotencia (chave, paciente_id, triagem_id)
+        SELECT %s, paciente_id, id FROM triagem
+    )
+    SELECT paciente_id, id, data_triagem FROM triagem
+"""
+
+SQL_BUSCAR_CHAVE_IDEMPOTENCIA = "SELECT paciente_id, triagem_id FROM chaves_idempotencia WHERE chave = %s"
+
+
+def parametros_atendimento_idempotente(nome_completo, cpf, data_nascimento, sintomas, prioridade,
+                                       justificativa, chave_idempotencia, data_triagem=None) -> tuple:
+    """Parâmetros de SQL_REGISTRAR_ATENDIMENTO_IDEMPOTENTE, na ordem da consulta."""
+    return (nome_completo, cpf, data_nascimento, chave_idempotencia,
+            sintomas, prioridade, justificativa, data_triagem, chave_idempotencia)
+
+
+# Uma nova chamada do mesmo paciente substitui a anterior
+SQL_REGISTRAR_CHAMADA_FILA = """
+    INSERT INTO chamadas_fila (paciente_id, chamado_em)
+    VALUES (%s, CURRENT_TIMESTAMP)
+    ON CONFLICT (paciente_id) DO UPDATE SET chamado_em = EXCLUDED.chamado_em
+"""
+
+SQL_BUSCAR_PACIENTE_POR_CPF = """
+    SELECT id, nome_completo, cpf, data_nascimento, data_registro
+    FROM pacientes WHERE cpf = %s
+"""
+
+SQL_BUSCAR_TRIAGENS_PACIENTE = """
+    SELECT id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem
+    FROM triagens
+    WHERE paciente_id = %s
+    ORDER BY data_triagem DESC, id DESC
+"""
+
+
+def codificar_cursor(ordem: Optional[int], data_triagem: datetime, identificador: int) -> str:
+    """Gera o token opaco que marca a posição da última linha de uma página."""
+    posicao = [ordem, data_triagem.isoformat(), identificador]
+    return base64.urlsafe_b64encode(json.dumps(posicao).encode()).decode()
+
+
+def decodificar_cursor(token: str) -> Tuple[Optional[int], datetime, int]:
+    """Lê um token de paginação. Levanta ValueError se ele for inválido."""
+    try:
+        ordem, data_triagem, identificador = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return ordem, datetime.fromisoformat(data_triagem), int(identificador)
+    except Exception as e:
+        raise ValueError(f"Cursor de paginação inválido: {token!r}") from e
+
+
+def consulta_fila(prioridade: Optional[str] = None, desde: Optional[datetime] = None,
+                  cursor_pagina: Optional[str] = None, limite: Optional[int] = None,
+                  aguardando: bool = False) -> Tuple[str, List]:
+    """
+    Monta a consulta da fila (última triagem de cada paciente, tabela fila_atual),
+    na ordem de atendimento. Com 'limite', traz limite + 1 linhas e a coluna
+    ordem_prioridade, usadas para montar o cursor da próxima página.
+    Retorna (sql, parâmetros). A prioridade deve ser uma chave de ORDEM_PRIORIDADE.
+
+    Args:
+        prioridade: Filtro de prioridade (opcional)
+        desde: Considera apenas pacientes cuja última triagem é a partir deste horário (opcional)
+        cursor_pagina: Cursor devolvido pela página anterior (opcional)
+        limite: Quantidade de pacientes por página (None para a fila inteira)
+        aguardando: Omite os pacientes chamados da fila depois da última triagem
+            (tabela chamadas_fila)
+    """
+    condicoes, parametros = [], []
+    juncao = ""
+    if aguardando:
+        juncao = "LEFT JOIN chamadas_fila c ON c.paciente_id = f.paciente_id"
+        condicoes.append("(c.chamado_em IS NULL OR c.chamado_em < f.data_triagem)")
+    if prioridade:
+        condicoes.append("f.ordem_prioridade = %s")
+        parametros.append(ORDEM_PRIORIDADE[prioridade])
+    if desde is not None:
+        condicoes.append("f.data_triagem >= %s")
+        parametros.append(desde)
+    if cursor_pagina:
+        ordem, data_triagem, paciente_id = decodificar_cursor(cursor_pagina)
+        # Prioridade em ordem crescente, data e ID em ordem decrescente
+        condicoes.append("""(f.ordem_prioridade > %s OR (f.ordem_prioridade = %s
+                             AND (f.data_triagem, f.paciente_id) < (%s, %s)))""")
+        parametros += [ordem, ordem, data_triagem, paciente_id]
+    filtro = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+
+    colunas = "p.id, p.nome_completo, p.cpf, f.prioridade, f.data_triagem"
+    paginacao = ""
+    if limite is not None:
+        colunas += ", f.ordem_prioridade"
+        paginacao = "LIMIT %s"
+        parametros.append(limite + 1)
+
+    sql = f"""
+        SELECT {colunas}
+        FROM fila_atual f
+        JOIN pacientes p ON p.id = f.paciente_id
+        {juncao}
+        {filtro}
+        ORDER BY f.ordem_prioridade, f.data_triagem DESC, f.paciente_id DESC
+        {paginacao}
+    """
+    return sql, parametros
+
+
+def consulta_triagens_paciente(paciente_id: int, cursor_pagina: Optional[str] = None,
+                               limite: Optional[int] = None) -> Tuple[str, List]:
+    """
+    Monta a consulta das triagens de um paciente, da mais recente para a mais antiga,
+    paginada pela chave (data_triagem, id). Com 'limite', traz limite + 1 linhas.
+    Retorna (sql, parâmetros).
+
+    Args:
+        paciente_id: ID do paciente
+        cursor_pagina: Cursor devolvido pela página anterior (opcional)
+        limite: Quantidade de triagens por página (None para o histórico inteiro)
+    """
+    parametros = [paciente_id]
+    condicao = ""
+    if cursor_pagina:
+        _, data_triagem, triagem_id = decodificar_cursor(cursor_pagina)
+        # A comparação de linhas não serve para eliminar partições; a condição
+        # simples sobre data_triagem descarta os meses posteriores ao cursor
+        condicao = "AND data_triagem <= %s AND (data_triagem, id) < (%s, %s)"
+        parametros += [data_triagem, data_triagem, triagem_id]
+
+    paginacao = ""
+    if limite is not None:
+        paginacao = "LIMIT %s"
+        parametros.append(limite + 1)
+
+    sql = f"""
+        SELECT id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem
+        FROM triagens
+        WHERE paciente_id = %s {condicao}
+        ORDER BY data_triagem DESC, id DESC
+        {paginacao}
+    """
+    return sql, parametros
+
+
+def consulta_triagens_desde(ultimo_id: int, desde: Optional[datetime] = None,
+                            limite: int = 1000, aguardando: bool = False) -> Tuple[str, List]:
+    """
+    Monta a consulta das triagens gravadas depois de 'ultimo_id' (em ordem de ID),
+    com o nome e o CPF do paciente: a atualização incremental dos painéis da equipe.
+    Retorna (sql, parâmetros).
+
+    Args:
+        ultimo_id: Maior ID de triagem já conhecido (0 para começar do início)
+        desde: Considera apenas triagens a partir deste horário (opcional; no
+            PostgreSQL, lê só as partições do período)
+        limite: Quantidade máxima de triagens
+        aguardando: Omite as triagens de pacientes chamados da fila depois delas
+            (tabela chamadas_fila)
+    """
+    parametros = [ultimo_id]
+    juncao, condicoes = "", []
+    if aguardando:
+        juncao = "LEFT JOIN chamadas_fila c ON c.paciente_id = t.paciente_id"
+        condicoes.append("AND (c.chamado_em IS NULL OR c.chamado_em < t.data_triagem)")
+    if desde is not None:
+        condicoes.append("AND t.data_triagem >= %s")
+        parametros.append(desde)
+    parametros.append(limite)
+
+    sql = f"""
+        SELECT t.id, t.paciente_id, p.nome_completo, p.cpf, t.prioridade, t.data_triagem
+        FROM triagens t
+        JOIN pacientes p ON p.id = t.paciente_id
+        {juncao}
+        WHERE t.id > %s {' '.join(condicoes)}
+        ORDER BY t.id
+        LIMIT %s
+    """
+    return sql, parametros
+
+
+# Chamadas da fila gravadas a partir de um horário (idx_chamadas_fila_chamado_em), para
+# que os painéis tirem da fila os pacientes chamados por outros processos
+SQL_CHAMADAS_FILA_DESDE = """
+    SELECT paciente_id, chamado_em FROM chamadas_fila
+    WHERE chamado_em >= %s
+    ORDER BY chamado_em
+"""
+
+
+# Tabela e coluna do período de cada granularidade das estatísticas de triagens (migração 0006)
+TABELAS_ESTATISTICAS = {'hora': ('estatisticas_triagens_hora', 'hora'), 'dia': ('estatisticas_triagens_dia', 'dia')}
+
+
+def consulta_estatisticas_triagens(granularidade: str = 'dia', inicio: Optional[datetime] = None,
+                                   fim: Optional[datetime] = None) -> Tuple[str, List]:
+    """
+    Monta a consulta da quantidade de triagens por período e prioridade (tabelas
+    estatisticas_triagens_hora e _dia), em ordem de período e de atendimento. O
+    custo depende da extensão do período, não da quantidade de triagens. Retorna
+    (sql, parâmetros).
+
+    Args:
+        granularidade: 'hora' ou 'dia'
+        inicio: Início do período (opcional; nos dias, conta o dia inteiro)
+        fim: Fim do período, exclusivo (opcional; nos dias, um horário depois da
+            meia-noite inclui o próprio dia)
+    """
+    if granularidade not in TABELAS_ESTATISTICAS:
+        raise ValueError(f"Granularidade inválida: {granularidade} (use 'hora' ou 'dia').")
+    tabela, coluna = TABELAS_ESTATISTICAS[granularidade]
+    if granularidade == 'dia':
+        if isinstance(inicio, datetime):
+            inicio = inicio.date()
+        if isinstance(fim, datetime):
+            fim = fim.date() + timedelta(days=1) if fim.time() != time.min else fim.date()
+
+    condicoes, parametros = [], []
+    if inicio is not None:
+        condicoes.append(f"{coluna} >= %s")
+        parametros.append(inicio)
+    if fim is not None:
+        condicoes.append(f"{coluna} < %s")
+        parametros.append(fim)
+    filtro = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    sql = f"""
+        SELECT {coluna}, prioridade, quantidade
+        FROM {tabela}
+        {filtro}
+        ORDER BY {coluna}, {SQL_ORDEM_PRIORIDADE}
+    """
+    return sql, parametros
+
+
+# Colunas de cada exportação (o CPF do paciente segue junto das triagens, para que
+# o destino relacione as triagens aos pacientes mesmo com CPFs pseudonimizados)
+COLUNAS_EXPORTACAO = {
+    'pacientes': ['id', 'nome_completo', 'cpf', 'data_nascimento', 'data_registro'],
+    'triagens': ['id', 'paciente_id', 'cpf', 'prioridade', 'sintomas', 'justificativa_triagem', 'data_triagem'],
+}
+
+
+def consulta_exportacao(tabela: str, inicio: Optional[datetime] = None,
+                        fim: Optional[datetime] = None) -> Tuple[str, List]:
+    """
+    Monta a consulta de exportação de pacientes (filtrados pela data de cadastro) ou
+    de triagens (pela data da triagem; no PostgreSQL, lê só as partições do período),
+    com as colunas de COLUNAS_EXPORTACAO, em ordem de ID. Retorna (sql, parâmetros).
+
+    Args:
+        tabela: 'pacientes' ou 'triagens'
+        inicio: Início do período (opcional)
+        fim: Fim do período, exclusivo (opcional)
+    """
+    if tabela not in COLUNAS_EXPORTACAO:
+        raise ValueError(f"Tabela de exportação inválida: {tabela} (use 'pacientes' ou 'triagens').")
+    coluna_data = "p.data_registro" if tabela == 'pacientes' else "t.data_triagem"
+
+    condicoes, parametros = [], []
+    if inicio is not None:
+        condicoes.append(f"{coluna_data} >= %s")
+        parametros.append(inicio)
+    if fim is not None:
+        condicoes.append(f"{coluna_data} < %s")
+        parametros.append(fim)
+    filtro = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    if tabela == 'pacientes':
+        sql = f"""
+            SELECT p.id, p.nome_completo, p.cpf, p.data_nascimento, p.data_registro
+            FROM pacientes p
+            {filtro}
+            ORDER BY p.id
+        """
+    else:
+        sql = f"""
+            SELECT t.id, t.paciente_id, p.cpf, t.prioridade, t.sintomas, t.justificativa_triagem, t.data_triagem
+            FROM triagens t
+            JOIN pacientes p ON p.id = t.paciente_id
+            {filtro}
+            ORDER BY t.id
+        """
+    return sql, parametros
+
+
+def limite_retencao(meses_retencao: int, hoje: Optional[date] = None) -> date:
+    """
+    Primeiro dia do mês a partir do qual as triagens são mantidas: com 24 meses de
+    retenção em março de 2026, tudo antes de 01/03/2024 pode ser arquivado.
+
+    Args:
+        meses_retencao: Quantidade de meses completos mantidos antes do mês atual
+        hoje: Data de referência (padrão: hoje)
+    """
+    hoje = hoje or date.today()
+    meses = hoje.year * 12 + hoje.month - 1 - meses_retencao
+    return date(meses // 12, meses % 12 + 1, 1)
+
+
+def pagina_fila(pacientes: List[dict], limite: int) -> Tuple[List[dict], Optional[str]]:
+    """Corta as limite + 1 linhas de consulta_fila em (página, cursor da próxima página)."""
+    proximo = None
+    if len(pacientes) > limite:
+        pacientes = pacientes[:limite]
+        ultimo = pacientes[-1]
+        proximo = codificar_cursor(ultimo['ordem_prioridade'], ultimo['data_triagem'], ultimo['id'])
+    for paciente in pacientes:
+        del paciente['ordem_prioridade']
+    return pacientes, proximo
+
+
+def pagina_triagens(triagens: List[dict], limite: int) -> Tuple[List[dict], Optional[str]]:
+    """Corta as limite + 1 linhas de consulta_triagens_paciente em (página, cursor da próxima página)."""
+    proximo = None
+    if len(triagens) > limite:
+        triagens = triagens[:limite]
+        proximo = codificar_cursor(None, triagens[-1]['data_triagem'], triagens[-1]['id'])
+    return triagens, proximo
+
+
+def formatar_paciente(paciente) -> dict:
+    """Converte a linha de SQL_BUSCAR_PACIENTE_POR_CPF para o dicionário devolvido às telas."""
+    paciente_dict = dict(paciente)
+    if paciente_dict['data_nascimento']:
+        paciente_dict['data_nascimento'] = paciente_dict['data_nascimento'].strftime("%d/%m/%Y")
+    return paciente_dict
@@ -0,0 +1,328 @@
+# Módulo do Diário Offline de Atendimentos
+
+"""
+Este módulo grava os atendimentos primeiro em um diário local e durável (um
+arquivo SQLite) e os reenvia ao banco de dados principal em segundo plano.
+Assim, o quiosque responde sem esperar a rede até o Azure, e uma queda ou
+lentidão do PostgreSQL não perde nenhum registro: ele fica no diário até ser
+confirmado.
+
+Cada atendimento recebe uma chave de idempotência ao entrar no diário. O
+reenvio usa reenviar_atendimentos do armazenamento com essas chaves, então
+repetir um lote (após uma falha no meio do caminho, ou com dois processos
+sincronizando o mesmo diário) nunca grava uma triagem duas vezes.
+
+Uma falha de conexão deixa o lote inteiro para a próxima vez. Já um atendimento
+recusado pelo banco (dados inválidos) não impede o reenvio dos demais: ele conta
+uma tentativa e, após max_tentativas recusas, sai da fila de reenvio para a
+tabela de rejeitados do diário, com um aviso para o operador.
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+_ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS pendentes (
+        seq INTEGER PRIMARY KEY,
+        chave TEXT NOT NULL UNIQUE,
+        nome_completo TEXT NOT NULL,
+        cpf TEXT NOT NULL,
+        data_nascimento TEXT NOT NULL,
+        sintomas TEXT NOT NULL,
+        prioridade TEXT NOT NULL,
+        justificativa TEXT,
+        data_triagem TEXT NOT NULL,
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        ultimo_erro TEXT
+    )
+"""
+
+# Atendimentos que o banco recusou max_tentativas vezes; ficam guardados para correção manual
+_ESQUEMA_REJEITADOS = """
+    CREATE TABLE IF NOT EXISTS rejeitados (
+        seq INTEGER PRIMARY KEY,
+        chave TEXT NOT NULL UNIQUE,
+        nome_completo TEXT NOT NULL,
+        cpf TEXT NOT NULL,
+        data_nascimento TEXT NOT NULL,
+        sintomas TEXT NOT NULL,
+        prioridade TEXT NOT NULL,
+        justificativa TEXT,
+        data_triagem TEXT NOT NULL,
+        tentativas INTEGER NOT NULL,
+        ultimo_erro TEXT,
+        rejeitado_em TEXT NOT NULL
+    )
+"""
+
+_COLUNAS = ("chave", "nome_completo", "cpf", "data_nascimento", "sintomas",
+            "prioridade", "justificativa", "data_triagem")
+
+
+class DiarioOffline:
+    def __init__(self, caminho: str):
+        """
+        Abre (ou cria) o diário. Gravações de várias threads são serializadas.
+
+        Args:
+            caminho: Arquivo SQLite do diário
+        """
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        # Até ser reenviado, o diário é a única cópia do atendimento: fsync a cada gravação
+        self._conn.execute("PRAGMA synchronous = FULL")
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self._conn.execute(_ESQUEMA)
+        self._conn.execute(_ESQUEMA_REJEITADOS)
+
+    def registrar_atendimento(self, nome_completo: str, cpf: str, data_nascimento: str,
+                              sintomas: str, prioridade: str, justificativa: str,
+                              chave_idempotencia: Optional[str] = None) -> str:
+        """
+        Grava um atendimento no diário e retorna sua chave de idempotência.
+        Levanta ValueError se a data de nascimento for inválida (o reenvio a rejeitaria).
+
+        Args:
+            nome_completo: Nome completo do paciente
+            cpf: CPF do paciente (apenas números)
+            data_nascimento: Data de nascimento no formato DD/MM/AAAA
+            sintomas: Descrição dos sintomas
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            justificativa: Justificativa da triagem
+            chave_idempotencia: Chave já gerada pelo chamador (padrão: uma nova)
+        """
+        datetime.strptime(data_nascimento, "%d/%m/%Y")
+        chave = chave_idempotencia or uuid.uuid4().hex
+        # O horário da triagem é o da chegada do paciente, não o do reenvio
+        data_triagem = datetime.now().isoformat(" ", "microseconds")
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO pendentes ({', '.join(_COLUNAS)}) VALUES ({', '.join('?' * len(_COLUNAS))})",
+                (chave, nome_completo, cpf, data_nascimento, sintomas, prioridade, justificativa, data_triagem)
+            )
+        return chave
+
+    def pendentes(self, limite: int = 100, depois_de: int = 0) -> List[Dict]:
+        """
+        Retorna até 'limite' atendimentos ainda não confirmados, na ordem de chegada,
+        no formato aceito por registrar_atendimentos_lote (mais 'seq', a posição no diário).
+
+        Args:
+            limite: Quantidade máxima de atendimentos
+            depois_de: Retorna apenas os atendimentos com 'seq' maior que este
+        """
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT seq, {', '.join(_COLUNAS)} FROM pendentes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (depois_de, limite)
+            ).fetchall()
+        atendimentos = []
+        for linha in linhas:
+            atendimento = dict(linha)
+            atendimento['chave_idempotencia'] = atendimento.pop('chave')
+            atendimento['data_triagem'] = datetime.fromisoformat(atendimento['data_triagem'])
+            atendimentos.append(atendimento)
+        return atendimentos
+
+    def confirmar(self, chaves: Iterable[str]):
+        """
+        Remove do diário os atendimentos já gravados no banco de dados.
+
+        Args:
+            chaves: Chaves de idempotência confirmadas
+        """
+        with self._lock:
+            self._conn.executemany("DELETE FROM pendentes WHERE chave = ?", ((chave,) for chave in chaves))
+
+    def registrar_falha(self, chaves: Iterable[str], erro: str, recusado: bool = True):
+        """
+        Anota um reenvio sem sucesso (os atendimentos continuam pendentes). Só as
+        recusas do banco contam em 'tentativas'; uma falha de conexão não diz nada
+        sobre o atendimento e apenas atualiza 'ultimo_erro'.
+
+        Args:
+            chaves: Chaves de idempotência dos atendimentos
+            erro: Descrição da falha
+            recusado: Se o banco recusou os atendimentos (False para falhas de conexão)
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE pendentes SET tentativas = tentativas + ?, ultimo_erro = ? WHERE chave = ?",
+                ((int(recusado), erro, chave) for chave in chaves)
+            )
+
+    def rejeitar(self, max_tentativas: int) -> List[Dict]:
+        """
+        Move para a tabela de rejeitados os atendimentos recusados pelo banco
+        'max_tentativas' vezes ou mais, e os retorna (sem os sintomas).
+
+        Args:
+            max_tentativas: Recusas a partir das quais o atendimento deixa de ser reenviado
+        """
+        colunas = ", ".join(_COLUNAS)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                linhas = self._conn.execute(
+                    "SELECT chave, nome_completo, cpf, tentativas, ultimo_erro FROM pendentes "
+                    "WHERE tentativas >= ? ORDER BY seq", (max_tentativas,)
+                ).fetchall()
+                self._conn.execute(
+                    f"INSERT OR IGNORE INTO rejeitados (seq, {colunas}, tentativas, ultimo_erro, rejeitado_em) "
+                    f"SELECT seq, {colunas}, tentativas, ultimo_erro, ? FROM pendentes WHERE tentativas >= ?",
+                    (datetime.now().isoformat(" ", "seconds"), max_tentativas)
+                )
+                self._conn.execute("DELETE FROM pendentes WHERE tentativas >= ?", (max_tentativas,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [dict(linha) for linha in linhas]
+
+    def rejeitados(self) -> List[Dict]:
+        """Retorna os atendimentos rejeitados, do mais antigo ao mais recente."""
+        with self._lock:
+            linhas = self._conn.execute("SELECT * FROM rejeitados ORDER BY seq").fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def quantidade(self) -> int:
+        """Retorna quantos atendimentos aguardam reenvio."""
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM pendentes").fetchone()[0]
+
+    def quantidade_rejeitados(self) -> int:
+        """Retorna quantos atendimentos foram rejeitados e aguardam correção manual."""
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM rejeitados").fetchone()[0]
+
+    def fechar(self):
+        """Fecha o arquivo do diário."""
+        with self._lock:
+            self._conn.close()
+
+
+class SincronizadorDiario:
+    def __init__(self, diario: DiarioOffline, fabrica_db: Callable, intervalo: float = 5.0,
+                 tamanho_lote: int = 100, intervalo_maximo: float = 300.0, max_tentativas: int = 3):
+        """
+        Reenvia o diário ao banco de dados em uma thread de fundo.
+
+        Args:
+            diario: Diário com os atendimentos pendentes
+            fabrica_db: Função que retorna o armazenamento de destino (ex.: criar_backend); chamada
+                até funcionar, para que o quiosque inicie mesmo com o banco fora do ar
+            intervalo: Segundos entre as verificações do diário
+            tamanho_lote: Atendimentos reenviados por transação
+            intervalo_maximo: Maior espera entre tentativas enquanto o banco estiver falhando
+            max_tentativas: Recusas do banco após as quais um atendimento vai para os rejeitados
+        """
+        self.diario = diario
+        self._fabrica_db = fabrica_db
+        self._db = None
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_maximo = intervalo_maximo
+        self.max_tentativas = max_tentativas
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        # Evita dois reenvios simultâneos do mesmo sincronizador (thread de fundo e chamada manual)
+        self._lock = threading.Lock()
+
+    def _banco(self):
+        if self._db is None:
+            self._db = self._fabrica_db()
+        return self._db
+
+    def sincronizar(self) -> Optional[int]:
+        """
+        Reenvia todo o diário, lote a lote. Retorna quantos atendimentos foram
+        confirmados, ou None se o banco de dados falhou (o restante fica para a próxima vez).
+        Os atendimentos recusados pelo banco ficam para a próxima passagem, até irem
+        para os rejeitados.
+        """
+        with self._lock:
+            enviados, ultimo_seq = 0, 0
+            while True:
+                lote = self.diario.pendentes(self.tamanho_lote, depois_de=ultimo_seq)
+                if not lote:
+                    return enviados
+                # Os recusados continuam pendentes: a passagem segue a partir do fim do lote
+                ultimo_seq = lote[-1]['seq']
+                chaves = [atendimento['chave_idempotencia'] for atendimento in lote]
+                try:
+                    resposta = self._banco().reenviar_atendimentos(lote)
+                except Exception as e:
+                    # Inclui a criação do armazenamento (banco inacessível ao iniciar)
+                    print(f"Erro ao sincronizar o diário offline: {e}")
+                    resposta, erro = None, str(e)
+                else:
+                    erro = "falha de comunicação com o banco de dados"
+                if resposta is None:
+                    self.diario.registrar_falha(chaves, erro, recusado=False)
+                    return None
+                _, recusados = resposta
+                self.diario.confirmar(chave for chave in chaves if chave not in recusados)
+                enviados += len(chaves) - len(recusados)
+                if recusados:
+                    for chave, erro in recusados.items():
+                        self.diario.registrar_falha([chave], erro)
+                    self._rejeitar()
+
+    def _rejeitar(self):
+        """Tira da fila de reenvio os atendimentos recusados max_tentativas vezes, avisando o operador."""
+        for atendimento in self.diario.rejeitar(self.max_tentativas):
+            print(f"Atenção: o banco de dados recusou {atendimento['tentativas']} vezes o atendimento de "
+                  f"{atendimento['nome_completo']} (chave {atendimento['chave']}); ele foi movido para "
+                  f"os rejeitados do diário offline e precisa ser corrigido manualmente. "
+                  f"Último erro: {atendimento['ultimo_erro']}")
+
+    def _executar(self):
+        espera = self.intervalo
+        while not self._parar.is_set():
+            self._acordar.wait(espera)
+            self._acordar.clear()
+            if self._parar.is_set():
+                break
+            enviados = self.sincronizar()
+            if enviados is None:
+                # Banco fora do ar ou lento: espera cada vez mais, até intervalo_maximo
+                espera = min(espera * 2, self.intervalo_maximo)
+            else:
+                if enviados:
+                    print(f"Diário offline: {enviados} atendimentos sincronizados.")
+                espera = self.intervalo
+
+    def iniciar(self):
+        """Inicia a thread de fundo (uma vez) e um primeiro reenvio imediato."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, name="sincronizador-diario", daemon=True)
+        self._thread.start()
+        self._acordar.set()
+
+    def acordar(self):
+        """Pede um reenvio imediato (ex.: logo após gravar um atendimento no diário)."""
+        self._acordar.set()
+
+    def parar(self, tempo_limite: float = 10.0):
+        """
+        Interrompe a thread de fundo após o reenvio em andamento.
+
+        Args:
+            tempo_limite: Segundos de espera pelo fim da thread
+        """
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(tempo_limite)
+            self._thread = None
@@ -0,0 +1,159 @@
+# Módulo de Exportação de Pacientes e Triagens
+
+"""
+Este módulo gera os extratos de pacientes e triagens enviados à secretaria
+municipal de saúde, em CSV (compactado com gzip quando o nome termina em .gz)
+ou em Parquet (colunar; requer o pacote opcional pyarrow).
+
+As linhas chegam do armazenamento em blocos (iterar_exportacao, com cursor do
+lado do servidor no PostgreSQL) e cada bloco é gravado antes de o próximo ser
+lido: no Parquet, um row group por bloco. A memória usada depende do tamanho do
+bloco, não da quantidade de linhas exportadas.
+
+Com pseudonimização, o CPF é substituído por HMAC-SHA256(chave, CPF) e o nome do
+paciente não é exportado. A mesma chave gera sempre o mesmo pseudônimo para o
+mesmo CPF (os extratos de meses diferentes e as triagens continuam relacionáveis
+ao paciente), e sem a chave não é possível recalculá-lo a partir de CPFs candidatos.
+"""
+
+import csv
+import gzip
+import hashlib
+import hmac
+import os
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .consultas import COLUNAS_EXPORTACAO
+
+FORMATOS = ("csv", "parquet")
+
+# Tipos das colunas no Parquet (nome do construtor de tipo do pyarrow e argumentos)
+_TIPOS_PARQUET = {
+    'id': ('int64',),
+    'paciente_id': ('int64',),
+    'nome_completo': ('string',),
+    'cpf': ('string',),
+    'data_nascimento': ('date32',),
+    'data_registro': ('timestamp', 'us'),
+    'prioridade': ('string',),
+    'sintomas': ('string',),
+    'justificativa_triagem': ('string',),
+    'data_triagem': ('timestamp', 'us'),
+}
+
+
+def pseudonimo(cpf: str, chave: str) -> str:
+    """
+    Retorna o pseudônimo (HMAC-SHA256 em hexadecimal) do CPF.
+
+    Args:
+        cpf: CPF do paciente
+        chave: Chave secreta da pseudonimização
+    """
+    return hmac.new(chave.encode(), cpf.encode(), hashlib.sha256).hexdigest()
+
+
+def periodo_mes(mes: date) -> Tuple[datetime, datetime]:
+    """Retorna (início, fim exclusivo) do mês de 'mes', para os extratos mensais."""
+    inicio = datetime(mes.year, mes.month, 1)
+    fim = datetime(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+    return inicio, fim
+
+
+def _escrever_csv(caminho: str, colunas: List[str], blocos: Iterable[List[tuple]], compactar: bool) -> int:
+    total = 0
+    with open(caminho, "wb") as bruto:
+        if compactar:
+            arquivo = gzip.open(bruto, "wt", encoding="utf-8", newline="")
+        else:
+            arquivo = open(bruto.fileno(), "w", encoding="utf-8", newline="", closefd=False)
+        with arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            for linhas in blocos:
+                escritor.writerows(linhas)
+                total += len(linhas)
+        bruto.flush()
+        os.fsync(bruto.fileno())
+    return total
+
+
+def _escrever_parquet(caminho: str, colunas: List[str], blocos: Iterable[List[tuple]]) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([(coluna, getattr(pa, _TIPOS_PARQUET[coluna][0])(*_TIPOS_PARQUET[coluna][1:]))
+                         for coluna in colunas])
+    total = 0
+    with pq.ParquetWriter(caminho, esquema) as escritor:
+        for linhas in blocos:
+            valores = list(zip(*linhas))
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(coluna, type=campo.type) for coluna, campo in zip(valores, esquema)], schema=esquema
+            ))
+            total += len(linhas)
+    with open(caminho, "rb") as arquivo:
+        os.fsync(arquivo.fileno())
+    return total
+
+
+def exportar(db, tabela: str, destino: str, formato: str = "csv", inicio: Optional[datetime] = None,
+             fim: Optional[datetime] = None, pseudonimizar: bool = False, chave: Optional[str] = None,
+             tamanho_lote: int = 50000) -> Optional[int]:
+    """
+    Exporta os pacientes (por data de cadastro) ou as triagens (por data da triagem)
+    do período para o arquivo 'destino', que só aparece com o nome final depois de
+    gravado por inteiro. Retorna a quantidade de linhas exportadas ou None em caso de erro.
+
+    Args:
+        db: Armazenamento com iterar_exportacao (BancoDadosUtils ou BancoDadosSQLite)
+        tabela: 'pacientes' ou 'triagens'
+        destino: Arquivo gerado (CSV compactado se terminar em .gz)
+        formato: 'csv' ou 'parquet'
+        inicio: Início do período (opcional)
+        fim: Fim do período, exclusivo (opcional)
+        pseudonimizar: Substitui o CPF pelo pseudônimo e omite o nome do paciente
+        chave: Chave secreta da pseudonimização (obrigatória com pseudonimizar)
+        tamanho_lote: Linhas lidas e gravadas por vez
+    """
+    if tabela not in COLUNAS_EXPORTACAO or formato not in FORMATOS:
+        print(f"Erro: exportação inválida ({tabela}, {formato}); use pacientes/triagens e csv/parquet.")
+        return None
+    if pseudonimizar and not chave:
+        print("Erro: a pseudonimização requer uma chave (variável EXPORTACAO_CHAVE_PSEUDONIMO).")
+        return None
+
+    colunas = COLUNAS_EXPORTACAO[tabela]
+    indice_cpf = colunas.index('cpf')
+    mantidas = [i for i, coluna in enumerate(colunas) if not (pseudonimizar and coluna == 'nome_completo')]
+
+    def blocos() -> Iterator[List[tuple]]:
+        for linhas in db.iterar_exportacao(tabela, inicio, fim, tamanho_lote):
+            if pseudonimizar:
+                linhas = [tuple(pseudonimo(linha[i], chave) if i == indice_cpf else linha[i] for i in mantidas)
+                          for linha in linhas]
+            yield linhas
+
+    cabecalho = [colunas[i] for i in mantidas]
+    temporario = destino + ".tmp"
+    try:
+        if os.path.dirname(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+        if formato == "parquet":
+            total = _escrever_parquet(temporario, cabecalho, blocos())
+        else:
+            total = _escrever_csv(temporario, cabecalho, blocos(), destino.endswith(".gz"))
+        os.replace(temporario, destino)
+
+    except ImportError:
+        print("Erro: a exportação em Parquet requer o pacote pyarrow (pip install pyarrow).")
+        return None
+    except Exception as e:
+        print(f"Erro ao exportar {tabela}: {e}")
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return None
+
+    print(f"Exportação concluída: {total} linhas de {tabela} em {destino}.")
+    return total
@@ -0,0 +1,313 @@
+# Módulo da Fila de Espera em Memória
+
+"""
+Este módulo mantém a fila de espera do posto em memória, ordenada por
+prioridade da triagem e horário de chegada, para que chamar o próximo
+paciente não dependa de uma consulta ao banco de dados.
+
+Conectada a um armazenamento (conectar), a fila registra no banco quem foi
+chamado ou retirado (tabela chamadas_fila): ao ser recarregada, por exemplo
+depois de um reinício, ela traz apenas os pacientes que ainda aguardam.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .consultas import ORDEM_PRIORIDADE
+
+# Período de triagens considerado ao carregar a fila: um paciente triado antes da
+# meia-noite e ainda não chamado continua na fila
+JANELA_FILA = timedelta(hours=24)
+
+
+class PacienteNaFila:
+    """Entrada da fila. A ordem é (prioridade, chegada, sequência de inserção)."""
+
+    __slots__ = ("paciente_id", "prioridade", "ordem", "chegada", "sequencia", "dados", "posicao")
+
+    def __init__(self, paciente_id: int, prioridade: str, chegada: datetime, sequencia: int, dados: Dict):
+        self.paciente_id = paciente_id
+        self.prioridade = prioridade
+        self.ordem = ORDEM_PRIORIDADE[prioridade]
+        self.chegada = chegada
+        self.sequencia = sequencia
+        self.dados = dados
+        self.posicao = -1
+
+    def chave(self) -> tuple:
+        return (self.ordem, self.chegada, self.sequencia)
+
+    def como_dict(self) -> Dict:
+        return {**self.dados, "id": self.paciente_id, "prioridade": self.prioridade, "data_triagem": self.chegada}
+
+
+class FilaEspera:
+    def __init__(self):
+        """
+        Cria uma fila vazia. Inserir, chamar o próximo, remover e mudar a prioridade
+        custam O(log n): é um heap binário que guarda a posição de cada paciente.
+        """
+        self._heap: List[PacienteNaFila] = []
+        self._por_paciente: Dict[int, PacienteNaFila] = {}
+        self._sequencia = 0
+        self._lock = threading.Lock()
+        # Armazenamento onde as chamadas são registradas (definido em conectar)
+        self._db = None
+        # Durante carregar_do_banco: inserções recebidas, aplicadas depois da carga
+        self._pendentes: Optional[List[tuple]] = None
+        # Paciente -> horário da triagem com que foi chamado ou retirado: a mesma
+        # triagem, recebida de novo (ouvinte atrasado, releitura do painel), não o
+        # devolve à fila
+        self._chamados: Dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, paciente_id: int) -> bool:
+        return paciente_id in self._por_paciente
+
+    # --- Operações do heap (chamadas com o lock adquirido) ---
+
+    def _trocar(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        heap[i].posicao = i
+        heap[j].posicao = j
+
+    def _subir(self, i: int):
+        heap = self._heap
+        while i > 0:
+            pai = (i - 1) // 2
+            if heap[i].chave() >= heap[pai].chave():
+                break
+            self._trocar(i, pai)
+            i = pai
+
+    def _descer(self, i: int):
+        heap = self._heap
+        tamanho = len(heap)
+        while True:
+            menor = i
+            for filho in (2 * i + 1, 2 * i + 2):
+                if filho < tamanho and heap[filho].chave() < heap[menor].chave():
+                    menor = filho
+            if menor == i:
+                break
+            self._trocar(i, menor)
+            i = menor
+
+    def _retirar(self, i: int) -> PacienteNaFila:
+        heap = self._heap
+        entrada = heap[i]
+        ultimo = len(heap) - 1
+        if i != ultimo:
+            self._trocar(i, ultimo)
+        heap.pop()
+        if i < len(heap):
+            self._subir(i)
+            self._descer(i)
+        del self._por_paciente[entrada.paciente_id]
+        entrada.posicao = -1
+        self._chamados[entrada.paciente_id] = entrada.chegada
+        return entrada
+
+    # --- API pública ---
+
+    def adicionar(self, paciente_id: int, prioridade: str, chegada: Optional[datetime] = None, **dados):
+        """
+        Coloca um paciente na fila. Se ele já estiver na fila, a entrada é atualizada
+        com a nova prioridade e o novo horário.
+
+        Args:
+            paciente_id: ID do paciente
+            prioridade: Nível de prioridade (Emergência, Urgência, Prioridade, Comum)
+            chegada: Horário da triagem (padrão: agora)
+            dados: Informações extras devolvidas junto com o paciente (nome_completo, cpf...)
+        """
+        self._colocar(paciente_id, prioridade, chegada or datetime.now(), dados, apenas_mais_recente=False)
+
+    def _colocar(self, paciente_id: int, prioridade: str, chegada: datetime, dados: Dict, apenas_mais_recente: bool):
+        if prioridade not in ORDEM_PRIORIDADE:
+            raise ValueError(f"Prioridade desconhecida: {prioridade}")
+
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((paciente_id, prioridade, chegada, dados, apenas_mais_recente))
+                return
+            self._colocar_travado(paciente_id, prioridade, chegada, dados, apenas_mais_recente)
+
+    def _colocar_travado(self, paciente_id: int, prioridade: str, chegada: datetime, dados: Dict,
+                         apenas_mais_recente: bool):
+        if apenas_mais_recente and chegada <= self._chamados.get(paciente_id, datetime.min):
+            return
+        existente = self._por_paciente.get(paciente_id)
+        if existente is not None:
+            if apenas_mais_recente and existente.chegada > chegada:
+                return
+            existente.prioridade = prioridade
+            existente.ordem = ORDEM_PRIORIDADE[prioridade]
+            existente.chegada = chegada
+            existente.dados.update(dados)
+            self._subir(existente.posicao)
+            self._descer(existente.posicao)
+            return
+
+        self._sequencia += 1
+        entrada = PacienteNaFila(paciente_id, prioridade, chegada, self._sequencia, dados)
+        entrada.posicao = len(self._heap)
+        self._heap.append(entrada)
+        self._por_paciente[paciente_id] = entrada
+        self._subir(entrada.posicao)
+
+    def _registrar_chamada(self, paciente_id: int):
+        """Grava a chamada no armazenamento conectado (fora do lock: é uma ida ao banco)."""
+        if self._db is not None:
+            self._db.registrar_chamada_fila(paciente_id)
+
+    def chamar_proximo(self) -> Optional[Dict]:
+        """Retira e retorna o próximo paciente a ser atendido, ou None se a fila estiver vazia."""
+        with self._lock:
+            if not self._heap:
+                return None
+            paciente = self._retirar(0).como_dict()
+        self._registrar_chamada(paciente["id"])
+        return paciente
+
+    def proximo(self) -> Optional[Dict]:
+        """Retorna o próximo paciente sem retirá-lo da fila."""
+        with self._lock:
+            return self._heap[0].como_dict() if self._heap else None
+
+    def remover(self, paciente_id: int) -> bool:
+        """Retira um paciente da fila (desistência, atendimento por outro canal). Retorna se ele estava na fila."""
+        with self._lock:
+            entrada = self._por_paciente.get(paciente_id)
+            if entrada is None:
+                return False
+            self._retirar(entrada.posicao)
+        self._registrar_chamada(paciente_id)
+        return True
+
+    def aplicar_chamada(self, paciente_id: int, chamado_em: datetime) -> bool:
+        """
+        Retira da fila um paciente chamado por outro processo (chamada já gravada no
+        banco), se a chamada for posterior à triagem dele na fila. Retorna se ele saiu da fila.
+
+        Args:
+            paciente_id: ID do paciente
+            chamado_em: Horário da chamada (tabela chamadas_fila)
+        """
+        with self._lock:
+            entrada = self._por_paciente.get(paciente_id)
+            if entrada is None or entrada.chegada > chamado_em:
+                return False
+            self._retirar(entrada.posicao)
+            return True
+
+    def descartar_chamados(self, antes_de: datetime):
+        """
+        Esquece os pacientes chamados com triagens anteriores a 'antes_de': triagens
+        que não serão mais recebidas (fora do período acompanhado).
+
+        Args:
+            antes_de: Início do período de triagens ainda acompanhado
+        """
+        with self._lock:
+            self._descartar_chamados(antes_de)
+
+    def _descartar_chamados(self, antes_de: datetime):
+        self._chamados = {paciente_id: chegada for paciente_id, chegada in self._chamados.items()
+                          if chegada >= antes_de}
+
+    def repriorizar(self, paciente_id: int, prioridade: str) -> bool:
+        """
+        Muda a prioridade de um paciente, mantendo seu horário de chegada.
+        Retorna se ele estava na fila.
+        """
+        if prioridade not in ORDEM_PRIORIDADE:
+            raise ValueError(f"Prioridade desconhecida: {prioridade}")
+        with self._lock:
+            entrada = self._por_paciente.get(paciente_id)
+            if entrada is None:
+                return False
+            entrada.prioridade = prioridade
+            entrada.ordem = ORDEM_PRIORIDADE[prioridade]
+            self._subir(entrada.posicao)
+            self._descer(entrada.posicao)
+            return True
+
+    def listar(self) -> List[Dict]:
+        """Retorna a fila inteira na ordem de atendimento (O(n log n), para exibição)."""
+        with self._lock:
+            entradas = sorted(self._heap, key=PacienteNaFila.chave)
+            return [entrada.como_dict() for entrada in entradas]
+
+    def limpar(self):
+        """Esvazia a fila."""
+        with self._lock:
+            self._heap.clear()
+            self._por_paciente.clear()
+            self._chamados.clear()
+
+    # --- Integração com o banco de dados ---
+
+    def carregar_do_banco(self, db, desde: Optional[datetime] = None) -> int:
+        """
+        Substitui a fila pela última triagem de cada paciente registrada no banco,
+        sem os pacientes chamados depois dela (registrar_chamada_fila).
+        Retorna a quantidade de pacientes carregados.
+
+        As inserções recebidas enquanto o banco é lido (triagens avisadas pelos
+        ouvintes, por exemplo) são guardadas e aplicadas sobre a fila carregada:
+        nenhuma se perde nem aparece duas vezes.
+
+        Args:
+            db: Instância de BancoDadosUtils
+            desde: Considera apenas triagens a partir deste horário (padrão: as últimas JANELA_FILA)
+        """
+        if desde is None:
+            desde = datetime.now() - JANELA_FILA
+
+        with self._lock:
+            self._pendentes = []
+        pacientes = None
+        try:
+            # Lida sem o lock: os ouvintes de triagem rodam com uma conexão do pool
+            # reservada e não podem esperar por esta leitura
+            pacientes = list(db.iterar_pacientes_por_prioridade(desde=desde, aguardando=True))
+        finally:
+            with self._lock:
+                pendentes, self._pendentes = self._pendentes, None
+                if pacientes is not None:
+                    self._heap.clear()
+                    self._por_paciente.clear()
+                    self._descartar_chamados(desde)
+                    for paciente in pacientes:
+                        self._colocar_travado(paciente['id'], paciente['prioridade'], paciente['data_triagem'],
+                                              {'nome_completo': paciente['nome_completo'], 'cpf': paciente['cpf']},
+                                              apenas_mais_recente=True)
+                for insercao in pendentes:
+                    self._colocar_travado(*insercao)
+        return len(pacientes)
+
+    def ao_registrar_triagem(self, paciente_id: int, prioridade: str, data_triagem: datetime, **dados):
+        """
+        Ouvinte para BancoDadosUtils.registrar_ouvinte_triagem: mantém a fila igual ao banco.
+        Assim como a tabela fila_atual, ignora uma triagem mais antiga que a já presente na fila.
+        """
+        self._colocar(paciente_id, prioridade, data_triagem, dados, apenas_mais_recente=True)
+
+    def conectar(self, db, desde: Optional[datetime] = None) -> int:
+        """
+        Carrega a fila a partir do banco, passa a receber as triagens gravadas por 'db'
+        e a registrar nele os pacientes chamados ou retirados da fila.
+        Retorna a quantidade de pacientes carregados.
+
+        Args:
+            db: Instância de BancoDadosUtils
+            desde: Considera apenas triagens a partir deste horário (padrão: as últimas JANELA_FILA)
+        """
+        self._db = db
+        db.registrar_ouvinte_triagem(self.ao_registrar_triagem)
+        return self.carregar_do_banco(db, desde)
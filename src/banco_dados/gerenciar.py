@@ -0,0 +1,125 @@
+# Comandos de Administração do Banco de Dados
+
+"""
+Este módulo reúne os comandos de manutenção do banco de dados, executados fora
+da aplicação, sobre o armazenamento configurado (BANCO_DADOS_BACKEND).
+
+Uso (a partir da pasta src/):
+    python -m banco_dados.gerenciar migrar [--alvo VERSAO]
+    python -m banco_dados.gerenciar versao-esquema
+    python -m banco_dados.gerenciar reconstruir-fila
+    python -m banco_dados.gerenciar recalcular-estatisticas [--desde AAAA-MM-DD]
+    python -m banco_dados.gerenciar sincronizar-diario
+    python -m banco_dados.gerenciar criar-particoes [--meses-a-frente N]
+    python -m banco_dados.gerenciar arquivar-triagens --meses-retencao N [--destino PASTA]
+    python -m banco_dados.gerenciar exportar {pacientes,triagens} --destino ARQUIVO [--formato csv|parquet]
+        [--mes AAAA-MM | --inicio AAAA-MM-DD --fim AAAA-MM-DD] [--pseudonimizar]
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from .backends import criar_backend
+from .config import DatabaseConfig
+from .migrador import SchemaDesatualizadoError
+
+# Comandos que precisam rodar mesmo com o esquema desatualizado
+_COMANDOS_DE_ESQUEMA = ("migrar", "versao-esquema")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m banco_dados.gerenciar",
+                                     description="Comandos de manutenção do banco de dados.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comando_migrar = comandos.add_parser("migrar", help="Aplica as migrações pendentes do esquema")
+    comando_migrar.add_argument("--alvo", type=int, help="Última versão a aplicar (padrão: todas)")
+    comandos.add_parser("versao-esquema", help="Mostra a versão do esquema no banco e a exigida pelo código")
+    comandos.add_parser("reconstruir-fila",
+                        help="Recalcula a tabela fila_atual a partir do histórico de triagens")
+    comando_estatisticas = comandos.add_parser(
+        "recalcular-estatisticas", help="Recalcula as estatísticas de triagens por hora a partir das triagens")
+    comando_estatisticas.add_argument("--desde", type=datetime.fromisoformat,
+                                      help="Data (AAAA-MM-DD) do início do recálculo (padrão: a triagem mais antiga)")
+    comandos.add_parser("sincronizar-diario",
+                        help="Reenvia ao banco os atendimentos pendentes no diário offline")
+    comando_particoes = comandos.add_parser(
+        "criar-particoes", help="Cria as partições mensais de triagens dos próximos meses (rodar diariamente)")
+    comando_particoes.add_argument("--meses-a-frente", type=int, default=3,
+                                   help="Meses, além do atual, que devem ter partição (padrão: 3)")
+    comando_arquivar = comandos.add_parser(
+        "arquivar-triagens", help="Exporta e remove as triagens anteriores ao período de retenção")
+    comando_arquivar.add_argument("--meses-retencao", type=int, required=True,
+                                  help="Meses completos mantidos antes do mês atual")
+    comando_arquivar.add_argument("--destino", default="arquivo_triagens",
+                                  help="Pasta dos arquivos .csv.gz exportados (padrão: arquivo_triagens)")
+    comando_exportar = comandos.add_parser(
+        "exportar", help="Exporta pacientes ou triagens de um período para CSV ou Parquet")
+    comando_exportar.add_argument("tabela", choices=["pacientes", "triagens"])
+    comando_exportar.add_argument("--destino", required=True,
+                                  help="Arquivo gerado (.csv, .csv.gz ou .parquet)")
+    comando_exportar.add_argument("--formato", choices=["csv", "parquet"],
+                                  help="Formato do arquivo (padrão: parquet se o destino terminar em .parquet, senão csv)")
+    comando_exportar.add_argument("--mes", type=lambda valor: datetime.strptime(valor, "%Y-%m").date(),
+                                  help="Mês exportado (AAAA-MM); alternativa a --inicio/--fim")
+    comando_exportar.add_argument("--inicio", type=datetime.fromisoformat, help="Início do período (AAAA-MM-DD)")
+    comando_exportar.add_argument("--fim", type=datetime.fromisoformat, help="Fim do período, exclusivo (AAAA-MM-DD)")
+    comando_exportar.add_argument("--pseudonimizar", action="store_true",
+                                  help="Substitui o CPF por um pseudônimo (chave em EXPORTACAO_CHAVE_PSEUDONIMO) "
+                                       "e omite o nome")
+    args = parser.parse_args(argv)
+
+    opcoes = {"verificar_esquema": args.comando not in _COMANDOS_DE_ESQUEMA}
+    if DatabaseConfig.get_backend() == "postgresql":
+        opcoes["usar_pool"] = False
+
+    try:
+        db = criar_backend(**opcoes)
+    except (SchemaDesatualizadoError, ValueError) as e:
+        print(e)
+        return 1
+
+    if args.comando == "migrar":
+        return 0 if db.migrar_esquema(args.alvo) is not None else 1
+
+    if args.comando == "versao-esquema":
+        atual, esperada = db.versao_esquema()
+        print(f"Versão no banco: {atual}; exigida pelo código: {esperada}")
+        return 0
+
+    if args.comando == "reconstruir-fila":
+        return 0 if db.reconstruir_fila_atual() is not None else 1
+
+    if args.comando == "recalcular-estatisticas":
+        return 0 if db.recalcular_estatisticas_triagens(args.desde) is not None else 1
+
+    if args.comando == "criar-particoes":
+        return 0 if db.criar_particoes_triagens(args.meses_a_frente) is not None else 1
+
+    if args.comando == "arquivar-triagens":
+        return 0 if db.arquivar_triagens(args.meses_retencao, args.destino) is not None else 1
+
+    if args.comando == "exportar":
+        from .exportacao import exportar, periodo_mes
+
+        inicio, fim = periodo_mes(args.mes) if args.mes else (args.inicio, args.fim)
+        formato = args.formato or ("parquet" if args.destino.endswith(".parquet") else "csv")
+        total = exportar(db, args.tabela, args.destino, formato, inicio, fim,
+                         args.pseudonimizar, DatabaseConfig.get_chave_pseudonimo())
+        return 0 if total is not None else 1
+
+    if args.comando == "sincronizar-diario":
+        from .diario_offline import DiarioOffline, SincronizadorDiario
+
+        config = DatabaseConfig.get_diario_config()
+        diario = DiarioOffline(config['caminho'])
+        enviados = SincronizadorDiario(diario, lambda: db, max_tentativas=config['max_tentativas']).sincronizar()
+        print(f"Atendimentos sincronizados: {enviados or 0}; ainda pendentes: {diario.quantidade()}; "
+              f"rejeitados: {diario.quantidade_rejeitados()}")
+        return 0 if enviados is not None else 1
+
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,364 @@
+# Módulo de Métricas do Banco de Dados
+
+"""
+Este módulo mede o acesso ao banco de dados: tempo para abrir conexões, espera
+pelo pool, tempo de execução e de leitura das consultas, linhas devolvidas e
+erros, separados pela operação do BancoDadosUtils que os originou. As medidas
+ficam em histogramas e contadores expostos no formato texto do Prometheus, por
+um endpoint HTTP local e/ou por um arquivo (coletor textfile do node_exporter).
+
+Consultas mais lentas que o limiar configurado são registradas com print(),
+sem os parâmetros (que podem conter CPF e outros dados pessoais).
+
+Desligado (o padrão), o custo se resume a uma verificação de atributo por
+operação: as conexões nem passam a usar os cursores instrumentados.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+
+# Limites (em segundos) dos buckets dos histogramas
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Nome: (tipo, descrição, rótulos)
+_DEFINICOES = {
+    "banco_dados_operacao_segundos": ("histogram", "Duração total de cada operação do BancoDadosUtils (ou do BancoDadosAsync)", ("operacao",)),
+    "banco_dados_conexao_segundos": ("histogram", "Tempo para abrir uma conexão com o PostgreSQL", ("operacao",)),
+    "banco_dados_espera_pool_segundos": ("histogram", "Tempo de espera para retirar uma conexão do pool", ("operacao",)),
+    "banco_dados_execucao_segundos": ("histogram", "Tempo de execução das consultas (execute/COPY)", ("operacao",)),
+    "banco_dados_leitura_segundos": ("histogram", "Tempo de leitura dos resultados (fetch)", ("operacao",)),
+    "banco_dados_consultas_total": ("counter", "Consultas executadas", ("operacao",)),
+    "banco_dados_linhas_total": ("counter", "Linhas lidas dos resultados", ("operacao",)),
+    "banco_dados_erros_total": ("counter", "Erros do banco de dados, por tipo", ("operacao", "tipo")),
+    "banco_dados_consultas_lentas_total": ("counter", "Consultas acima do limiar de lentidão", ("operacao",)),
+    "banco_dados_cache_pacientes_total": ("counter", "Buscas por CPF no cache de pacientes (acerto, falta, expirado)", ("resultado",)),
+    "banco_dados_cache_pacientes_idade_segundos": ("histogram", "Idade das entradas do cache de pacientes ao serem devolvidas", ()),
+    "banco_dados_cache_pacientes_invalidacoes_total": ("counter", "Entradas do cache de pacientes descartadas, por origem", ("origem",)),
+    "banco_dados_cache_pacientes_despejos_total": ("counter", "Entradas do cache de pacientes removidas por falta de espaço", ()),
+}
+
+# Histogramas cujos valores não cabem nos BUCKETS das consultas (idade do cache: até o TTL)
+_BUCKETS_ESPECIFICOS = {
+    "banco_dados_cache_pacientes_idade_segundos": (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0),
+}
+
+_SEM_OPERACAO = "desconhecida"
+
+_contexto = threading.local()
+
+
+class _Histograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: Tuple[float, ...] = BUCKETS):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _rotulos(nomes: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    partes = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+class RegistroMetricas:
+    def __init__(self):
+        """Cria um registro vazio e desligado."""
+        self.ativo = False
+        self.limiar_lento = 0.0  # segundos; 0 desliga o log de consultas lentas
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[Tuple, object]] = {nome: {} for nome in _DEFINICOES}
+        self._servidor = None
+        self._gravador = None
+
+    @property
+    def instrumentar(self) -> bool:
+        """Indica se as conexões devem usar os cursores instrumentados."""
+        return self.ativo or self.limiar_lento > 0
+
+    def observar(self, nome: str, segundos: float, *rotulos):
+        """Registra uma duração no histograma 'nome'."""
+        with self._lock:
+            serie = self._series[nome]
+            histograma = serie.get(rotulos)
+            if histograma is None:
+                histograma = serie[rotulos] = _Histograma(_BUCKETS_ESPECIFICOS.get(nome, BUCKETS))
+            histograma.observar(segundos)
+
+    def incrementar(self, nome: str, valor: float = 1, *rotulos):
+        """Soma 'valor' ao contador 'nome'."""
+        with self._lock:
+            serie = self._series[nome]
+            serie[rotulos] = serie.get(rotulos, 0) + valor
+
+    def limpar(self):
+        """Zera todas as séries."""
+        with self._lock:
+            for serie in self._series.values():
+                serie.clear()
+
+    def texto_prometheus(self) -> str:
+        """Retorna as métricas no formato de exposição em texto do Prometheus."""
+        linhas = []
+        with self._lock:
+            for nome, (tipo, descricao, nomes_rotulos) in _DEFINICOES.items():
+                linhas.append(f"# HELP {nome} {descricao}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+                for rotulos, valor in sorted(self._series[nome].items()):
+                    if tipo == "counter":
+                        linhas.append(f"{nome}{_rotulos(nomes_rotulos, rotulos)} {valor}")
+                        continue
+                    acumulado = 0
+                    for limite, contagem in zip(valor.limites + (float("inf"),), valor.contagens):
+                        acumulado += contagem
+                        le = 'le="+Inf"' if limite == float("inf") else f'le="{limite!r}"'
+                        linhas.append(f"{nome}_bucket{_rotulos(nomes_rotulos, rotulos, le)} {acumulado}")
+                    linhas.append(f"{nome}_sum{_rotulos(nomes_rotulos, rotulos)} {valor.soma}")
+                    linhas.append(f"{nome}_count{_rotulos(nomes_rotulos, rotulos)} {valor.total}")
+        return "\n".join(linhas) + "\n"
+
+    def gravar_arquivo(self, caminho: str):
+        """Grava as métricas em 'caminho' de forma atômica (o coletor nunca lê um arquivo pela metade)."""
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto_prometheus())
+        os.replace(temporario, caminho)
+
+    def iniciar_servidor(self, porta: int, host: str = "127.0.0.1"):
+        """Expõe as métricas em http://host:porta/metrics, em uma thread de fundo (uma vez por processo)."""
+        if self._servidor is not None:
+            return
+        registro = self
+
+        class _Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                corpo = registro.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+        threading.Thread(target=self._servidor.serve_forever, name="metricas-http", daemon=True).start()
+        print(f"Métricas do banco de dados disponíveis em http://{host}:{self._servidor.server_port}/metrics")
+
+    def iniciar_gravacao(self, caminho: str, intervalo: float = 15.0):
+        """Regrava o arquivo de métricas a cada 'intervalo' segundos, em uma thread de fundo."""
+        if self._gravador is not None:
+            return
+
+        def gravar_periodicamente():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.gravar_arquivo(caminho)
+                except OSError as e:
+                    print(f"Erro ao gravar o arquivo de métricas: {e}")
+
+        self._gravador = threading.Thread(target=gravar_periodicamente, name="metricas-arquivo", daemon=True)
+        self._gravador.start()
+
+
+# Registro único do processo, compartilhado por todas as instâncias do BancoDadosUtils
+REGISTRO = RegistroMetricas()
+
+
+def configurar(ativo: bool, limiar_lento_ms: float = 0.0, porta: int = 0, arquivo: Optional[str] = None):
+    """
+    Liga/desliga as métricas e o log de consultas lentas e inicia a exposição.
+
+    Args:
+        ativo: Registra histogramas e contadores
+        limiar_lento_ms: Registra com print() consultas mais lentas que isso (0 desliga)
+        porta: Porta do endpoint HTTP local /metrics (0 não inicia o servidor)
+        arquivo: Caminho do arquivo regravado periodicamente com as métricas (opcional)
+    """
+    REGISTRO.ativo = ativo
+    REGISTRO.limiar_lento = max(limiar_lento_ms, 0.0) / 1000
+    if ativo and porta:
+        REGISTRO.iniciar_servidor(porta)
+    if ativo and arquivo:
+        REGISTRO.iniciar_gravacao(arquivo)
+
+
+def operacao_atual() -> str:
+    """Nome da operação do BancoDadosUtils em andamento nesta thread."""
+    return getattr(_contexto, "operacao", None) or _SEM_OPERACAO
+
+
+@contextmanager
+def em_operacao(nome: str):
+    """Atribui as medidas feitas dentro do bloco à operação 'nome'."""
+    anterior = getattr(_contexto, "operacao", None)
+    _contexto.operacao = nome
+    try:
+        yield
+    finally:
+        _contexto.operacao = anterior
+
+
+def medir_operacao(funcao):
+    """Decorador: mede a duração do método e rotula as consultas feitas por ele com o seu nome."""
+    nome = funcao.__name__
+
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        if not REGISTRO.ativo:
+            return funcao(*args, **kwargs)
+        anterior = getattr(_contexto, "operacao", None)
+        _contexto.operacao = nome
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            REGISTRO.observar("banco_dados_operacao_segundos", time.perf_counter() - inicio, nome)
+            _contexto.operacao = anterior
+
+    return envolvida
+
+
+def medir_operacao_async(funcao):
+    """
+    Decorador equivalente a medir_operacao para as corrotinas do BancoDadosAsync:
+    mede apenas a duração da operação. As conexões assíncronas não usam os cursores
+    instrumentados, e o rótulo por thread não distinguiria as tarefas do event loop.
+    """
+    nome = funcao.__name__
+
+    @functools.wraps(funcao)
+    async def envolvida(*args, **kwargs):
+        if not REGISTRO.ativo:
+            return await funcao(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return await funcao(*args, **kwargs)
+        finally:
+            REGISTRO.observar("banco_dados_operacao_segundos", time.perf_counter() - inicio, nome)
+
+    return envolvida
+
+
+# --- Cursores e conexão instrumentados ---
+
+class _InstrumentacaoCursor:
+    """Mixin que mede execute/copy/fetch de um cursor do psycopg2."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cursores nomeados são percorridos depois que o método que os criou retornou
+        self._operacao = operacao_atual()
+
+    def _medir_execucao(self, metodo, sql, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(sql, *args, **kwargs)
+        except psycopg2.Error as e:
+            if REGISTRO.ativo:
+                REGISTRO.incrementar("banco_dados_erros_total", 1, self._operacao, type(e).__name__)
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            if REGISTRO.ativo:
+                REGISTRO.observar("banco_dados_execucao_segundos", duracao, self._operacao)
+                REGISTRO.incrementar("banco_dados_consultas_total", 1, self._operacao)
+            if REGISTRO.limiar_lento and duracao >= REGISTRO.limiar_lento:
+                if REGISTRO.ativo:
+                    REGISTRO.incrementar("banco_dados_consultas_lentas_total", 1, self._operacao)
+                texto = " ".join(str(sql).split())
+                print(f"Consulta lenta ({duracao * 1000:.1f} ms) em {self._operacao}: {texto[:300]}")
+
+    def _medir_leitura(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        if REGISTRO.ativo:
+            REGISTRO.observar("banco_dados_leitura_segundos", time.perf_counter() - inicio, self._operacao)
+            linhas = len(resultado) if isinstance(resultado, list) else int(resultado is not None)
+            REGISTRO.incrementar("banco_dados_linhas_total", linhas, self._operacao)
+        return resultado
+
+    def execute(self, sql, parametros=None):
+        return self._medir_execucao(super().execute, sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self._medir_execucao(super().executemany, sql, sequencia)
+
+    def copy_expert(self, sql, arquivo, size=8192):
+        return self._medir_execucao(super().copy_expert, sql, arquivo, size)
+
+    def fetchone(self):
+        return self._medir_leitura(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._medir_leitura(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._medir_leitura(super().fetchall)
+
+    def __iter__(self):
+        # Cursores nomeados buscam as linhas em blocos durante a iteração
+        linhas = 0
+        proxima = super().__next__
+        try:
+            while True:
+                try:
+                    linha = proxima()
+                except StopIteration:
+                    return
+                linhas += 1
+                yield linha
+        finally:
+            if REGISTRO.ativo:
+                REGISTRO.incrementar("banco_dados_linhas_total", linhas, self._operacao)
+
+
+class CursorInstrumentado(_InstrumentacaoCursor, psycopg2.extensions.cursor):
+    pass
+
+
+class RealDictCursorInstrumentado(_InstrumentacaoCursor, psycopg2.extras.RealDictCursor):
+    pass
+
+
+_CURSORES_INSTRUMENTADOS = {
+    None: CursorInstrumentado,
+    psycopg2.extensions.cursor: CursorInstrumentado,
+    psycopg2.extras.RealDictCursor: RealDictCursorInstrumentado,
+}
+
+
+class ConexaoInstrumentada(psycopg2.extensions.connection):
+    """Conexão cujos cursores (simples ou RealDictCursor) são instrumentados."""
+
+    def cursor(self, *args, **kwargs):
+        fabrica = kwargs.get("cursor_factory", self.cursor_factory)
+        kwargs["cursor_factory"] = _CURSORES_INSTRUMENTADOS.get(fabrica, fabrica)
+        return super().cursor(*args, **kwargs)
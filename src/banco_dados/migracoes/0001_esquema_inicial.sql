@@ -0,0 +1,88 @@
+-- Esquema inicial: pacientes, triagens e a fila atual mantida por gatilho.
+-- Idempotente: pode ser aplicada a bancos criados antes das migrações.
+
+CREATE TABLE IF NOT EXISTS pacientes (
+    id SERIAL PRIMARY KEY,
+    nome_completo VARCHAR(255) NOT NULL,
+    cpf VARCHAR(11) NOT NULL UNIQUE,
+    data_nascimento DATE NOT NULL,
+    data_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS triagens (
+    id SERIAL PRIMARY KEY,
+    paciente_id INTEGER NOT NULL,
+    sintomas TEXT NOT NULL,
+    prioridade VARCHAR(50) NOT NULL CHECK (prioridade IN ('Emergência', 'Urgência', 'Prioridade', 'Comum')),
+    justificativa_triagem TEXT,
+    data_triagem TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (paciente_id) REFERENCES pacientes (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pacientes_cpf ON pacientes(cpf);
+CREATE INDEX IF NOT EXISTS idx_triagens_paciente_id ON triagens(paciente_id);
+CREATE INDEX IF NOT EXISTS idx_triagens_data ON triagens(data_triagem);
+
+-- Posição de cada nível na fila de atendimento (menor é atendido primeiro)
+CREATE OR REPLACE FUNCTION ordem_prioridade(prioridade VARCHAR) RETURNS SMALLINT AS $$
+    SELECT CASE prioridade
+        WHEN 'Emergência' THEN 1
+        WHEN 'Urgência' THEN 2
+        WHEN 'Prioridade' THEN 3
+        ELSE 4
+    END::SMALLINT
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Última triagem de cada paciente
+CREATE TABLE IF NOT EXISTS fila_atual (
+    paciente_id INTEGER PRIMARY KEY REFERENCES pacientes (id),
+    triagem_id INTEGER NOT NULL,
+    prioridade VARCHAR(50) NOT NULL,
+    ordem_prioridade SMALLINT NOT NULL,
+    data_triagem TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_fila_atual_ordem ON fila_atual (ordem_prioridade, data_triagem DESC);
+
+-- Uma triagem só substitui a da fila se não for mais antiga (importações em lote
+-- podem trazer triagens retroativas)
+CREATE OR REPLACE FUNCTION atualizar_fila_atual() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO fila_atual (paciente_id, triagem_id, prioridade, ordem_prioridade, data_triagem)
+    VALUES (NEW.paciente_id, NEW.id, NEW.prioridade, ordem_prioridade(NEW.prioridade), NEW.data_triagem)
+    ON CONFLICT (paciente_id) DO UPDATE
+    SET triagem_id = EXCLUDED.triagem_id,
+        prioridade = EXCLUDED.prioridade,
+        ordem_prioridade = EXCLUDED.ordem_prioridade,
+        data_triagem = EXCLUDED.data_triagem
+    WHERE fila_atual.data_triagem IS NULL
+       OR EXCLUDED.data_triagem >= fila_atual.data_triagem;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trg_triagens_fila_atual' AND tgrelid = 'triagens'::regclass
+    ) THEN
+        CREATE TRIGGER trg_triagens_fila_atual
+        AFTER INSERT ON triagens
+        FOR EACH ROW EXECUTE FUNCTION atualizar_fila_atual();
+    END IF;
+END
+$$;
+
+-- Preenche a fila a partir do histórico quando ela acaba de ser criada
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM fila_atual) THEN
+        INSERT INTO fila_atual (paciente_id, triagem_id, prioridade, ordem_prioridade, data_triagem)
+        SELECT DISTINCT ON (paciente_id)
+               paciente_id, id, prioridade, ordem_prioridade(prioridade), data_triagem
+        FROM triagens
+        ORDER BY paciente_id, data_triagem DESC NULLS LAST, id DESC;
+    END IF;
+END
+$$;
@@ -0,0 +1,11 @@
+-- Chaves de idempotência: um atendimento reenviado com a mesma chave (ex.: pelo
+-- diário offline após uma queda de conexão) não é gravado duas vezes.
+-- Tabela própria, e não uma coluna UNIQUE em triagens, para não depender da
+-- estrutura física de triagens.
+
+CREATE TABLE IF NOT EXISTS chaves_idempotencia (
+    chave VARCHAR(64) PRIMARY KEY,
+    paciente_id INTEGER NOT NULL,
+    triagem_id INTEGER NOT NULL,
+    criada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,112 @@
+-- Particionamento mensal de triagens por data_triagem (uma partição triagens_pAAAAMM
+-- por mês e triagens_padrao para datas sem partição).
+-- Cada inserção só atualiza os índices da partição do mês, consultas por período
+-- leem apenas as partições do intervalo, e meses antigos podem ser desanexados e
+-- exportados ('gerenciar arquivar-triagens') sem DELETE em massa.
+--
+-- A migração copia o histórico para a nova tabela (uma vez, dentro da transação da
+-- migração): em bancos grandes, aplique-a em uma janela de manutenção.
+
+ALTER TABLE triagens RENAME TO triagens_legado;
+
+-- A chave primária de uma tabela particionada precisa incluir a coluna de partição
+CREATE TABLE triagens (
+    id INTEGER NOT NULL DEFAULT nextval('triagens_id_seq'),
+    paciente_id INTEGER NOT NULL REFERENCES pacientes (id),
+    sintomas TEXT NOT NULL,
+    prioridade VARCHAR(50) NOT NULL CHECK (prioridade IN ('Emergência', 'Urgência', 'Prioridade', 'Comum')),
+    justificativa_triagem TEXT,
+    data_triagem TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, data_triagem)
+) PARTITION BY RANGE (data_triagem);
+
+-- A sequência passa a pertencer à nova tabela (pg_get_serial_sequence continua funcionando)
+ALTER SEQUENCE triagens_id_seq OWNED BY triagens.id;
+
+-- Recebe triagens de meses ainda sem partição, para que nenhuma gravação seja recusada;
+-- criar_particoes_triagens() move essas linhas para a partição do mês
+CREATE TABLE triagens_padrao PARTITION OF triagens DEFAULT;
+
+-- Cria a partição de um mês, levando para ela as linhas do mês que estiverem em
+-- triagens_padrao. Retorna o nome da partição criada, ou NULL se ela já existia.
+CREATE OR REPLACE FUNCTION criar_particao_triagens(mes DATE) RETURNS TEXT AS $$
+DECLARE
+    inicio DATE := date_trunc('month', mes);
+    fim DATE := date_trunc('month', mes) + INTERVAL '1 month';
+    nome TEXT := 'triagens_p' || to_char(mes, 'YYYYMM');
+BEGIN
+    IF to_regclass(nome) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Criada fora da tabela e anexada depois: anexar direto falharia se triagens_padrao
+    -- tivesse linhas do mês
+    EXECUTE format('CREATE TABLE %I (LIKE triagens INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', nome);
+    EXECUTE format('ALTER TABLE %I ADD CHECK (data_triagem >= %L AND data_triagem < %L)', nome, inicio, fim);
+    EXECUTE format(
+        'WITH movidas AS (DELETE FROM triagens_padrao WHERE data_triagem >= %L AND data_triagem < %L RETURNING *)
+         INSERT INTO %I SELECT * FROM movidas', inicio, fim, nome);
+    EXECUTE format('ALTER TABLE triagens ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', nome, inicio, fim);
+    RETURN nome;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Garante as partições do mês atual e dos próximos meses, e dos meses que tenham
+-- linhas em triagens_padrao (importações retroativas). Executada diariamente por
+-- 'gerenciar criar-particoes' (ou pelo pg_cron); retorna as partições criadas.
+CREATE OR REPLACE FUNCTION criar_particoes_triagens(meses_a_frente INTEGER DEFAULT 3) RETURNS SETOF TEXT AS $$
+DECLARE
+    mes DATE;
+    nome TEXT;
+BEGIN
+    FOR mes IN
+        SELECT generate_series(date_trunc('month', CURRENT_DATE),
+                               date_trunc('month', CURRENT_DATE) + make_interval(months => meses_a_frente),
+                               INTERVAL '1 month')::date
+        UNION
+        SELECT DISTINCT date_trunc('month', data_triagem)::date FROM triagens_padrao
+        ORDER BY 1
+    LOOP
+        nome := criar_particao_triagens(mes);
+        IF nome IS NOT NULL THEN
+            RETURN NEXT nome;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partições para os meses do histórico e os próximos três meses
+DO $$
+DECLARE
+    mes DATE;
+BEGIN
+    FOR mes IN SELECT DISTINCT date_trunc('month', data_triagem)::date FROM triagens_legado
+               WHERE data_triagem IS NOT NULL LOOP
+        PERFORM criar_particao_triagens(mes);
+    END LOOP;
+    PERFORM criar_particoes_triagens(3);
+END
+$$;
+
+-- Triagens antigas sem data recebem a data de cadastro do paciente
+INSERT INTO triagens (id, paciente_id, sintomas, prioridade, justificativa_triagem, data_triagem)
+SELECT t.id, t.paciente_id, t.sintomas, t.prioridade, t.justificativa_triagem,
+       COALESCE(t.data_triagem, p.data_registro, CURRENT_TIMESTAMP)
+FROM triagens_legado t
+JOIN pacientes p ON p.id = t.paciente_id;
+
+DROP TABLE triagens_legado;
+
+-- Criados depois da cópia (mais rápido que mantê-los durante a carga); valem para
+-- todas as partições, inclusive as futuras
+CREATE INDEX idx_triagens_paciente_id ON triagens (paciente_id);
+CREATE INDEX idx_triagens_data ON triagens (data_triagem);
+
+-- Gatilho na tabela particionada: vale para todas as partições, inclusive as futuras
+CREATE TRIGGER trg_triagens_fila_atual
+AFTER INSERT ON triagens
+FOR EACH ROW EXECUTE FUNCTION atualizar_fila_atual();
+
+-- A fila guardava a data das triagens sem data; acompanha o valor atribuído acima
+UPDATE fila_atual f SET data_triagem = t.data_triagem
+FROM triagens t
+WHERE f.data_triagem IS NULL AND t.id = f.triagem_id;
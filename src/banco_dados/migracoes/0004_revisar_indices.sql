@@ -0,0 +1,32 @@
+-- Índices revistos para as consultas do BancoDadosUtils (conferidos por
+-- benchmarks/verificar_planos.py):
+-- - busca por CPF: o UNIQUE de pacientes.cpf já cria um índice; idx_pacientes_cpf
+--   só duplicava o trabalho de cada inserção;
+-- - histórico e última triagem do paciente (buscar_triagens_paciente, paginação,
+--   reconstrução da fila): (paciente_id, data_triagem DESC, id DESC) entrega as
+--   linhas já na ordem pedida e substitui o índice só em paciente_id (também
+--   usado pela chave estrangeira);
+-- - fila por prioridade: o índice passa a cobrir a ordem completa da paginação
+--   (prioridade, data, paciente), sem ordenação extra ao trazer cada página.
+-- idx_triagens_data continua servindo às consultas por período dentro de cada partição.
+
+DROP INDEX IF EXISTS idx_pacientes_cpf;
+
+CREATE INDEX IF NOT EXISTS idx_triagens_paciente_data ON triagens (paciente_id, data_triagem DESC, id DESC);
+DROP INDEX IF EXISTS idx_triagens_paciente_id;
+
+DROP INDEX IF EXISTS idx_fila_atual_ordem;
+CREATE INDEX idx_fila_atual_ordem ON fila_atual (ordem_prioridade, data_triagem DESC, paciente_id DESC);
+
+-- O custo padrão de leitura aleatória (4) supõe disco rotativo: com ele, listar a fila
+-- de uma prioridade lia pacientes inteira (Seq Scan + Hash Join) em vez de buscar cada
+-- paciente pela chave primária. O armazenamento do Azure (e de qualquer servidor
+-- atual) é SSD. Vale para as novas conexões; exige ser dono do banco (senão só avisa).
+SET random_page_cost = 1.1;
+DO $$
+BEGIN
+    EXECUTE format('ALTER DATABASE %I SET random_page_cost = 1.1', current_database());
+EXCEPTION WHEN insufficient_privilege THEN
+    RAISE NOTICE 'Sem permissão para ajustar random_page_cost do banco; ajuste-o no servidor (valor sugerido: 1.1).';
+END
+$$;
@@ -0,0 +1,57 @@
+-- Avisa os outros processos (canal 'pacientes_alterados' do LISTEN/NOTIFY) quando um
+-- paciente é cadastrado, alterado ou excluído, para que descartem do cache de
+-- pacientes (cache_pacientes.py) o CPF correspondente. A mensagem é o CPF; com mais
+-- de 1000 pacientes no mesmo comando (cargas em lote) vai uma única mensagem '*',
+-- que esvazia o cache inteiro.
+--
+-- Gatilhos por comando, com tabelas de transição: uma carga via COPY dispara a função
+-- uma vez, não uma vez por linha. As notificações só são entregues no COMMIT.
+
+CREATE OR REPLACE FUNCTION notificar_pacientes_alterados() RETURNS TRIGGER AS $$
+DECLARE
+    cpfs TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(cpf) INTO cpfs FROM (SELECT cpf FROM pacientes_novos LIMIT 1001) s;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(cpf) INTO cpfs FROM (SELECT cpf FROM pacientes_antigos LIMIT 1001) s;
+    ELSE
+        -- O cadastro de atendimentos faz INSERT ... ON CONFLICT DO UPDATE sem mudar
+        -- nada no paciente que volta: só linhas realmente alteradas invalidam o cache
+        SELECT array_agg(cpf) INTO cpfs FROM (
+            SELECT unnest(ARRAY[a.cpf, n.cpf]) AS cpf
+            FROM pacientes_antigos a
+            JOIN pacientes_novos n ON n.id = a.id
+            WHERE (a.nome_completo, a.cpf, a.data_nascimento) IS DISTINCT FROM
+                  (n.nome_completo, n.cpf, n.data_nascimento)
+            LIMIT 1001
+        ) s;
+    END IF;
+
+    IF cpfs IS NULL THEN
+        RETURN NULL;
+    END IF;
+    IF cardinality(cpfs) > 1000 THEN
+        PERFORM pg_notify('pacientes_alterados', '*');
+    ELSE
+        -- Mensagens iguais na mesma transação são entregues uma vez só
+        PERFORM pg_notify('pacientes_alterados', cpf) FROM unnest(cpfs) AS cpf;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_pacientes_notificar_insercao
+AFTER INSERT ON pacientes
+REFERENCING NEW TABLE AS pacientes_novos
+FOR EACH STATEMENT EXECUTE FUNCTION notificar_pacientes_alterados();
+
+CREATE TRIGGER trg_pacientes_notificar_alteracao
+AFTER UPDATE ON pacientes
+REFERENCING OLD TABLE AS pacientes_antigos NEW TABLE AS pacientes_novos
+FOR EACH STATEMENT EXECUTE FUNCTION notificar_pacientes_alterados();
+
+CREATE TRIGGER trg_pacientes_notificar_exclusao
+AFTER DELETE ON pacientes
+REFERENCING OLD TABLE AS pacientes_antigos
+FOR EACH STATEMENT EXECUTE FUNCTION notificar_pacientes_alterados();
@@ -0,0 +1,86 @@
+-- Quantidade de triagens por hora e por dia, em cada prioridade, para os relatórios
+-- da gestão (relatorios.py). Os volumes por hora, dia e dia da semana e a proporção
+-- de emergências saem destas tabelas (no máximo quatro linhas por hora ou por dia)
+-- em vez de varrer o histórico de triagens a cada relatório.
+--
+-- Mantidas por um gatilho por comando, com tabela de transição: uma carga em lote
+-- soma suas triagens de uma vez, com uma atualização por (período, prioridade).
+-- As triagens que criar_particao_triagens() move de triagens_padrao são gravadas
+-- direto na partição e não disparam o gatilho da tabela particionada (não são
+-- contadas duas vezes). As triagens arquivadas ('arquivar-triagens') continuam
+-- contadas aqui.
+
+CREATE TABLE estatisticas_triagens_hora (
+    hora TIMESTAMP NOT NULL,
+    prioridade VARCHAR(50) NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (hora, prioridade)
+);
+
+CREATE TABLE estatisticas_triagens_dia (
+    dia DATE NOT NULL,
+    prioridade VARCHAR(50) NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (dia, prioridade)
+);
+
+CREATE OR REPLACE FUNCTION contar_triagens_novas() RETURNS TRIGGER AS $$
+BEGIN
+    -- ORDER BY: transações simultâneas travam as linhas na mesma ordem (sem deadlock)
+    INSERT INTO estatisticas_triagens_hora (hora, prioridade, quantidade)
+    SELECT date_trunc('hour', data_triagem), prioridade, count(*)
+    FROM triagens_novas
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (hora, prioridade) DO UPDATE
+    SET quantidade = estatisticas_triagens_hora.quantidade + EXCLUDED.quantidade;
+
+    INSERT INTO estatisticas_triagens_dia (dia, prioridade, quantidade)
+    SELECT data_triagem::date, prioridade, count(*)
+    FROM triagens_novas
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (dia, prioridade) DO UPDATE
+    SET quantidade = estatisticas_triagens_dia.quantidade + EXCLUDED.quantidade;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_triagens_estatisticas
+AFTER INSERT ON triagens
+REFERENCING NEW TABLE AS triagens_novas
+FOR EACH STATEMENT EXECUTE FUNCTION contar_triagens_novas();
+
+-- Recalcula as estatísticas a partir do dia de 'desde' (padrão: o da triagem mais
+-- antiga ainda no banco, para não apagar as contagens dos meses arquivados).
+-- Retorna a quantidade de dias (com alguma triagem) recalculados.
+CREATE OR REPLACE FUNCTION recalcular_estatisticas_triagens(desde TIMESTAMP DEFAULT NULL) RETURNS INTEGER AS $$
+DECLARE
+    inicio DATE := COALESCE(desde, (SELECT min(data_triagem) FROM triagens))::date;
+    total INTEGER;
+BEGIN
+    IF inicio IS NULL THEN
+        RETURN 0;
+    END IF;
+    -- Espera as gravações em andamento e segura as próximas até o fim do recálculo
+    LOCK TABLE estatisticas_triagens_hora, estatisticas_triagens_dia IN EXCLUSIVE MODE;
+    DELETE FROM estatisticas_triagens_hora WHERE hora >= inicio;
+    DELETE FROM estatisticas_triagens_dia WHERE dia >= inicio;
+    INSERT INTO estatisticas_triagens_hora (hora, prioridade, quantidade)
+    SELECT date_trunc('hour', data_triagem), prioridade, count(*)
+    FROM triagens
+    WHERE data_triagem >= inicio
+    GROUP BY 1, 2;
+    -- O dia sai das horas recém-calculadas, sem reler as triagens
+    INSERT INTO estatisticas_triagens_dia (dia, prioridade, quantidade)
+    SELECT hora::date, prioridade, sum(quantidade)
+    FROM estatisticas_triagens_hora
+    WHERE hora >= inicio
+    GROUP BY 1, 2;
+    SELECT count(DISTINCT dia) INTO total FROM estatisticas_triagens_dia WHERE dia >= inicio;
+    RETURN total;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Contagens do histórico existente
+SELECT recalcular_estatisticas_triagens();
@@ -0,0 +1,64 @@
+-- Prioridade como tipo enumerado (prioridade_triagem) no lugar de VARCHAR(50) com
+-- CHECK. O valor ocupa 4 bytes fixos em vez do texto do rótulo, só aceita os quatro
+-- níveis e é ordenado na ordem de atendimento (ORDER BY prioridade traz as
+-- emergências primeiro). Os drivers continuam lendo e gravando os rótulos como
+-- texto: as consultas e os valores devolvidos à aplicação não mudam.
+--
+-- A fila continua ordenada por fila_atual.ordem_prioridade (SMALLINT, índice
+-- idx_fila_atual_ordem), que é a mesma posição e mantém a consulta da fila igual
+-- à do SQLite.
+--
+-- As tabelas com a coluna são reescritas (triagens inteira, dentro da transação
+-- da migração): em bancos grandes, aplique-a em uma janela de manutenção. Conexões
+-- abertas antes da migração guardam comandos preparados com o tipo antigo;
+-- reinicie a aplicação depois de aplicá-la.
+
+-- A ordem dos rótulos é a ordem de atendimento; novos níveis entram com
+-- ALTER TYPE ... ADD VALUE ... BEFORE/AFTER na posição correta
+CREATE TYPE prioridade_triagem AS ENUM ('Emergência', 'Urgência', 'Prioridade', 'Comum');
+
+-- O CHECK fica redundante com o tipo. As partições têm cópias próprias do CHECK
+-- (criadas com LIKE triagens INCLUDING CONSTRAINTS): a da tabela particionada é
+-- removida primeiro, e as das partições deixam de ser herdadas
+DO $$
+DECLARE
+    restricao RECORD;
+BEGIN
+    FOR restricao IN
+        SELECT c.conrelid::regclass AS tabela, c.conname
+        FROM pg_constraint c
+        WHERE c.contype = 'c'
+          AND pg_get_constraintdef(c.oid) LIKE '%prioridade%'
+          AND c.conrelid IN (SELECT 'triagens'::regclass
+                             UNION ALL
+                             SELECT inhrelid FROM pg_inherits WHERE inhparent = 'triagens'::regclass)
+        ORDER BY c.conrelid = 'triagens'::regclass DESC
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT IF EXISTS %I', restricao.tabela, restricao.conname);
+    END LOOP;
+END
+$$;
+
+ALTER TABLE triagens ALTER COLUMN prioridade TYPE prioridade_triagem USING prioridade::prioridade_triagem;
+ALTER TABLE fila_atual ALTER COLUMN prioridade TYPE prioridade_triagem USING prioridade::prioridade_triagem;
+ALTER TABLE estatisticas_triagens_hora ALTER COLUMN prioridade TYPE prioridade_triagem USING prioridade::prioridade_triagem;
+ALTER TABLE estatisticas_triagens_dia ALTER COLUMN prioridade TYPE prioridade_triagem USING prioridade::prioridade_triagem;
+
+-- Posição de cada nível na fila de atendimento (menor é atendido primeiro), agora
+-- para o tipo enumerado: o enum não é convertido implicitamente para VARCHAR
+DROP FUNCTION ordem_prioridade(VARCHAR);
+
+CREATE FUNCTION ordem_prioridade(prioridade prioridade_triagem) RETURNS SMALLINT AS $$
+    SELECT CASE prioridade
+        WHEN 'Emergência' THEN 1
+        WHEN 'Urgência' THEN 2
+        WHEN 'Prioridade' THEN 3
+        ELSE 4
+    END::SMALLINT
+$$ LANGUAGE sql IMMUTABLE;
+
+-- A troca de tipo descarta as estatísticas do planejador para a coluna
+ANALYZE triagens;
+ANALYZE fila_atual;
+ANALYZE estatisticas_triagens_hora;
+ANALYZE estatisticas_triagens_dia;
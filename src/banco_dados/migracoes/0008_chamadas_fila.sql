@@ -0,0 +1,11 @@
+-- Pacientes chamados ou retirados da fila de espera (FilaEspera.chamar_proximo e
+-- remover), para que a fila recarregada do banco (reinício da aplicação,
+-- FilaEspera.conectar) não traga de volta quem já foi atendido no dia. Uma
+-- triagem posterior à chamada devolve o paciente à fila.
+--
+-- Separada de fila_atual para não se perder em 'gerenciar reconstruir-fila'.
+
+CREATE TABLE chamadas_fila (
+    paciente_id INTEGER PRIMARY KEY REFERENCES pacientes (id),
+    chamado_em TIMESTAMP NOT NULL
+);
@@ -0,0 +1,5 @@
+-- Índice do horário das chamadas da fila, para a atualização incremental do painel
+-- da equipe (listar_chamadas_fila_desde): a cada poucos segundos o painel lê só
+-- as chamadas recentes, feitas por qualquer processo, e as tira da fila em memória.
+
+CREATE INDEX idx_chamadas_fila_chamado_em ON chamadas_fila (chamado_em);
@@ -0,0 +1,24 @@
+-- Desfaz o ajuste do planejador gravado no banco pela migração 0004 (ALTER
+-- DATABASE ... SET random_page_cost = 1.1). Parâmetros do planejador são
+-- configuração do servidor, não do esquema: o valor recomendado está no README
+-- (seção 2, parâmetros do servidor ou postgresql.conf), e benchmarks/verificar_planos.py
+-- o define na própria sessão.
+--
+-- Só remove o valor gravado pela 0004 (1.1, para todos os usuários do banco); um
+-- valor diferente definido pelo administrador é mantido. Vale para as novas conexões.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_db_role_setting s
+        JOIN pg_database d ON d.oid = s.setdatabase
+        WHERE d.datname = current_database()
+          AND s.setrole = 0
+          AND 'random_page_cost=1.1' = ANY (s.setconfig)
+    ) THEN
+        EXECUTE format('ALTER DATABASE %I RESET random_page_cost', current_database());
+    END IF;
+EXCEPTION WHEN insufficient_privilege THEN
+    RAISE NOTICE 'Sem permissão para remover random_page_cost do banco; remova-o com ALTER DATABASE ... RESET random_page_cost.';
+END
+$$;
@@ -0,0 +1,59 @@
+-- Esquema inicial (SQLite): pacientes, triagens e a fila atual mantida por gatilho.
+-- Mesma estrutura e numeração das migrações do PostgreSQL. Datas são gravadas
+-- como texto ISO 8601, na hora local, para ordenarem como no PostgreSQL.
+
+CREATE TABLE IF NOT EXISTS pacientes (
+    id INTEGER PRIMARY KEY,
+    nome_completo TEXT NOT NULL,
+    cpf TEXT NOT NULL UNIQUE,
+    data_nascimento DATE NOT NULL,
+    data_registro TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS triagens (
+    id INTEGER PRIMARY KEY,
+    paciente_id INTEGER NOT NULL REFERENCES pacientes (id),
+    sintomas TEXT NOT NULL,
+    prioridade TEXT NOT NULL CHECK (prioridade IN ('Emergência', 'Urgência', 'Prioridade', 'Comum')),
+    justificativa_triagem TEXT,
+    data_triagem TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))
+);
+
+-- O UNIQUE de pacientes.cpf já cria o índice usado na busca por CPF
+CREATE INDEX IF NOT EXISTS idx_triagens_paciente_id ON triagens (paciente_id);
+CREATE INDEX IF NOT EXISTS idx_triagens_data ON triagens (data_triagem);
+
+-- Última triagem de cada paciente
+CREATE TABLE IF NOT EXISTS fila_atual (
+    paciente_id INTEGER PRIMARY KEY REFERENCES pacientes (id),
+    triagem_id INTEGER NOT NULL,
+    prioridade TEXT NOT NULL,
+    ordem_prioridade INTEGER NOT NULL,
+    data_triagem TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_fila_atual_ordem ON fila_atual (ordem_prioridade, data_triagem DESC);
+
+-- Uma triagem só substitui a da fila se não for mais antiga
+CREATE TRIGGER IF NOT EXISTS trg_triagens_fila_atual
+AFTER INSERT ON triagens
+BEGIN
+    INSERT INTO fila_atual (paciente_id, triagem_id, prioridade, ordem_prioridade, data_triagem)
+    VALUES (
+        NEW.paciente_id, NEW.id, NEW.prioridade,
+        CASE NEW.prioridade
+            WHEN 'Emergência' THEN 1
+            WHEN 'Urgência' THEN 2
+            WHEN 'Prioridade' THEN 3
+            ELSE 4
+        END,
+        NEW.data_triagem
+    )
+    ON CONFLICT (paciente_id) DO UPDATE
+    SET triagem_id = excluded.triagem_id,
+        prioridade = excluded.prioridade,
+        ordem_prioridade = excluded.ordem_prioridade,
+        data_triagem = excluded.data_triagem
+    WHERE fila_atual.data_triagem IS NULL
+       OR excluded.data_triagem >= fila_atual.data_triagem;
+END;
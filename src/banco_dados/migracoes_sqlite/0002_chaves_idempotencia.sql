@@ -0,0 +1,8 @@
+-- Chaves de idempotência (mesma estrutura da migração 0002 do PostgreSQL).
+
+CREATE TABLE IF NOT EXISTS chaves_idempotencia (
+    chave TEXT PRIMARY KEY,
+    paciente_id INTEGER NOT NULL,
+    triagem_id INTEGER NOT NULL,
+    criada_em TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))
+);
@@ -0,0 +1,6 @@
+-- Equivale à migração 0003 do PostgreSQL (particionamento mensal de triagens).
+-- O SQLite não tem particionamento: o arquivamento ('gerenciar arquivar-triagens')
+-- exporta e exclui as triagens antigas pelo índice de data_triagem. Mantida para
+-- que as versões do esquema sejam as mesmas nos dois armazenamentos.
+
+SELECT 1;
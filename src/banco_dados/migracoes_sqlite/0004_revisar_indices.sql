@@ -0,0 +1,7 @@
+-- Mesmos índices da migração 0004 do PostgreSQL (o SQLite nunca teve idx_pacientes_cpf).
+
+CREATE INDEX IF NOT EXISTS idx_triagens_paciente_data ON triagens (paciente_id, data_triagem DESC, id DESC);
+DROP INDEX IF EXISTS idx_triagens_paciente_id;
+
+DROP INDEX IF EXISTS idx_fila_atual_ordem;
+CREATE INDEX idx_fila_atual_ordem ON fila_atual (ordem_prioridade, data_triagem DESC, paciente_id DESC);
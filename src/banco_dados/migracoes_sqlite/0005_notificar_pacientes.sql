@@ -0,0 +1,6 @@
+-- Equivale à migração 0005 do PostgreSQL (aviso de pacientes alterados por
+-- LISTEN/NOTIFY para o cache de pacientes). O SQLite não tem notificações entre
+-- processos e o armazenamento local não usa o cache. Mantida para que as versões
+-- do esquema sejam as mesmas nos dois armazenamentos.
+
+SELECT 1;
@@ -0,0 +1,44 @@
+-- Quantidade de triagens por hora e por dia, em cada prioridade, para os relatórios
+-- da gestão (mesmas tabelas da migração 0006 do PostgreSQL). O SQLite não tem
+-- gatilhos por comando: cada triagem gravada soma 1 à sua hora e ao seu dia
+-- (gravados no formato de data das demais tabelas, para serem comparáveis como
+-- texto). As triagens arquivadas ('arquivar-triagens') continuam contadas aqui.
+
+CREATE TABLE IF NOT EXISTS estatisticas_triagens_hora (
+    hora TIMESTAMP NOT NULL,
+    prioridade TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (hora, prioridade)
+);
+
+CREATE TABLE IF NOT EXISTS estatisticas_triagens_dia (
+    dia DATE NOT NULL,
+    prioridade TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (dia, prioridade)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_triagens_estatisticas
+AFTER INSERT ON triagens
+WHEN NEW.data_triagem IS NOT NULL
+BEGIN
+    INSERT INTO estatisticas_triagens_hora (hora, prioridade, quantidade)
+    VALUES (strftime('%Y-%m-%d %H:00:00.000000', NEW.data_triagem), NEW.prioridade, 1)
+    ON CONFLICT (hora, prioridade) DO UPDATE SET quantidade = quantidade + 1;
+
+    INSERT INTO estatisticas_triagens_dia (dia, prioridade, quantidade)
+    VALUES (date(NEW.data_triagem), NEW.prioridade, 1)
+    ON CONFLICT (dia, prioridade) DO UPDATE SET quantidade = quantidade + 1;
+END;
+
+-- Contagens do histórico existente
+INSERT INTO estatisticas_triagens_hora (hora, prioridade, quantidade)
+SELECT strftime('%Y-%m-%d %H:00:00.000000', data_triagem), prioridade, count(*)
+FROM triagens
+WHERE data_triagem IS NOT NULL
+GROUP BY 1, 2;
+
+INSERT INTO estatisticas_triagens_dia (dia, prioridade, quantidade)
+SELECT date(hora), prioridade, sum(quantidade)
+FROM estatisticas_triagens_hora
+GROUP BY 1, 2;
@@ -0,0 +1,6 @@
+-- Equivale à migração 0007 do PostgreSQL (prioridade como tipo enumerado). O SQLite
+-- não tem tipos enumerados: a prioridade continua TEXT com o CHECK dos quatro
+-- níveis, e a fila continua ordenada por fila_atual.ordem_prioridade. Mantida
+-- para que as versões do esquema sejam as mesmas nos dois armazenamentos.
+
+SELECT 1;
@@ -0,0 +1,9 @@
+-- Pacientes chamados ou retirados da fila de espera (mesma tabela da migração
+-- 0008 do PostgreSQL), para que a fila recarregada do banco não traga de volta
+-- quem já foi atendido no dia. Uma triagem posterior à chamada devolve o
+-- paciente à fila.
+
+CREATE TABLE IF NOT EXISTS chamadas_fila (
+    paciente_id INTEGER PRIMARY KEY REFERENCES pacientes (id),
+    chamado_em TIMESTAMP NOT NULL
+);
@@ -0,0 +1,3 @@
+-- Mesmo índice da migração 0009 do PostgreSQL (chamadas recentes da fila).
+
+CREATE INDEX IF NOT EXISTS idx_chamadas_fila_chamado_em ON chamadas_fila (chamado_em);
@@ -0,0 +1,5 @@
+-- Equivale à migração 0010 do PostgreSQL (remove o ajuste do planejador gravado
+-- pela 0004), que não se aplica ao SQLite. Mantida para que as versões do esquema
+-- sejam as mesmas nos dois armazenamentos.
+
+SELECT 1;
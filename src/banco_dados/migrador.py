@@ -0,0 +1,153 @@
+# Módulo de Migrações do Esquema do Banco de Dados
+
+"""
+Este módulo versiona o esquema do banco de dados PostgreSQL. Cada alteração é um
+script SQL numerado em banco_dados/migracoes (NNNN_descricao.sql), aplicado uma
+única vez e registrado na tabela 'schema_version'.
+
+A aplicação apenas confere a versão ao iniciar (uma leitura pelo índice da chave
+primária); os scripts são aplicados pelo comando:
+    python -m banco_dados.gerenciar migrar
+
+O armazenamento SQLite usa scripts próprios em banco_dados/migracoes_sqlite, com
+a mesma numeração, listados pelas mesmas funções.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+DIRETORIO_MIGRACOES = os.path.join(os.path.dirname(__file__), "migracoes")
+
+# Chave do pg_advisory_lock que impede duas execuções simultâneas de 'migrar'
+_CHAVE_BLOQUEIO = 0x706F73746F  # "posto"
+
+_PADRAO_ARQUIVO = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+class SchemaDesatualizadoError(RuntimeError):
+    """Levantada quando o banco de dados não tem as migrações exigidas por esta versão do código."""
+
+
+@lru_cache(maxsize=None)
+def listar_migracoes(diretorio: str = DIRETORIO_MIGRACOES) -> Tuple[Tuple[int, str, str], ...]:
+    """
+    Retorna as migrações disponíveis como (versão, nome, caminho), em ordem de versão.
+
+    Args:
+        diretorio: Pasta dos scripts (padrão: as migrações do PostgreSQL)
+    """
+    migracoes = []
+    for arquivo in os.listdir(diretorio):
+        encontrado = _PADRAO_ARQUIVO.match(arquivo)
+        if encontrado:
+            migracoes.append((int(encontrado.group(1)), encontrado.group(2),
+                              os.path.join(diretorio, arquivo)))
+    migracoes.sort()
+
+    versoes = [versao for versao, _, _ in migracoes]
+    if len(set(versoes)) != len(versoes):
+        raise RuntimeError(f"Há migrações com o mesmo número em {diretorio}.")
+    return tuple(migracoes)
+
+
+def versao_esperada(diretorio: str = DIRETORIO_MIGRACOES) -> int:
+    """Versão do esquema exigida por esta versão do código (a última migração disponível)."""
+    migracoes = listar_migracoes(diretorio)
+    return migracoes[-1][0] if migracoes else 0
+
+
+def versao_atual(conn) -> int:
+    """
+    Retorna a versão do esquema registrada no banco (0 se nenhuma migração foi aplicada).
+
+    Args:
+        conn: Conexão com o banco de dados
+    """
+    # psycopg2 só é importado nas funções do PostgreSQL: listar_migracoes também serve ao SQLite
+    import psycopg2.errors
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT max(versao) FROM schema_version")
+        versao = cursor.fetchone()[0]
+        return versao or 0
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+
+
+def verificar_esquema(conn):
+    """
+    Confere se o banco está na versão exigida pelo código.
+    Levanta SchemaDesatualizadoError se faltarem migrações.
+
+    Args:
+        conn: Conexão com o banco de dados
+    """
+    atual, esperada = versao_atual(conn), versao_esperada()
+    conn.rollback()
+    if atual < esperada:
+        raise SchemaDesatualizadoError(
+            f"O esquema do banco de dados está na versão {atual}, mas esta versão da aplicação exige a {esperada}.\n"
+            f"Execute 'python -m banco_dados.gerenciar migrar' (a partir da pasta src/) para atualizá-lo."
+        )
+    if atual > esperada:
+        print(f"Aviso: o esquema do banco de dados (versão {atual}) é mais novo que o esperado ({esperada}).")
+
+
+def migrar(conn, alvo: Optional[int] = None) -> List[int]:
+    """
+    Aplica, em ordem, as migrações ainda não registradas em 'schema_version', cada uma
+    em sua própria transação. Execuções simultâneas (vários quiosques reiniciando) são
+    serializadas por um advisory lock. Retorna as versões aplicadas.
+
+    Args:
+        conn: Conexão com o banco de dados
+        alvo: Última versão a aplicar (padrão: todas)
+    """
+    import psycopg2
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (_CHAVE_BLOQUEIO,))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                versao INTEGER PRIMARY KEY,
+                nome VARCHAR(255) NOT NULL,
+                aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT versao FROM schema_version")
+        aplicadas = {linha[0] for linha in cursor.fetchall()}
+        conn.commit()
+
+        novas = []
+        for versao, nome, caminho in listar_migracoes():
+            if versao in aplicadas or (alvo is not None and versao > alvo):
+                continue
+            with open(caminho, encoding="utf-8") as arquivo:
+                script = arquivo.read()
+            try:
+                cursor.execute(script)
+                cursor.execute("INSERT INTO schema_version (versao, nome) VALUES (%s, %s)", (versao, nome))
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                print(f"Erro ao aplicar a migração {versao:04d}_{nome}: {e}")
+                raise
+            print(f"Migração {versao:04d}_{nome} aplicada.")
+            novas.append(versao)
+        return novas
+
+    finally:
+        try:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_CHAVE_BLOQUEIO,))
+            conn.commit()
+        except psycopg2.Error:
+            # Se a conexão caiu, o lock já foi liberado junto com a sessão
+            pass
+        cursor.close()
@@ -0,0 +1,235 @@
+# Módulo de Pool de Conexões (PostgreSQL - Azure)
+
+"""
+Este módulo mantém um conjunto de conexões abertas com o PostgreSQL no Azure,
+reaproveitando-as entre as operações do BancoDadosUtils para evitar um novo
+handshake TCP + TLS + autenticação a cada consulta.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolEsgotadoError(Exception):
+    """Levantada quando nenhuma conexão fica livre dentro do tempo de espera."""
+
+
+class PoolConexoes:
+    def __init__(self, fabrica: Callable, minimo: int = 1, maximo: int = 10,
+                 tempo_ocioso: float = 300.0, verificar_apos: float = 30.0,
+                 tempo_espera: float = 30.0):
+        """
+        Cria um pool de conexões thread-safe.
+
+        Args:
+            fabrica: Função sem argumentos que abre uma nova conexão
+            minimo: Quantidade de conexões mantidas abertas mesmo sem uso
+            maximo: Quantidade máxima de conexões abertas ao mesmo tempo
+            tempo_ocioso: Segundos que uma conexão pode ficar parada antes de ser fechada
+            verificar_apos: Segundos parada a partir dos quais a conexão é testada
+                com 'SELECT 1' ao ser retirada (0 testa sempre)
+            tempo_espera: Segundos que uma retirada aguarda quando o pool está cheio
+        """
+        if minimo < 0 or maximo < 1 or minimo > maximo:
+            raise ValueError(f"Tamanho de pool inválido: minimo={minimo}, maximo={maximo}")
+
+        self._fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = maximo
+        self.tempo_ocioso = tempo_ocioso
+        self.verificar_apos = verificar_apos
+        self.tempo_espera = tempo_espera
+
+        self._condicao = threading.Condition()
+        self._livres = deque()  # (conexão, instante em que foi devolvida)
+        self._total = 0
+        self._fechado = False
+
+        self._contadores = {
+            "retiradas": 0,
+            "criadas": 0,
+            "descartadas": 0,
+            "expiradas": 0,
+            "falhas_verificacao": 0,
+            "esperas": 0,
+            "esgotamentos": 0,
+        }
+        self._tempo_espera_total = 0.0
+
+        for _ in range(minimo):
+            conn = self._criar_conexao()
+            self._livres.append((conn, time.monotonic()))
+
+    def _criar_conexao(self):
+        """Abre uma nova conexão pela fábrica e contabiliza no pool."""
+        conn = self._fabrica()
+        with self._condicao:
+            self._total += 1
+            self._contadores["criadas"] += 1
+        return conn
+
+    def _fechar_conexao(self, conn, motivo: str):
+        """Fecha uma conexão que sai do pool e libera a vaga para outra."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._condicao:
+            self._total -= 1
+            self._contadores[motivo] += 1
+            self._condicao.notify()
+
+    def _conexao_saudavel(self, conn, ociosa_ha: float) -> bool:
+        """Verifica se a conexão ainda pode ser usada antes de entregá-la."""
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if ociosa_ha < self.verificar_apos:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _remover_expiradas(self):
+        """Fecha conexões paradas há mais que o tempo ocioso, respeitando o mínimo."""
+        agora = time.monotonic()
+        expiradas = []
+        with self._condicao:
+            while (self._livres and self._total - len(expiradas) > self.minimo
+                   and agora - self._livres[0][1] > self.tempo_ocioso):
+                expiradas.append(self._livres.popleft()[0])
+        for conn in expiradas:
+            self._fechar_conexao(conn, "expiradas")
+
+    def obter(self, tempo_espera: Optional[float] = None):
+        """
+        Retira uma conexão do pool, abrindo uma nova se houver vaga.
+        Levanta PoolEsgotadoError se nenhuma ficar livre a tempo.
+
+        Args:
+            tempo_espera: Segundos de espera (padrão: o configurado no pool)
+        """
+        self._remover_expiradas()
+        limite = self.tempo_espera if tempo_espera is None else tempo_espera
+        inicio = time.monotonic()
+
+        while True:
+            conn = None
+            criar = False
+            with self._condicao:
+                if self._fechado:
+                    raise PoolEsgotadoError("O pool de conexões foi fechado.")
+                while not self._livres and self._total >= self.maximo:
+                    restante = limite - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._contadores["esgotamentos"] += 1
+                        raise PoolEsgotadoError(
+                            f"Nenhuma conexão livre após {limite:.1f}s (máximo: {self.maximo})."
+                        )
+                    self._contadores["esperas"] += 1
+                    self._condicao.wait(restante)
+                if self._livres:
+                    # LIFO: a conexão usada mais recentemente é a mais provável de estar viva
+                    conn, devolvida_em = self._livres.pop()
+                else:
+                    # Reserva a vaga antes de abrir a conexão fora do lock
+                    self._total += 1
+                    criar = True
+
+            if criar:
+                try:
+                    conn = self._fabrica()
+                except Exception:
+                    with self._condicao:
+                        self._total -= 1
+                        self._condicao.notify()
+                    raise
+                with self._condicao:
+                    self._contadores["criadas"] += 1
+            elif not self._conexao_saudavel(conn, time.monotonic() - devolvida_em):
+                self._fechar_conexao(conn, "falhas_verificacao")
+                continue
+
+            with self._condicao:
+                self._contadores["retiradas"] += 1
+                self._tempo_espera_total += time.monotonic() - inicio
+            return conn
+
+    def devolver(self, conn, descartar: bool = False):
+        """
+        Devolve uma conexão ao pool. Transações pendentes são desfeitas.
+
+        Args:
+            conn: Conexão obtida por obter()
+            descartar: Fecha a conexão em vez de reaproveitá-la
+        """
+        if not descartar and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                descartar = True
+
+        if descartar or conn.closed or self._fechado:
+            self._fechar_conexao(conn, "descartadas")
+            return
+
+        with self._condicao:
+            self._livres.append((conn, time.monotonic()))
+            self._condicao.notify()
+
+    @contextmanager
+    def conexao(self, tempo_espera: Optional[float] = None):
+        """
+        Context manager que retira uma conexão e a devolve ao final do bloco.
+        Conexões que falharem no meio do uso são descartadas.
+
+        Args:
+            tempo_espera: Segundos de espera (padrão: o configurado no pool)
+        """
+        conn = self.obter(tempo_espera)
+        descartar = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            descartar = True
+            raise
+        finally:
+            self.devolver(conn, descartar=descartar or bool(conn.closed))
+
+    def estatisticas(self) -> Dict:
+        """Retorna um retrato do uso do pool, útil para dimensioná-lo."""
+        with self._condicao:
+            livres = len(self._livres)
+            retiradas = self._contadores["retiradas"]
+            return {
+                "minimo": self.minimo,
+                "maximo": self.maximo,
+                "abertas": self._total,
+                "livres": livres,
+                "em_uso": self._total - livres,
+                **self._contadores,
+                "espera_media_ms": (self._tempo_espera_total / retiradas * 1000) if retiradas else 0.0,
+            }
+
+    def fechar(self):
+        """Fecha todas as conexões livres; as em uso são fechadas ao serem devolvidas."""
+        with self._condicao:
+            self._fechado = True
+            livres = [conn for conn, _ in self._livres]
+            self._livres.clear()
+            self._condicao.notify_all()
+        for conn in livres:
+            self._fechar_conexao(conn, "descartadas")
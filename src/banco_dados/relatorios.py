@@ -0,0 +1,135 @@
+# Módulo de Relatórios de Triagens
+
+"""
+Este módulo monta os relatórios da gestão (triagens por prioridade a cada hora e
+a cada dia, volume por dia da semana e proporção de emergências) como DataFrames
+do pandas. Todos partem das tabelas estatisticas_triagens_hora e _dia
+(migração 0006), mantidas por gatilho a cada triagem gravada: o custo de um
+relatório depende do período pedido (no máximo quatro linhas por hora ou por
+dia), não do tamanho do histórico.
+
+As horas são as da gravação das triagens (hora local, como em data_triagem).
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from .consultas import ORDEM_PRIORIDADE
+
+# Colunas das prioridades, na ordem de atendimento
+PRIORIDADES = list(ORDEM_PRIORIDADE)
+
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira",
+               "Sexta-feira", "Sábado", "Domingo"]
+
+
+def _por_periodo(linhas, coluna: str, frequencia: str, primeiro: Optional[pd.Timestamp],
+                 limite: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """
+    Uma linha por período de [primeiro, limite), também os sem triagens, com uma
+    coluna por prioridade e 'Total'. Sem um dos limites, o período começa no
+    primeiro ou termina no último período com triagens.
+    """
+    if linhas:
+        # (período, prioridade) é a chave das tabelas de estatísticas: não há pares repetidos
+        tabela = pd.DataFrame(linhas).pivot(index=coluna, columns="prioridade", values="quantidade")
+        tabela.index = pd.DatetimeIndex(pd.to_datetime(tabela.index))
+        tabela = tabela.reindex(columns=PRIORIDADES).fillna(0)
+    else:
+        tabela = pd.DataFrame(columns=PRIORIDADES, index=pd.DatetimeIndex([]), dtype="int64")
+
+    if primeiro is None:
+        primeiro = tabela.index.min()
+    if limite is None and len(tabela):
+        limite = tabela.index.max() + pd.tseries.frequencies.to_offset(frequencia)
+    if pd.isna(primeiro) or limite is None:
+        periodos = pd.DatetimeIndex([])
+    else:
+        periodos = pd.date_range(primeiro, limite, freq=frequencia, inclusive="left")
+    tabela = tabela.reindex(periodos.as_unit(tabela.index.unit), fill_value=0)
+    tabela.index.name = coluna
+    tabela.index.freq = None
+    tabela.columns.name = None
+    tabela["Total"] = tabela.sum(axis=1)
+    return tabela.astype("int64")
+
+
+def _limite(momento: Optional[datetime]) -> Optional[pd.Timestamp]:
+    """Converte um limite opcional do período para Timestamp."""
+    return pd.Timestamp(momento) if momento is not None else None
+
+
+def triagens_por_hora(db, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Quantidade de triagens por hora (índice 'hora') e prioridade (uma coluna por
+    prioridade e 'Total'), com as horas sem triagens do período preenchidas com zero.
+
+    Args:
+        db: Armazenamento com estatisticas_triagens (BancoDadosUtils ou BancoDadosSQLite)
+        inicio: Início do período (opcional)
+        fim: Fim do período, exclusivo (opcional)
+    """
+    # As horas contadas são as de [inicio, fim): a primeira é a hora cheia a partir de 'inicio'
+    primeiro = _limite(inicio)
+    return _por_periodo(db.estatisticas_triagens("hora", inicio, fim), "hora", "h",
+                        primeiro.ceil("h") if primeiro is not None else None, _limite(fim))
+
+
+def triagens_por_dia(db, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Quantidade de triagens por dia (índice 'dia') e prioridade (uma coluna por
+    prioridade e 'Total'), com os dias sem triagens do período preenchidos com zero.
+
+    Args:
+        db: Armazenamento com estatisticas_triagens
+        inicio: Início do período (opcional; conta o dia inteiro)
+        fim: Fim do período, exclusivo (opcional; um horário depois da meia-noite
+            inclui o próprio dia)
+    """
+    # Os mesmos dias de consulta_estatisticas_triagens: o de 'inicio' e, se 'fim' não é meia-noite, o de 'fim'
+    primeiro, limite = _limite(inicio), _limite(fim)
+    return _por_periodo(db.estatisticas_triagens("dia", inicio, fim), "dia", "D",
+                        primeiro.normalize() if primeiro is not None else None,
+                        limite.ceil("D") if limite is not None else None)
+
+
+def volume_por_dia_semana(db, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Volume de triagens por dia da semana (índice 'dia_semana', de segunda a domingo):
+    colunas 'Total' e 'Média por dia' (média sobre os dias do período, contando os
+    dias sem triagens).
+
+    Args:
+        db: Armazenamento com estatisticas_triagens
+        inicio: Início do período (opcional)
+        fim: Fim do período, exclusivo (opcional)
+    """
+    dias = triagens_por_dia(db, inicio, fim)["Total"]
+    por_dia_semana = dias.groupby(dias.index.dayofweek).agg(["sum", "mean"])
+    volume = pd.DataFrame({
+        "Total": por_dia_semana["sum"],
+        "Média por dia": por_dia_semana["mean"],
+    }).reindex(range(7)).fillna(0)
+    volume["Total"] = volume["Total"].astype("int64")
+    volume.index = pd.Index(DIAS_SEMANA, name="dia_semana")
+    return volume
+
+
+def proporcao_emergencias(db, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                          frequencia: str = "D") -> pd.DataFrame:
+    """
+    Proporção de emergências por período (índice 'periodo'): colunas 'Emergência',
+    'Total' e 'Proporção' (de 0 a 1; zero nos períodos sem triagens).
+
+    Args:
+        db: Armazenamento com estatisticas_triagens
+        inicio: Início do período (opcional)
+        fim: Fim do período, exclusivo (opcional)
+        frequencia: Agrupamento do pandas ('D' dia, 'W' semana, 'MS' mês)
+    """
+    contagens = triagens_por_dia(db, inicio, fim)[["Emergência", "Total"]].resample(frequencia).sum()
+    contagens.index.name = "periodo"
+    contagens["Proporção"] = (contagens["Emergência"] / contagens["Total"].where(contagens["Total"] > 0)).fillna(0.0)
+    return contagens
@@ -9,6 +9,8 @@ As funcionalidades de áudio foram removidas/desabilitadas.
 import streamlit as st
 import os
 import sys
+import time
+from concurrent.futures import TimeoutError as TempoEsgotado
 # from datetime import datetime # Não parece ser usado diretamente, pode ser removido se não houver uso futuro
 
 # Adicionar o diretório src ao sys.path para permitir importações dos módulos
@@ -16,36 +18,98 @@ SRC_DIR = os.path.join(os.path.dirname(__file__), "..") # Vai para src/
 if SRC_DIR not in sys.path:
     sys.path.append(SRC_DIR)
 
-# Tentar importar os módulos. Se falhar, pode ser o primeiro acesso ou erro de path.
-try:
-    # from recepcao.recepcao_automatizada import Recepcao # Recepcao não é instanciada ou usada
-    from triagem.triagem_ia import TriagemIA
-    #from audio.audio_utils import AudioUtils # Mantido, mas a classe foi esvaziada de funcionalidade de áudio
-    from banco_dados.banco_dados_utils import BancoDadosUtils # DB_PATH não é mais importado diretamente aqui
-except ImportError as e:
-    st.error(f"Erro ao importar módulos: {e}. Verifique a estrutura de pastas e o PYTHONPATH.")
-    st.stop() # Impede a execução do restante do app se os módulos não puderem ser carregados
+# Só biblioteca padrão: não atrasa a primeira tela
+from interface.processador_atendimentos import ProcessadorAtendimentos, nova_chave, processar_atendimento
+from banco_dados.consultas import ORDEM_PRIORIDADE
+from interface.painel_fila import PainelFila
 
 # --- Inicialização dos Módulos ---
 st.set_page_config(layout="wide", page_title="Recepção Inteligente - Posto de Saúde")
 
+# Os módulos de triagem e de banco de dados (psycopg2, .env, pool de conexões) só são
+# importados e criados quando a primeira triagem é processada, para que o formulário
+# de boas-vindas apareça o mais rápido possível após a inicialização do quiosque.
+
 @st.cache_resource # Cache para evitar recriar em cada interação
-def inicializar_modulos():
+def obter_banco_dados():
     # audio_util = AudioUtils(idioma="pt-BR") # AudioUtils agora não faz nada com áudio
-    # Inicializar banco de dados PostgreSQL (configurações vêm do .env)
     try:
-        db_util = BancoDadosUtils()
+        from banco_dados.backends import criar_backend
+        from banco_dados.migrador import SchemaDesatualizadoError
+    except ImportError as e:
+        st.error(f"Erro ao importar módulos: {e}. Verifique a estrutura de pastas e o PYTHONPATH.")
+        st.stop()
+
+    # Inicializar o armazenamento configurado no .env (PostgreSQL no Azure ou SQLite local)
+    try:
+        return criar_backend()
     except ValueError as e:
         st.error(f"Erro de configuração do banco de dados: {e}")
-        st.info("Verifique se o arquivo .env está configurado corretamente com as credenciais do Azure PostgreSQL.")
+        st.info("Verifique se o arquivo .env está configurado corretamente (BANCO_DADOS_BACKEND e, para o PostgreSQL, as credenciais do Azure).")
         st.stop()
-    
-    triagem_ia = TriagemIA()
-    # Retornar um objeto AudioUtils "dummy" para evitar mais alterações no código que o chama
-    # A classe AudioUtils foi modificada para ter métodos vazios ou que apenas printam.
-    #return AudioUtils(idioma="pt-BR"), db_util, triagem_ia
+    except SchemaDesatualizadoError as e:
+        st.error(f"O banco de dados precisa ser atualizado: {e}")
+        st.stop()
+
+@st.cache_resource # Um único diário e uma única thread de reenvio por processo
+def obter_sincronizador_diario():
+    # Com BANCO_DADOS_DIARIO_OFFLINE=true, os atendimentos são gravados em um arquivo local
+    # e reenviados ao banco em segundo plano (o quiosque continua funcionando com o Azure fora do ar)
+    try:
+        from banco_dados.backends import criar_backend
+        from banco_dados.config import DatabaseConfig
+        from banco_dados.diario_offline import DiarioOffline, SincronizadorDiario
+    except ImportError as e:
+        st.error(f"Erro ao importar módulos: {e}. Verifique a estrutura de pastas e o PYTHONPATH.")
+        st.stop()
+
+    config = DatabaseConfig.get_diario_config()
+    if not config['ativo']:
+        return None
+    sincronizador = SincronizadorDiario(DiarioOffline(config['caminho']), criar_backend,
+                                        intervalo=config['intervalo'], max_tentativas=config['max_tentativas'])
+    sincronizador.iniciar()
+    return sincronizador
+
+@st.cache_resource # Cache para evitar recriar em cada interação
+def obter_triagem():
+    try:
+        from triagem.triagem_ia import TriagemIA
+    except ImportError as e:
+        st.error(f"Erro ao importar módulos: {e}. Verifique a estrutura de pastas e o PYTHONPATH.")
+        st.stop()
+    return TriagemIA()
+
+@st.cache_resource # Um único processador por processo: cada envio é gravado uma vez, seja qual for a sessão
+def obter_processador():
+    return ProcessadorAtendimentos()
+
+# Segundos que cada execução do script espera pelo atendimento antes de se redesenhar
+ESPERA_PROCESSAMENTO = 10
+
+# Intervalo de atualização do painel da equipe, em segundos
+INTERVALO_PAINEL = 5
+
+@st.cache_resource # Uma única fila de espera por processo: chamar o próximo não consulta o banco
+def obter_fila_espera():
+    from banco_dados.fila_espera import FilaEspera
+
+    # Carrega quem ainda aguarda, recebe as triagens gravadas por este processo e
+    # registra no banco (chamadas_fila) cada paciente chamado
+    fila = FilaEspera()
+    fila.conectar(obter_banco_dados())
+    return fila
 
-db, triagem = inicializar_modulos()
+@st.cache_resource # Um único painel por processo, que atualiza a fila só com as triagens e chamadas novas
+def obter_painel_fila():
+    return PainelFila(obter_fila_espera(), obter_banco_dados())
+
+@st.cache_data(ttl=INTERVALO_PAINEL, show_spinner=False) # Compartilhada por todas as telas abertas
+def carregar_fila_painel():
+    import pandas as pd
+    painel = obter_painel_fila()
+    fila = pd.DataFrame(painel.atualizar(), columns=["id", "nome_completo", "cpf", "prioridade", "data_triagem"])
+    return fila, painel.ultima_atualizacao
 
 # --- Estado da Sessão Streamlit ---
 if "pagina" not in st.session_state:
@@ -54,6 +118,14 @@ if "paciente_id" not in st.session_state:
     st.session_state.paciente_id = None
 if "dados_paciente" not in st.session_state:
     st.session_state.dados_paciente = {}
+# Chave de idempotência do envio em andamento e resultados já processados (chave -> resultado)
+if "chave_envio" not in st.session_state:
+    st.session_state.chave_envio = None
+if "resultados_envio" not in st.session_state:
+    st.session_state.resultados_envio = {}
+# Último paciente chamado pela equipe nesta sessão
+if "paciente_chamado" not in st.session_state:
+    st.session_state.paciente_chamado = None
 # if "sintomas_falados" not in st.session_state: # Não é mais necessário com a remoção da funcionalidade de voz
 #     st.session_state.sintomas_falados = ""
 
@@ -66,9 +138,45 @@ def ir_para_pagina(nome_pagina):
     st.session_state.pagina = nome_pagina
     st.rerun()
 
+def novo_atendimento():
+    # Esquece o envio concluído; o próximo formulário recebe outra chave
+    st.session_state.resultados_envio.pop(st.session_state.chave_envio, None)
+    st.session_state.chave_envio = None
+    st.session_state.dados_paciente = {}
+    ir_para_pagina("inicio")
+
+def processar_envio(chave, dados):
+    """Retorna o resultado do envio, agendando-o (uma única vez) no processador de fundo."""
+    if chave in st.session_state.resultados_envio:
+        return st.session_state.resultados_envio[chave]
+
+    triagem = obter_triagem()
+    sincronizador = obter_sincronizador_diario()
+    db = obter_banco_dados() if sincronizador is None else None
+    futuro = obter_processador().enviar(
+        chave, lambda: processar_atendimento(chave, dict(dados), triagem, db=db, sincronizador=sincronizador)
+    )
+    try:
+        resultado = futuro.result(timeout=ESPERA_PROCESSAMENTO)
+    except TempoEsgotado:
+        return None
+    except Exception as e:
+        print(f"Erro ao processar o atendimento: {e}")
+        resultado = {"prioridade": None, "justificativa": None, "paciente_id": None,
+                     "erro": "Ocorreu um erro ao processar sua triagem. Por favor, tente novamente."}
+    st.session_state.resultados_envio[chave] = resultado
+    return resultado
+
 # --- Layout da Aplicação ---
 st.title("Sistema de Recepção Inteligente do Posto de Saúde")
 
+with st.sidebar:
+    if st.session_state.pagina == "painel":
+        if st.button("Voltar à Recepção", use_container_width=True):
+            ir_para_pagina("inicio")
+    elif st.button("Painel da Equipe", use_container_width=True):
+        ir_para_pagina("painel")
+
 if st.session_state.pagina == "inicio":
     st.header("Bem-vindo(a)!")
     mostrar_info("Bem-vindo ao sistema de atendimento automatizado. Por favor, preencha seus dados para iniciar.")
@@ -121,6 +229,7 @@ if st.session_state.pagina == "inicio":
                     "data_nascimento": data_nascimento,
                     "sintomas": sintomas_finais
                 }
+                st.session_state.chave_envio = nova_chave()
                 mostrar_info("Obrigado pelas informações. Iniciando a triagem.")
                 ir_para_pagina("triagem")
 
@@ -128,45 +237,93 @@ elif st.session_state.pagina == "triagem":
     st.header("Resultado da Triagem")
     dados = st.session_state.dados_paciente
     
-    if not dados:
+    if not dados or not st.session_state.chave_envio:
         st.warning("Nenhum dado de paciente encontrado para triagem. Retornando ao início.")
         ir_para_pagina("inicio")
     else:
+        chave = st.session_state.chave_envio
         with st.spinner("Processando sua triagem..."):
-            # Adicionar ou buscar paciente no BD
-            paciente_id_bd = db.adicionar_paciente(dados["nome_completo"], dados["cpf"], dados["data_nascimento"])
-            st.session_state.paciente_id = paciente_id_bd
-
-            if not paciente_id_bd:
-                st.error("Ocorreu um erro ao registrar suas informações no banco de dados. Por favor, tente novamente.")
-                # audio.falar("Desculpe, tivemos um problema ao salvar seus dados. Tente novamente.") # Áudio removido
-                if st.button("Voltar ao Início"):
-                    ir_para_pagina("inicio")
-            else:
-                # Realizar a triagem
-                prioridade, justificativa = triagem.classificar_prioridade(dados["sintomas"])
-                
-                # Salvar triagem no BD
-                db.adicionar_triagem(paciente_id_bd, dados["sintomas"], prioridade, justificativa)
-                
-                st.subheader(f"Paciente: {dados['nome_completo']}")
-                st.write(f"**Sintomas Relatados:** {dados['sintomas']}")
-                st.metric(label="Nível de Prioridade", value=prioridade)
-                st.info(f"**Justificativa da Classificação:** {justificativa}")
-                
-                mensagem_visual = f"Olá {dados['nome_completo'].split()[0]}. Com base nos seus sintomas, sua prioridade de atendimento foi classificada como {prioridade}. {justificativa} Por favor, aguarde as instruções dos nossos atendentes."
-                # falar_e_mostrar(mensagem_tts) # Substituído por apenas mostrar
-                st.info(mensagem_visual)
-                
-                st.success("Sua triagem foi concluída. Por favor, aguarde o chamado para atendimento.")
-                # st.session_state.sintomas_falados = "" # Não é mais necessário
-
-                if st.button("Registrar Novo Paciente", use_container_width=True):
-                    ir_para_pagina("inicio")
+            resultado = processar_envio(chave, dados)
+
+        if resultado is None:
+            # Ainda em processamento: redesenha a página sem agendar outra gravação
+            st.info("Sua triagem ainda está sendo processada. Aguarde um instante...")
+            time.sleep(1)
+            st.rerun()
+        elif resultado["erro"]:
+            st.error(resultado["erro"])
+            # audio.falar("Desculpe, tivemos um problema ao salvar seus dados. Tente novamente.") # Áudio removido
+            col1, col2 = st.columns(2)
+            with col1:
+                # Mesma chave: se a gravação anterior chegou ao banco, ela não é repetida
+                if st.button("Tentar Novamente", use_container_width=True):
+                    st.session_state.resultados_envio.pop(chave, None)
+                    obter_processador().descartar(chave)
+                    st.rerun()
+            with col2:
+                if st.button("Voltar ao Início", use_container_width=True):
+                    novo_atendimento()
+        else:
+            st.session_state.paciente_id = resultado["paciente_id"]
+            prioridade, justificativa = resultado["prioridade"], resultado["justificativa"]
+            st.subheader(f"Paciente: {dados['nome_completo']}")
+            st.write(f"**Sintomas Relatados:** {dados['sintomas']}")
+            st.metric(label="Nível de Prioridade", value=prioridade)
+            st.info(f"**Justificativa da Classificação:** {justificativa}")
+
+            mensagem_visual = f"Olá {dados['nome_completo'].split()[0]}. Com base nos seus sintomas, sua prioridade de atendimento foi classificada como {prioridade}. {justificativa} Por favor, aguarde as instruções dos nossos atendentes."
+            # falar_e_mostrar(mensagem_tts) # Substituído por apenas mostrar
+            st.info(mensagem_visual)
+
+            st.success("Sua triagem foi concluída. Por favor, aguarde o chamado para atendimento.")
+            # st.session_state.sintomas_falados = "" # Não é mais necessário
+
+            if st.button("Registrar Novo Paciente", use_container_width=True):
+                novo_atendimento()
+
+elif st.session_state.pagina == "painel":
+    st.header("Fila de Atendimento")
+
+    if st.button("Chamar Próximo Paciente", type="primary"):
+        # Retira o primeiro da fila em memória e grava a chamada no banco
+        st.session_state.paciente_chamado = obter_fila_espera().chamar_proximo() or {}
+        carregar_fila_painel.clear()
+    chamado = st.session_state.paciente_chamado
+    if chamado:
+        st.success(f"Paciente chamado: {chamado.get('nome_completo', chamado['id'])} ({chamado['prioridade']}, "
+                   f"triagem às {chamado['data_triagem']:%H:%M}).")
+    elif chamado is not None:
+        st.info("Não há pacientes para chamar.")
+    fila, atualizada_em = carregar_fila_painel()
+
+    if fila.empty:
+        st.info("Nenhum paciente aguardando atendimento.")
+    else:
+        colunas = st.columns(len(ORDEM_PRIORIDADE))
+        for coluna, prioridade in zip(colunas, ORDEM_PRIORIDADE):
+            coluna.metric(label=prioridade, value=int((fila["prioridade"] == prioridade).sum()))
+        st.dataframe(
+            fila.rename(columns={"nome_completo": "Paciente", "cpf": "CPF", "prioridade": "Prioridade",
+                                 "data_triagem": "Triagem"})[["Prioridade", "Paciente", "CPF", "Triagem"]],
+            hide_index=True, use_container_width=True
+        )
+    sincronizador = obter_sincronizador_diario()
+    rejeitados = sincronizador.diario.quantidade_rejeitados() if sincronizador is not None else 0
+    if rejeitados:
+        st.warning(f"{rejeitados} atendimento(s) do diário offline foram recusados pelo banco de dados "
+                   f"e não serão reenviados; corrija-os manualmente (tabela 'rejeitados' de "
+                   f"{sincronizador.diario.caminho}).")
+    if atualizada_em is not None:
+        st.caption(f"Atualizada às {atualizada_em:%H:%M:%S}; nova verificação a cada {INTERVALO_PAINEL} s.")
 
 # Rodapé (opcional)
 st.markdown("---")
 st.markdown("Projeto de Recepção Inteligente - Posto de Saúde (Versão sem áudio)")
 
+if st.session_state.pagina == "painel":
+    # Redesenha o painel periodicamente; entre as atualizações o cache responde sem ir ao banco
+    time.sleep(INTERVALO_PAINEL)
+    st.rerun()
+
 # Para executar: streamlit run src/interface/main_app.py
 
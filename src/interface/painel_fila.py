@@ -0,0 +1,77 @@
+# Módulo do Painel da Fila para a Equipe
+
+"""
+Este módulo mantém atualizada, para o painel da equipe, a fila de espera em
+memória do processo (FilaEspera). A fila já recebe as triagens gravadas pelo
+próprio processo; o painel pede ao banco apenas o que outros processos gravaram
+desde a última atualização (diário offline, outros quiosques): as triagens com
+ID maior que o último visto (listar_triagens_desde) e as chamadas recentes
+(listar_chamadas_fila_desde), no lugar de reler a fila inteira a cada poucos segundos.
+
+Um único PainelFila atende todas as telas do processo (st.cache_resource), e o
+resultado de cada atualização é compartilhado por st.cache_data: com dezenas de
+telas abertas, o banco recebe no máximo duas consultas pequenas por intervalo.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from banco_dados.fila_espera import JANELA_FILA
+
+
+class PainelFila:
+    def __init__(self, fila, db, sobreposicao: int = 50, tamanho_lote: int = 1000,
+                 margem_chamadas: timedelta = timedelta(minutes=1)):
+        """
+        Cria o painel; a primeira atualização lê as triagens do período da fila.
+
+        Args:
+            fila: FilaEspera do processo (conectada ao banco)
+            db: Armazenamento com listar_triagens_desde e listar_chamadas_fila_desde
+                (BancoDadosUtils ou BancoDadosSQLite)
+            sobreposicao: IDs relidos antes do último visto, para alcançar triagens de
+                transações que terminaram fora da ordem dos IDs
+            tamanho_lote: Triagens trazidas por consulta
+            margem_chamadas: Intervalo relido antes da última chamada vista, pelo mesmo motivo
+        """
+        self.fila = fila
+        self._db = db
+        self.sobreposicao = sobreposicao
+        self.tamanho_lote = tamanho_lote
+        self.margem_chamadas = margem_chamadas
+        self._lock = threading.Lock()
+        self._ultimo_id = 0
+        self._ultima_chamada: Optional[datetime] = None
+        self.ultima_atualizacao: Optional[datetime] = None
+        self.consultas = 0
+
+    def atualizar(self) -> List[Dict]:
+        """Aplica as triagens e chamadas novas à fila e a retorna na ordem de atendimento."""
+        with self._lock:
+            desde = datetime.now() - JANELA_FILA
+
+            # Só as triagens de quem ainda aguarda: releituras não devolvem à fila quem já foi chamado
+            inicio = max(self._ultimo_id - self.sobreposicao, 0)
+            while True:
+                triagens = self._db.listar_triagens_desde(inicio, desde, self.tamanho_lote, aguardando=True)
+                self.consultas += 1
+                for triagem in triagens:
+                    self.fila.ao_registrar_triagem(triagem['paciente_id'], triagem['prioridade'],
+                                                   triagem['data_triagem'], nome_completo=triagem['nome_completo'],
+                                                   cpf=triagem['cpf'])
+                    self._ultimo_id = max(self._ultimo_id, triagem['id'])
+                if len(triagens) < self.tamanho_lote:
+                    break
+                inicio = triagens[-1]['id']
+
+            # Pacientes chamados por outros processos
+            inicio_chamadas = desde if self._ultima_chamada is None else self._ultima_chamada - self.margem_chamadas
+            for chamada in self._db.listar_chamadas_fila_desde(inicio_chamadas):
+                self.fila.aplicar_chamada(chamada['paciente_id'], chamada['chamado_em'])
+                self._ultima_chamada = max(self._ultima_chamada or chamada['chamado_em'], chamada['chamado_em'])
+            self.consultas += 1
+
+            self.fila.descartar_chamados(desde)
+            self.ultima_atualizacao = datetime.now()
+            return self.fila.listar()
@@ -0,0 +1,117 @@
+# Módulo de Processamento dos Atendimentos da Interface
+
+"""
+Este módulo tira a classificação da triagem e a gravação do atendimento do
+caminho de renderização do Streamlit. O Streamlit executa o script inteiro a
+cada interação (inclusive ao clicar em "Registrar Novo Paciente"), e gravar
+durante a renderização repetia o atendimento a cada execução.
+
+Cada envio do formulário recebe uma chave de idempotência. O processador executa
+o atendimento da chave uma única vez, em uma thread de fundo, e devolve o mesmo
+resultado a todas as execuções do script que perguntarem por ela; a interface
+guarda o resultado em st.session_state e apenas o exibe nas execuções seguintes.
+A chave também segue para o banco (ou para o diário offline), que descarta uma
+segunda gravação dela mesmo que o atendimento seja reenviado.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+
+def nova_chave() -> str:
+    """Gera a chave de idempotência de um envio do formulário."""
+    return uuid.uuid4().hex
+
+
+def processar_atendimento(chave: str, dados: Dict, triagem, db=None, sincronizador=None) -> Dict:
+    """
+    Classifica a prioridade e grava o atendimento (no diário offline, se houver
+    sincronizador, ou direto no banco). Retorna um dicionário com 'prioridade',
+    'justificativa', 'paciente_id' e 'erro' (None quando o registro deu certo).
+
+    Args:
+        chave: Chave de idempotência do envio
+        dados: Dados do formulário ('nome_completo', 'cpf', 'data_nascimento', 'sintomas')
+        triagem: Classificador de prioridade (TriagemIA)
+        db: Armazenamento usado quando não há diário offline
+        sincronizador: SincronizadorDiario, quando o diário offline está ativo
+    """
+    prioridade, justificativa = triagem.classificar_prioridade(dados["sintomas"])
+    resultado = {"prioridade": prioridade, "justificativa": justificativa, "paciente_id": None, "erro": None}
+
+    if sincronizador is not None:
+        # Grava no diário local (sem esperar o banco) e pede o reenvio imediato
+        try:
+            sincronizador.diario.registrar_atendimento(
+                dados["nome_completo"], dados["cpf"], dados["data_nascimento"],
+                dados["sintomas"], prioridade, justificativa, chave_idempotencia=chave
+            )
+            sincronizador.acordar()
+        except ValueError:
+            resultado["erro"] = "Data de nascimento inválida. Use o formato DD/MM/AAAA."
+        return resultado
+
+    # Adicionar ou reaproveitar o paciente e salvar a triagem em uma única transação
+    paciente_id, _ = db.registrar_atendimento(
+        dados["nome_completo"], dados["cpf"], dados["data_nascimento"],
+        dados["sintomas"], prioridade, justificativa, chave_idempotencia=chave
+    )
+    resultado["paciente_id"] = paciente_id
+    if paciente_id is None:
+        resultado["erro"] = "Ocorreu um erro ao registrar suas informações no banco de dados. Por favor, tente novamente."
+    return resultado
+
+
+class ProcessadorAtendimentos:
+    def __init__(self, trabalhadores: int = 2, limite_envios: int = 1000):
+        """
+        Executa os atendimentos em threads de fundo, uma vez por chave.
+
+        Args:
+            trabalhadores: Atendimentos processados ao mesmo tempo
+            limite_envios: Envios lembrados (os mais antigos já concluídos são esquecidos)
+        """
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="atendimentos")
+        self.limite_envios = limite_envios
+        # Chave -> Future do atendimento, na ordem de envio
+        self._envios: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enviar(self, chave: str, tarefa: Callable[[], Dict]) -> Future:
+        """
+        Agenda tarefa() para a chave, se ainda não foi agendada, e retorna o Future
+        do atendimento (o mesmo para todas as chamadas com a chave).
+
+        Args:
+            chave: Chave de idempotência do envio
+            tarefa: Função sem argumentos que processa o atendimento
+        """
+        with self._lock:
+            futuro = self._envios.get(chave)
+            if futuro is None:
+                futuro = self._envios[chave] = self._executor.submit(tarefa)
+                self._esquecer_antigos()
+            return futuro
+
+    def _esquecer_antigos(self):
+        excesso = len(self._envios) - self.limite_envios
+        for chave in [chave for chave, futuro in self._envios.items() if futuro.done()][:max(excesso, 0)]:
+            del self._envios[chave]
+
+    def descartar(self, chave: str):
+        """
+        Esquece o envio da chave, para que um novo enviar() o execute outra vez
+        (ex.: "Tentar novamente" após um erro; o banco não grava a chave duas vezes).
+
+        Args:
+            chave: Chave de idempotência do envio
+        """
+        with self._lock:
+            self._envios.pop(chave, None)
+
+    def encerrar(self):
+        """Aguarda os atendimentos em andamento e encerra as threads."""
+        self._executor.shutdown(wait=True)
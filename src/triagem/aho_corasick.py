@@ -0,0 +1,126 @@
+# Módulo do Autômato de Palavras-Chave (Aho-Corasick)
+
+"""
+Este módulo compila um conjunto de palavras-chave em um autômato de Aho-Corasick,
+que encontra todas as palavras presentes em um texto com uma única passada,
+independentemente da quantidade de palavras-chave cadastradas.
+"""
+
+from collections import deque
+from typing import Iterable, List, Optional, Set
+
+# Valor maior que qualquer ID de padrão, usado como "nenhum padrão"
+_SEM_PADRAO = float("inf")
+
+
+class AutomatoAhoCorasick:
+    def __init__(self, padroes: Iterable[str]):
+        """
+        Compila os padrões no autômato. O ID de cada padrão é sua posição na
+        sequência recebida; padrões repetidos ficam com o menor ID.
+
+        Args:
+            padroes: Palavras-chave a procurar (comparadas exatamente como fornecidas)
+        """
+        self.padroes: List[str] = list(padroes)
+
+        # Estado 0 é a raiz; cada estado guarda suas transições por caractere
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._proprio = [_SEM_PADRAO]    # ID do padrão que termina exatamente neste estado
+        self._menor = [_SEM_PADRAO]      # menor ID reconhecido neste estado, incluindo sufixos
+        self._saida = [0]                # próximo estado (via falhas) que reconhece algum padrão
+        self._vazio = _SEM_PADRAO        # a palavra vazia ocorre em qualquer texto
+
+        for id_padrao, padrao in enumerate(self.padroes):
+            if not padrao:
+                self._vazio = min(self._vazio, id_padrao)
+                continue
+            estado = 0
+            for caractere in padrao:
+                proximo = self._transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(self._transicoes)
+                    self._transicoes.append({})
+                    self._falha.append(0)
+                    self._proprio.append(_SEM_PADRAO)
+                    self._menor.append(_SEM_PADRAO)
+                    self._saida.append(0)
+                    self._transicoes[estado][caractere] = proximo
+                estado = proximo
+            self._proprio[estado] = min(self._proprio[estado], id_padrao)
+
+        self._construir_falhas()
+
+    def _construir_falhas(self):
+        """Calcula os links de falha em largura, propagando o menor ID reconhecido."""
+        fila = deque()
+        for estado in self._transicoes[0].values():
+            self._menor[estado] = self._proprio[estado]
+            fila.append(estado)
+
+        while fila:
+            estado = fila.popleft()
+            for caractere, filho in self._transicoes[estado].items():
+                falha = self._falha[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                falha = self._transicoes[falha].get(caractere, 0)
+                self._falha[filho] = falha
+                self._menor[filho] = min(self._proprio[filho], self._menor[falha])
+                self._saida[filho] = falha if self._proprio[falha] != _SEM_PADRAO else self._saida[falha]
+                fila.append(filho)
+
+    def menor_ocorrencia(self, texto: str) -> Optional[int]:
+        """
+        Retorna o menor ID entre os padrões que ocorrem no texto, ou None.
+        Como os IDs seguem a ordem de precedência, é o padrão que venceria
+        uma varredura sequencial das palavras-chave.
+
+        Args:
+            texto: Texto a ser analisado
+        """
+        transicoes = self._transicoes
+        falha = self._falha
+        menor = self._menor
+        resultado = self._vazio
+        estado = 0
+
+        for caractere in texto:
+            proximo = transicoes[estado].get(caractere)
+            while proximo is None and estado:
+                estado = falha[estado]
+                proximo = transicoes[estado].get(caractere)
+            estado = proximo or 0
+            if menor[estado] < resultado:
+                resultado = menor[estado]
+                if resultado == 0:
+                    break
+
+        return None if resultado == _SEM_PADRAO else resultado
+
+    def ocorrencias(self, texto: str) -> Set[int]:
+        """
+        Retorna os IDs de todos os padrões que ocorrem no texto.
+
+        Args:
+            texto: Texto a ser analisado
+        """
+        transicoes = self._transicoes
+        falha = self._falha
+        encontrados = set() if self._vazio == _SEM_PADRAO else {self._vazio}
+        estado = 0
+
+        for caractere in texto:
+            proximo = transicoes[estado].get(caractere)
+            while proximo is None and estado:
+                estado = falha[estado]
+                proximo = transicoes[estado].get(caractere)
+            estado = proximo or 0
+
+            reconhecedor = estado if self._proprio[estado] != _SEM_PADRAO else self._saida[estado]
+            while reconhecedor:
+                encontrados.add(self._proprio[reconhecedor])
+                reconhecedor = self._saida[reconhecedor]
+
+        return encontrados
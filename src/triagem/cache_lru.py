@@ -0,0 +1,80 @@
+# Módulo de Cache LRU da Triagem
+
+"""
+Este módulo implementa um cache LRU limitado e thread-safe para os resultados
+da classificação de prioridade, com contadores de acertos, falhas e remoções.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# Retornado por obter() quando a chave não está no cache
+AUSENTE = object()
+
+
+class CacheLRU:
+    def __init__(self, tamanho_maximo: int = 1024):
+        """
+        Cria o cache.
+
+        Args:
+            tamanho_maximo: Quantidade máxima de entradas (0 desativa o cache)
+        """
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._versao = None
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave: Hashable) -> Any:
+        """Retorna o valor em cache (marcando-o como recém-usado) ou AUSENTE."""
+        with self._lock:
+            valor = self._entradas.get(chave, AUSENTE)
+            if valor is AUSENTE:
+                self.falhas += 1
+            else:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+            return valor
+
+    def inserir(self, chave: Hashable, valor: Any, versao: Any = None):
+        """
+        Guarda um valor, removendo a entrada usada há mais tempo se o cache estiver cheio.
+        O valor é descartado se 'versao' não for a versão atual do cache, o que impede
+        que um resultado calculado com regras antigas entre depois de uma invalidação.
+        """
+        if self.tamanho_maximo <= 0:
+            return
+        with self._lock:
+            if versao != self._versao:
+                return
+            self._entradas[chave] = valor
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+                self.remocoes += 1
+
+    def invalidar(self, versao: Any = None):
+        """Esvazia o cache e passa a aceitar apenas valores da nova versão."""
+        with self._lock:
+            self._entradas.clear()
+            self._versao = versao
+            self.invalidacoes += 1
+
+    def estatisticas(self) -> Dict:
+        """Retorna os contadores do cache."""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "tamanho": len(self._entradas),
+                "tamanho_maximo": self.tamanho_maximo,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
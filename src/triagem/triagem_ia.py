@@ -6,8 +6,159 @@ sintomas relatados pelo paciente, classificando o nível de prioridade do atendi
 Utiliza uma base de regras médicas simples.
 """
 
+import os
+import re
+import unicodedata
+from collections import deque
+from itertools import chain, islice
+from typing import Iterable, Optional
+
+try:
+    from .aho_corasick import AutomatoAhoCorasick
+    from .cache_lru import AUSENTE, CacheLRU
+except ImportError:  # execução direta do arquivo (python triagem_ia.py)
+    from aho_corasick import AutomatoAhoCorasick
+    from cache_lru import AUSENTE, CacheLRU
+
+# Níveis em ordem de precedência: (chave em regras_triagem, prioridade, modelo da justificativa)
+NIVEIS_TRIAGEM = (
+    ("emergencia", "Emergência", "Sintoma indicativo de emergência detectado: '{}'."),
+    ("urgencia", "Urgência", "Sintoma indicativo de urgência detectado: '{}'."),
+    ("prioridade", "Prioridade", "Sintoma indicativo de atendimento prioritário detectado: '{}'."),
+    ("comum", "Comum", "Sintoma indicativo de atendimento comum detectado: '{}'."),
+)
+
+# Código inteiro estável de cada prioridade: a posição na fila de atendimento
+# (menor é atendido primeiro), usada também como ORDEM_PRIORIDADE pelo banco de
+# dados (banco_dados.consultas) e gravada na coluna ordem_prioridade. Os códigos
+# são gravados e comparados fora deste módulo: um novo nível recebe um código
+# novo, sem renumerar os existentes.
+CODIGOS_PRIORIDADE = {"Emergência": 1, "Urgência": 2, "Prioridade": 3, "Comum": 4}
+
+# Abaixo desta quantidade de palavras-chave a varredura com 'in' (feita em C)
+# ainda é mais rápida que percorrer o autômato caractere a caractere em Python
+LIMIAR_AUTOMATO = 120
+
+
+# Acentos que sobram separados do caractere base após a decomposição Unicode
+_MARCAS_COMBINANTES = re.compile("[\u0300-\u036f]+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza um texto para comparação com as regras: minúsculas, acentos
+    removidos e espaços em sequência reduzidos a um só.
+    """
+    texto = texto.lower()
+    if not texto.isascii():
+        texto = _MARCAS_COMBINANTES.sub("", unicodedata.normalize("NFKD", texto))
+    return " ".join(texto.split())
+
+
+def _registrar_alteracao(base: type, nome: str):
+    """Cria um método que delega à classe base e registra que as regras mudaram."""
+    original = getattr(base, nome)
+
+    def metodo(self, *args, **kwargs):
+        resultado = original(self, *args, **kwargs)
+        self._alterou()
+        return resultado
+
+    metodo.__name__ = nome
+    return metodo
+
+
+class _ListaRegras(list):
+    """Lista de palavras-chave que avisa o dicionário de regras a cada alteração."""
+
+    def __init__(self, palavras: Iterable[str], dono: "RegrasTriagem"):
+        super().__init__(palavras)
+        self._dono = dono
+
+    def _alterou(self):
+        self._dono.versao += 1
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+for _nome in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(_ListaRegras, _nome, _registrar_alteracao(list, _nome))
+
+
+class RegrasTriagem(dict):
+    """
+    Dicionário {nível: [palavras-chave]} que incrementa 'versao' a cada alteração,
+    inclusive nas listas, para que a TriagemIA recompile as regras e invalide o cache.
+    """
+
+    def __init__(self, regras=(), **kwargs):
+        super().__init__()
+        self.versao = 0
+        self.update(regras, **kwargs)
+
+    def _alterou(self):
+        self.versao += 1
+
+    def __setitem__(self, chave, palavras):
+        super().__setitem__(chave, _ListaRegras(palavras, self))
+        self._alterou()
+
+    def update(self, *args, **kwargs):
+        for chave, palavras in dict(*args, **kwargs).items():
+            self[chave] = palavras
+
+    def setdefault(self, chave, padrao=()):
+        if chave not in self:
+            self[chave] = padrao
+        return self[chave]
+
+    def __ior__(self, outro):
+        self.update(outro)
+        return self
+
+    def __reduce__(self):
+        return RegrasTriagem, ({chave: list(palavras) for chave, palavras in self.items()},)
+
+
+for _nome in ("__delitem__", "pop", "popitem", "clear"):
+    setattr(RegrasTriagem, _nome, _registrar_alteracao(dict, _nome))
+
+# Instância usada pelos processos de classificar_lote (uma por processo)
+_triagem_processo = None
+
+
+def _inicializar_processo(regras: dict):
+    """Prepara, em cada processo do pool, uma TriagemIA com as regras do processo principal."""
+    global _triagem_processo
+    _triagem_processo = TriagemIA()
+    _triagem_processo.regras_triagem = regras
+
+
+def _classificar_bloco(textos: list) -> list:
+    """Classifica um bloco de textos dentro de um processo do pool."""
+    return [_triagem_processo.classificar_prioridade(texto) for texto in textos]
+
+
+def _blocos(textos: Iterable, tamanho: int):
+    """Divide um iterável em listas de até 'tamanho' itens, sem materializá-lo."""
+    iterador = iter(textos)
+    while True:
+        bloco = list(islice(iterador, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
 class TriagemIA:
-    def __init__(self):
+    def __init__(self, tamanho_cache: int = 1024):
+        """
+        Args:
+            tamanho_cache: Quantidade de textos normalizados mantidos no cache
+                de classificações (0 desativa o cache)
+        """
+        self._versao_compilada = None
+        self._cache = CacheLRU(tamanho_cache)
         # Definição de palavras-chave para cada nível de prioridade
         # Esta é uma simplificação e deve ser expandida/validada por profissionais de saúde
         self.regras_triagem = {
@@ -43,9 +194,47 @@ class TriagemIA:
             ]
         }
 
+    @property
+    def regras_triagem(self) -> RegrasTriagem:
+        return self._regras_triagem
+
+    @regras_triagem.setter
+    def regras_triagem(self, regras: dict):
+        self._regras_triagem = regras if isinstance(regras, RegrasTriagem) else RegrasTriagem(regras)
+        self._versao_compilada = None
+
+    def recompilar_regras(self):
+        """
+        Recompila as regras e esvazia o cache de classificações. É chamado
+        automaticamente na primeira classificação após qualquer alteração em regras_triagem.
+        """
+        versao = self._regras_triagem.versao
+        # As palavras-chave entram na ordem de precedência (nível, posição na lista),
+        # de modo que o menor ID encontrado é a regra que a varredura sequencial escolheria.
+        regras = [
+            (nivel, palavra_chave)
+            for nivel, (chave, _, _) in enumerate(NIVEIS_TRIAGEM)
+            for palavra_chave in self._regras_triagem.get(chave, [])
+        ]
+        normalizadas = [normalizar_texto(palavra_chave) for _, palavra_chave in regras]
+        automato = AutomatoAhoCorasick(normalizadas) if len(regras) >= LIMIAR_AUTOMATO else None
+
+        # Uma única atribuição, para que outra thread nunca veja partes de versões diferentes
+        self._compilado = (regras, normalizadas, automato)
+        self._cache.invalidar(versao)
+        self._versao_compilada = versao
+
+    def estatisticas_cache(self) -> dict:
+        """Retorna acertos, falhas, remoções e invalidações do cache de classificações."""
+        return self._cache.estatisticas()
+
     def classificar_prioridade(self, sintomas_texto: str) -> tuple[str, str]:
         """
         Classifica a prioridade com base nos sintomas fornecidos.
+        O texto e as regras são comparados normalizados (sem acentos, maiúsculas
+        ou espaços repetidos), e o resultado fica em cache para textos equivalentes.
+        Com muitas regras, todas as palavras-chave são procuradas em uma única
+        passada sobre o texto pelo autômato de Aho-Corasick.
 
         Args:
             sintomas_texto (str): Descrição dos sintomas pelo paciente.
@@ -53,28 +242,107 @@ class TriagemIA:
         Returns:
             tuple[str, str]: (Nível de prioridade, Justificativa simplificada)
         """
-        sintomas_lower = sintomas_texto.lower()
-
-        for palavra_chave in self.regras_triagem["emergencia"]:
-            if palavra_chave in sintomas_lower:
-                return "Emergência", f"Sintoma indicativo de emergência detectado: '{palavra_chave}'."
-
-        for palavra_chave in self.regras_triagem["urgencia"]:
-            if palavra_chave in sintomas_lower:
-                return "Urgência", f"Sintoma indicativo de urgência detectado: '{palavra_chave}'."
-
-        for palavra_chave in self.regras_triagem["prioridade"]:
-            if palavra_chave in sintomas_lower:
-                return "Prioridade", f"Sintoma indicativo de atendimento prioritário detectado: '{palavra_chave}'."
-        
-        # Se nenhuma palavra-chave de maior prioridade for encontrada, verifica para comum
-        # ou classifica como comum por padrão se nenhuma regra específica for atendida.
-        for palavra_chave in self.regras_triagem["comum"]:
-            if palavra_chave in sintomas_lower:
-                return "Comum", f"Sintoma indicativo de atendimento comum detectado: '{palavra_chave}'."
+        if self._versao_compilada != self._regras_triagem.versao:
+            self.recompilar_regras()
+        versao = self._versao_compilada
+
+        sintomas_normalizados = normalizar_texto(sintomas_texto)
+        resultado = self._cache.obter(sintomas_normalizados)
+        if resultado is AUSENTE:
+            resultado = self._classificar_normalizado(sintomas_normalizados)
+            self._cache.inserir(sintomas_normalizados, resultado, versao)
+        return resultado
+
+    def classificar_codigo(self, sintomas_texto: str) -> tuple[int, str, str]:
+        """
+        Classifica como classificar_prioridade (usando o mesmo cache) e inclui o
+        código inteiro da prioridade, para filas e comparações em memória.
+
+        Args:
+            sintomas_texto (str): Descrição dos sintomas pelo paciente.
 
+        Returns:
+            tuple[int, str, str]: (Código da prioridade, Nível de prioridade, Justificativa simplificada)
+        """
+        prioridade, justificativa = self.classificar_prioridade(sintomas_texto)
+        return CODIGOS_PRIORIDADE[prioridade], prioridade, justificativa
+
+    def _classificar_normalizado(self, sintomas_normalizados: str) -> tuple[str, str]:
+        """Aplica as regras compiladas a um texto já normalizado."""
+        regras, normalizadas, automato = self._compilado
+        if automato is not None:
+            regra = automato.menor_ocorrencia(sintomas_normalizados)
+        else:
+            regra = None
+            for indice, palavra_chave in enumerate(normalizadas):
+                if palavra_chave in sintomas_normalizados:
+                    regra = indice
+                    break
+
+        if regra is not None:
+            nivel, palavra_chave = regras[regra]
+            _, prioridade, modelo = NIVEIS_TRIAGEM[nivel]
+            return prioridade, modelo.format(palavra_chave)
+
+        # Nenhuma regra atendida: classifica como comum por padrão.
         return "Comum", "Nenhum sintoma de alta prioridade identificado explicitamente. Classificado como comum para avaliação médica."
 
+    def classificar_lote(self, textos: Iterable, processos: Optional[int] = None,
+                         tamanho_bloco: int = 5000, limiar_paralelo: int = 20000):
+        """
+        Classifica muitos textos de uma vez (auditorias, reclassificações).
+        Lotes pequenos são processados no próprio processo; a partir de
+        'limiar_paralelo' textos, o trabalho é dividido em blocos entre processos.
+
+        Os padrões seguem benchmarks/bench_triagem_lote.py --custos: com a base de
+        regras original o pool compensa a partir de poucos milhares de textos, e o
+        limiar de 20000 deixa margem para a criação mais lenta dos processos fora do
+        Linux; blocos de 5000 tornam o custo por bloco desprezível e dão um bloco a
+        cada um de 4 processos já no limiar. Bases de regras muito maiores encarecem
+        a criação do pool (cada processo recompila as regras) e pedem um limiar maior.
+
+        Args:
+            textos: Lista, gerador ou pandas.Series com as descrições dos sintomas
+                (valores ausentes são tratados como texto vazio)
+            processos: Quantidade de processos (padrão: número de núcleos; 1 desativa o paralelismo)
+            tamanho_bloco: Quantidade de textos enviada a cada processo por vez
+            limiar_paralelo: Quantidade mínima de textos para usar o pool de processos
+
+        Returns:
+            pandas.DataFrame: Colunas 'prioridade', 'justificativa' e 'codigo_prioridade'
+            (int8, de CODIGOS_PRIORIDADE), com o mesmo índice da Series de entrada (ou
+            índice sequencial para listas e geradores)
+        """
+        import pandas as pd
+
+        indice = textos.index if isinstance(textos, pd.Series) else None
+        textos = (texto if isinstance(texto, str) else "" for texto in textos)
+        processos = processos or os.cpu_count() or 1
+
+        # Só consome o início da entrada para decidir se vale a pena paralelizar
+        inicio = list(islice(textos, limiar_paralelo))
+        if processos == 1 or len(inicio) < limiar_paralelo:
+            resultados = [self.classificar_prioridade(texto) for texto in chain(inicio, textos)]
+        else:
+            # Importado só aqui: multiprocessing pesa na inicialização do quiosque
+            from concurrent.futures import ProcessPoolExecutor
+
+            resultados = []
+            with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo,
+                                     initargs=(self.regras_triagem,)) as executor:
+                # Limita os blocos em andamento para não materializar geradores grandes
+                pendentes = deque()
+                for bloco in _blocos(chain(inicio, textos), tamanho_bloco):
+                    pendentes.append(executor.submit(_classificar_bloco, bloco))
+                    if len(pendentes) >= 2 * processos:
+                        resultados.extend(pendentes.popleft().result())
+                while pendentes:
+                    resultados.extend(pendentes.popleft().result())
+
+        resultado = pd.DataFrame(resultados, columns=["prioridade", "justificativa"], index=indice)
+        resultado["codigo_prioridade"] = resultado["prioridade"].map(CODIGOS_PRIORIDADE).astype("int8")
+        return resultado
+
 if __name__ == '__main__':
     print("Iniciando simulação do módulo de Triagem IA...")
     triagem_ia = TriagemIA()